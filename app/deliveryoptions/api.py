@@ -1,16 +1,68 @@
 import json
 from typing import Any, Dict, List
 
-from app.lib.api import JSONAPIClient
+from app.lib.api import JSONAPIClient, ResourceNotFound
+from app.lib.cache import StaleWhileRevalidateCache
+from app.lib.metrics import incr
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 from requests.exceptions import ConnectionError, RequestException
 
+delivery_options_cache = StaleWhileRevalidateCache(
+    "delivery_options_cache",
+    "DELIVERY_OPTIONS_CACHE_TIMEOUT",
+    "DELIVERY_OPTIONS_CACHE_STALE_TIMEOUT",
+    "DELIVERY_OPTIONS_CACHE_STALE_IF_ERROR_TIMEOUT",
+)
+
+
+class NoDeliveryOptions(ResourceNotFound):
+    """DORIS has no delivery options for an iaid."""
+
+
+def not_found_cache_key(iaid: str) -> str:
+    return f"{delivery_options_cache.cache_key(iaid)}:not_found"
+
+
+def is_negative_caching_enabled() -> bool:
+    return (
+        delivery_options_cache.enabled
+        and settings.DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT > 0
+    )
+
+
+def check_not_found(iaid: str):
+    """Raises NoDeliveryOptions when DORIS recently had no delivery options
+    for `iaid`."""
+    if is_negative_caching_enabled() and delivery_options_cache.cache.get(
+        not_found_cache_key(iaid)
+    ):
+        incr("delivery_options_cache.not_found_hits")
+        raise NoDeliveryOptions(f"No delivery options for iaid {iaid}")
+
+
+def validate_delivery_options(data: Any):
+    """Raises ValueError when `data` is not a list of delivery options."""
+    # Validate response structure
+    if not data or not isinstance(data, list):
+        raise ValueError(
+            "Invalid API response format: expected a non-empty list"
+        )
+
+    # Ensure each item in the list has the required keys
+    for item in data:
+        if not all(key in item for key in ["options", "surrogateLinks"]):
+            raise ValueError("Invalid API response: missing required keys")
+
 
 def delivery_options_request_handler(iaid: str) -> List[Dict[str, Any]]:
     """
     Makes an API call to the delivery options service to fetch available
-    delivery options for a given iaid.
+    delivery options for a given iaid. Responses are cached by iaid, the
+    last good response is returned while the service is failing, and iaids
+    the service has no delivery options for are remembered for
+    DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT seconds.
 
     Args:
         iaid: The item archive ID to retrieve delivery options for
@@ -20,7 +72,13 @@ def delivery_options_request_handler(iaid: str) -> List[Dict[str, Any]]:
 
     Raises:
         ImproperlyConfigured: If the DELIVERY_OPTIONS_API_URL setting is not configured
-        ValueError: If the API request fails or returns invalid data
+        Exception: "Delivery Options database is currently unavailable",
+            chained from the error that caused it:
+            NoDeliveryOptions if the service has no delivery options for
+            the iaid, UpstreamUnavailable if the service cannot be reached,
+            times out or fails, CircuitOpen if it is known to be down,
+            TimeBudgetExceeded if the request ran out of time, ValueError
+            if it returns invalid data
     """
     # Validate API URL configuration
     api_url = settings.DELIVERY_OPTIONS_API_URL
@@ -28,27 +86,40 @@ def delivery_options_request_handler(iaid: str) -> List[Dict[str, Any]]:
     if not api_url:
         raise ImproperlyConfigured("DELIVERY_OPTIONS_API_URL not set")
 
-    try:
+    def fetch():
         # Create API client
-        client = JSONAPIClient(api_url)
+        client = JSONAPIClient(
+            api_url,
+            timeout=(
+                settings.DELIVERY_OPTIONS_API_CONNECT_TIMEOUT,
+                settings.DELIVERY_OPTIONS_API_READ_TIMEOUT,
+            ),
+            retries=settings.DELIVERY_OPTIONS_API_RETRIES,
+        )
         client.add_parameters({"iaid": iaid})
 
         # Attempt to get data with specific error handling
-        data = client.get()
-
-        # Validate response structure
-        if not data or not isinstance(data, list):
-            raise ValueError(
-                "Invalid API response format: expected a non-empty list"
-            )
+        try:
+            data = client.get()
+        except ResourceNotFound:
+            data = []
 
-        # Ensure each item in the list has the required keys
-        for item in data:
-            if not all(key in item for key in ["options", "surrogateLinks"]):
-                raise ValueError("Invalid API response: missing required keys")
+        if data == []:
+            if is_negative_caching_enabled():
+                delivery_options_cache.cache.set(
+                    not_found_cache_key(iaid),
+                    True,
+                    settings.DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT,
+                )
+            raise NoDeliveryOptions(f"No delivery options for iaid {iaid}")
 
+        validate_delivery_options(data)
         return data
 
+    try:
+        check_not_found(iaid)
+        return delivery_options_cache.get(iaid, fetch)
+
     except Exception as e:
         # Log the original exception for debugging
         import logging
@@ -56,4 +127,16 @@ def delivery_options_request_handler(iaid: str) -> List[Dict[str, Any]]:
         logger = logging.getLogger(__name__)
         logger.error(f"Delivery options request error: {str(e)}")
 
-        raise Exception("Delivery Options database is currently unavailable")
+        raise Exception(
+            "Delivery Options database is currently unavailable"
+        ) from e
+
+
+async def adelivery_options_request_handler(
+    iaid: str,
+) -> List[Dict[str, Any]]:
+    """Async version of delivery_options_request_handler, the delivery
+    options are fetched from a worker thread."""
+    return await sync_to_async(
+        delivery_options_request_handler, thread_sensitive=False
+    )(iaid)
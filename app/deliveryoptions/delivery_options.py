@@ -13,7 +13,7 @@ import json
 import logging
 import re
 from ipaddress import ip_address
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from app.deliveryoptions.constants import (
     DELIVERY_OPTIONS_CONFIG,
@@ -26,6 +26,8 @@ from app.deliveryoptions.reader_type import get_reader_type
 from app.records.models import Record
 from django.conf import settings
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import HttpRequest
 
 logger = logging.getLogger(__name__)
@@ -34,6 +36,25 @@ logger = logging.getLogger(__name__)
 # TODO: To be replaced by templating
 file_cache = {}
 
+# Matcher of the DCS_PREFIXES setting, compiled on first use
+_dcs_matcher: Optional["PrefixMatcher"] = None
+
+# Mapping of builder types for different option keys
+BUILDER_MAPPINGS = {
+    "heading": ("do_heading", "heading"),
+    "description": ("do_description", "description"),
+    "supplementalcontent": ("do_supplemental", "supplemental"),
+    "orderbuttons": ("do_orderbuttons", "orderbuttons"),
+    "expandlink": ("do_expandlink", "expandlink"),
+    "basketlimit": ("do_basketlimit", "basketlimit"),
+}
+
+TAG_RE = re.compile(r"({[A-Za-z]*})")
+
+# Compiled reader options of the delivery options configuration, by
+# deliveryoption and reader, compiled at startup by load_delivery_options
+_compiled_delivery_options: Dict[Tuple[str, str], Any] = {}
+
 
 def read_delivery_options(file_path: str) -> Dict:
     """
@@ -63,6 +84,55 @@ def read_delivery_options(file_path: str) -> Dict:
     return file_cache[file_path]
 
 
+class PrefixMatcher:
+    """
+    Matches strings starting with any of a set of prefixes, with one set
+    lookup per distinct prefix length, however many prefixes there are.
+
+    prefixes: the prefixes to match
+    """
+
+    __slots__ = ("_prefixes_by_length",)
+
+    def __init__(self, prefixes: Iterable[str]):
+        by_length: Dict[int, set] = {}
+        for prefix in prefixes:
+            by_length.setdefault(len(prefix), set()).add(prefix)
+        self._prefixes_by_length = tuple(
+            (length, frozenset(by_length[length]))
+            for length in sorted(by_length)
+        )
+
+    def matches(self, value: str) -> bool:
+        """Returns True if `value` starts with any of the prefixes."""
+        return any(
+            value[:length] in prefixes
+            for length, prefixes in self._prefixes_by_length
+        )
+
+
+def get_dcs_matcher() -> PrefixMatcher:
+    """Returns the matcher of the DCS_PREFIXES setting, compiling it on
+    first use."""
+    global _dcs_matcher
+    if (matcher := _dcs_matcher) is None:
+        matcher = _dcs_matcher = PrefixMatcher(settings.DCS_PREFIXES)
+    return matcher
+
+
+def reload_dcs_matcher():
+    """Discards the compiled matcher, the next match compiles DCS_PREFIXES
+    again."""
+    global _dcs_matcher
+    _dcs_matcher = None
+
+
+@receiver(setting_changed)
+def reload_dcs_matcher_on_setting_changed(*, setting, **kwargs):
+    if setting == "DCS_PREFIXES":
+        reload_dcs_matcher()
+
+
 def has_distressing_content_match(reference: str) -> bool:
     """
     Check if a reference number matches any of the distressing content prefixes.
@@ -74,7 +144,7 @@ def has_distressing_content_match(reference: str) -> bool:
         True if the reference number starts with any distressing content prefix
     """
 
-    return list(filter(reference.startswith, settings.DCS_PREFIXES)) != []
+    return get_dcs_matcher().matches(reference)
 
 
 def get_delivery_option_dict(
@@ -277,6 +347,217 @@ def generic_builder(
     )
 
 
+class Placeholder:
+    """A {Tag} of a delivery option text, with the helper that replaces it
+    and the arguments the helper takes."""
+
+    __slots__ = ("tag", "function", "params")
+
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.function = delivery_option_tags.get(tag)
+        self.params = ()
+        if self.function is not None:
+            parameters = inspect.signature(self.function).parameters
+            self.params = tuple(
+                name
+                for name in ("record", "api_surrogate_list")
+                if name in parameters
+            )
+
+    def replacement(self, record: Record, api_surrogate_list: List) -> Any:
+        if self.function is None:
+            raise KeyError(self.tag)
+        params = {}
+        if "record" in self.params:
+            params["record"] = record
+        if "api_surrogate_list" in self.params:
+            params["api_surrogate_list"] = api_surrogate_list
+        return self.function(**params)
+
+
+class CompiledText:
+    """
+    A delivery option text split once into literal segments and
+    placeholders, rendered the same as `html_replacer` renders the text.
+
+    html_replacer replaces placeholders in replacements too, texts with
+    braces outside placeholders, or rendered with replacements containing
+    braces, are left to it.
+    """
+
+    __slots__ = ("source", "segments", "exact")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.segments = tuple(
+            Placeholder(bit) if i % 2 else bit
+            for i, bit in enumerate(TAG_RE.split(source))
+            if i % 2 or bit
+        )
+        self.exact = not any(
+            "{" in segment or "}" in segment
+            for segment in self.segments
+            if isinstance(segment, str)
+        )
+
+    def render(self, record: Record, api_surrogate_list: List) -> str:
+        if not self.exact:
+            return html_replacer(self.source, record, api_surrogate_list)
+        parts = []
+        replacements = {}
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+            if segment.tag in replacements:
+                replacement = replacements[segment.tag]
+            else:
+                replacement = replacements[segment.tag] = segment.replacement(
+                    record, api_surrogate_list
+                )
+            if not replacement:
+                # html_replacer keeps the tag
+                parts.append(segment.tag)
+            elif "{" in replacement or "}" in replacement:
+                return html_replacer(self.source, record, api_surrogate_list)
+            else:
+                parts.append(replacement)
+        return "".join(parts)
+
+
+class CompiledHTML:
+    """A delivery option content compiled for `html_builder`, a text or a
+    list of named texts."""
+
+    __slots__ = ("texts", "is_list")
+
+    def __init__(self, content: Union[List, str]):
+        self.is_list = isinstance(content, list)
+        if self.is_list:
+            self.texts = tuple(
+                (item["name"] == "descriptionDCS", CompiledText(item["value"]))
+                for item in content
+            )
+        elif isinstance(content, str):
+            self.texts = ((False, CompiledText(content)),)
+        else:
+            raise TypeError(f"Cannot compile delivery option {content!r}")
+
+    def render(
+        self, record: Record, api_surrogate_list: List, dcs: bool = False
+    ) -> str:
+        return "".join(
+            text.render(record, api_surrogate_list)
+            for is_dcs, text in self.texts
+            if dcs or not is_dcs
+        )
+
+
+class CompiledReaderOption:
+    """
+    The contents of a delivery option for a reader type, compiled once so
+    that rendering them makes no placeholder scanning or signature
+    inspection. Renders the same context as `generic_builder`.
+    """
+
+    __slots__ = ("source", "contents")
+
+    def __init__(self, reader_option: Dict):
+        self.source = reader_option
+        self.contents = []
+        for option_key, (context_key, builder_type) in BUILDER_MAPPINGS.items():
+            if content := reader_option.get(option_key):
+                if builder_type == "orderbuttons" and isinstance(content, list):
+                    compiled = [
+                        {
+                            key: (
+                                CompiledHTML(value)
+                                if key in ["href", "text"]
+                                else value
+                            )
+                            for key, value in item.items()
+                        }
+                        for item in content
+                    ]
+                else:
+                    compiled = CompiledHTML(content)
+                self.contents.append((context_key, builder_type, compiled))
+
+    def render(self, record: Record, api_surrogate_list: List) -> Dict:
+        context = {}
+        for context_key, builder_type, compiled in self.contents:
+            if isinstance(compiled, list):
+                context[context_key] = [
+                    {
+                        key: (
+                            value.render(record, api_surrogate_list)
+                            if isinstance(value, CompiledHTML)
+                            else value
+                        )
+                        for key, value in item.items()
+                    }
+                    for item in compiled
+                ]
+            else:
+                dcs = (
+                    builder_type == "description"
+                    and has_distressing_content_match(record.reference_number)
+                )
+                context[context_key] = compiled.render(
+                    record, api_surrogate_list, dcs=dcs
+                )
+        return context
+
+
+def compile_delivery_options(do_dict: Dict) -> Dict[Tuple[str, str], Any]:
+    """
+    Compiles the options of every reader type of every availability
+    condition in the delivery options configuration `do_dict`.
+
+    Returns the compiled options by deliveryoption and reader, None for the
+    options that cannot be compiled, which are built as they are.
+    """
+    compiled = {}
+    for delivery_option in do_dict["deliveryOptions"]["option"]:
+        for reader_option in delivery_option["readertype"]:
+            key = (delivery_option["deliveryoption"], reader_option["reader"])
+            try:
+                compiled[key] = CompiledReaderOption(reader_option)
+            except Exception:
+                logger.warning(
+                    f"Cannot compile delivery option {key[0]} for reader {key[1]}"
+                )
+                compiled[key] = None
+    return compiled
+
+
+def load_delivery_options():
+    """Compiles the delivery options configuration, once at startup."""
+    global _compiled_delivery_options
+    try:
+        _compiled_delivery_options = compile_delivery_options(
+            read_delivery_options(DELIVERY_OPTIONS_CONFIG)
+        )
+    except Exception as e:
+        logger.error(f"Cannot compile the delivery options: {e}")
+        _compiled_delivery_options = {}
+
+
+def get_compiled_reader_option(
+    delivery_option: Dict, reader_option: Dict
+) -> Optional[CompiledReaderOption]:
+    """Returns the compiled `reader_option` of `delivery_option`, None when
+    it was not compiled or differs from the option compiled, e.g. in a
+    configuration replaced since startup."""
+    compiled = _compiled_delivery_options.get(
+        (delivery_option.get("deliveryoption"), reader_option.get("reader"))
+    )
+    if compiled is None or compiled.source != reader_option:
+        return None
+    return compiled
+
+
 def construct_delivery_options(
     api_result: List, record: Record, request: HttpRequest
 ) -> Dict[str, Any]:
@@ -328,17 +609,16 @@ def construct_delivery_options(
 
     reader_option = delivery_option["readertype"][reader_type]
 
-    # Mapping of builder types for different option keys
-    builder_mappings = {
-        "heading": ("do_heading", "heading"),
-        "description": ("do_description", "description"),
-        "supplementalcontent": ("do_supplemental", "supplemental"),
-        "orderbuttons": ("do_orderbuttons", "orderbuttons"),
-        "expandlink": ("do_expandlink", "expandlink"),
-        "basketlimit": ("do_basketlimit", "basketlimit"),
-    }
-
-    for option_key, (context_key, builder_type) in builder_mappings.items():
+    compiled_reader_option = get_compiled_reader_option(
+        delivery_option, reader_option
+    )
+    if compiled_reader_option is not None:
+        delivery_options_context_dict.update(
+            compiled_reader_option.render(record, do_surrogate)
+        )
+        return delivery_options_context_dict
+
+    for option_key, (context_key, builder_type) in BUILDER_MAPPINGS.items():
         if content := reader_option.get(option_key):
             delivery_options_context_dict[context_key] = generic_builder(
                 content,
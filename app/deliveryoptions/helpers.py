@@ -16,12 +16,11 @@ generic function will automatically handle it.
 
 import os
 import re
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.deliveryoptions.departments import DEPARTMENT_DETAILS
 from app.records.models import Record
 from django.conf import settings
-from django.core.cache import cache
 
 BASE_TNA_HOME_URL = "https://www.nationalarchives.gov.uk"
 
@@ -32,6 +31,50 @@ BASE_TNA_DISCOVERY_URL = "https://discovery.nationalarchives.gov.uk"
 MAX_BASKET_ITEMS = "10"
 
 
+def build_dept_index(
+    department_details: Dict[str, Dict[str, str]],
+) -> Tuple[Tuple[int, ...], Dict[str, Tuple[int, Dict[str, str]]]]:
+    """
+    Indexes the departments of `department_details` by their reference
+    prefix, with the position of each prefix in `department_details`.
+
+    Returns the lengths of the prefixes, longest first, and the index.
+    """
+    index = {
+        prefix: (position, details)
+        for position, (prefix, details) in enumerate(department_details.items())
+    }
+    lengths = tuple(sorted({len(prefix) for prefix in index}, reverse=True))
+    return lengths, index
+
+
+DEPT_PREFIX_LENGTHS, DEPT_INDEX = build_dept_index(DEPARTMENT_DETAILS)
+
+
+def get_dept_details(reference_number: str) -> Optional[Dict[str, str]]:
+    """
+    Get the details, deptname and depturl, of the department of a reference
+    number, e.g. "PROB 11/1022/1", from the first department in
+    DEPARTMENT_DETAILS whose key the reference number starts with.
+
+    Args:
+        reference_number: The full reference number
+
+    Returns:
+        The details of the matching department or None if not found
+    """
+    match = None
+    for length in DEPT_PREFIX_LENGTHS:
+        if (entry := DEPT_INDEX.get(reference_number[:length])) is not None:
+            # several keys can match, e.g. "CO" and "COAL", the first one
+            # in DEPARTMENT_DETAILS wins
+            if match is None or entry[0] < match[0]:
+                match = entry
+    if match is None:
+        return None
+    return match[1]
+
+
 def get_dept(reference_number: str, key_type: str) -> Optional[str]:
     """
     Get department information from a reference number.
@@ -47,25 +90,10 @@ def get_dept(reference_number: str, key_type: str) -> Optional[str]:
     Returns:
         The value for the specified key_type from the matching department or None if not found
     """
-    # Create a cache key based on the parameters
-    cache_key = f"dept_{reference_number.replace(" ", "")}_{key_type}"
-
-    # Try to get the result from the cache
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    # If not in cache, compute the result
-    result = None
-    for key, value in DEPARTMENT_DETAILS.items():
-        if reference_number.startswith(key):
-            result = value[key_type]
-            break
-
-    # Store the result in the cache (default timeout)
-    cache.set(cache_key, result)
+    if details := get_dept_details(reference_number):
+        return details[key_type]
 
-    return result
+    return None
 
 
 def get_access_condition_text(record: Record) -> str:
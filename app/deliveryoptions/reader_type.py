@@ -1,13 +1,116 @@
+import functools
 import logging
+from bisect import bisect_right
 from ipaddress import ip_address, ip_network
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from app.deliveryoptions.constants import Reader
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import HttpRequest
 
 logger = logging.getLogger(__name__)
 
+# Settings holding the CIDR ranges of the reader types
+NETWORK_SETTINGS = ("ONSITE_IP_ADDRESSES", "STAFFIN_IP_ADDRESSES")
+
+# Indexes of the NETWORK_SETTINGS, built on first use
+_network_indexes: Dict[str, "IPNetworkIndex"] = {}
+
+# Attribute of the request the reader type is memoised in
+READER_TYPE_ATTRIBUTE = "_reader_type"
+
+
+class IPNetworkIndex:
+    """
+    An immutable index of IPv4 and IPv6 networks. The networks are merged
+    into sorted, disjoint intervals of addresses, so that finding whether an
+    address is in any of them is a binary search.
+
+    cidrs: the CIDR ranges of the networks, host bits may be set
+    skip_invalid: log and skip invalid ranges instead of raising ValueError
+    """
+
+    __slots__ = ("_ipv4", "_ipv6")
+
+    def __init__(self, cidrs: Iterable[str], skip_invalid: bool = False):
+        bounds: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+        for cidr_range in cidrs:
+            try:
+                network = ip_network(cidr_range.strip(), strict=False)
+            except ValueError as e:
+                if not skip_invalid:
+                    raise
+                logger.error(f"Ignoring invalid CIDR range: {e}")
+                continue
+            bounds[network.version].append(
+                (int(network.network_address), int(network.broadcast_address))
+            )
+        self._ipv4 = self._merge(bounds[4])
+        self._ipv6 = self._merge(bounds[6])
+
+    @staticmethod
+    def _merge(
+        bounds: List[Tuple[int, int]],
+    ) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """Returns the starts and the ends of the intervals of `bounds`
+        once overlapping and adjacent ones are merged."""
+        starts: List[int] = []
+        ends: List[int] = []
+        for start, end in sorted(bounds):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        return tuple(starts), tuple(ends)
+
+    def __contains__(self, ip: str) -> bool:
+        address = ip_address(ip)
+        starts, ends = self._ipv4 if address.version == 4 else self._ipv6
+        value = int(address)
+        position = bisect_right(starts, value) - 1
+        return position >= 0 and value <= ends[position]
+
+    def __len__(self) -> int:
+        """Returns the number of intervals."""
+        return len(self._ipv4[0]) + len(self._ipv6[0])
+
+
+def get_network_index(setting: str) -> IPNetworkIndex:
+    """Returns the index of the CIDR ranges in `setting`, one of
+    NETWORK_SETTINGS. Invalid ranges are logged once and left out, so that
+    one bad entry does not fail every lookup."""
+    if (index := _network_indexes.get(setting)) is None:
+        index = _network_indexes[setting] = IPNetworkIndex(
+            getattr(settings, setting), skip_invalid=True
+        )
+    return index
+
+
+@receiver(setting_changed)
+def clear_network_index(*, setting, **kwargs):
+    if setting in NETWORK_SETTINGS:
+        _network_indexes.pop(setting, None)
+
+
+def is_ip_in_network_index(ip: str, setting: str) -> bool:
+    """
+    Check if an IP address is within any of the CIDR ranges in a setting.
+    Args:
+        ip : The IP address to check
+        setting: One of NETWORK_SETTINGS
+    Returns:
+        True if the IP is within any of the ranges, False otherwise
+    Raises:
+        ValueError: If the IP address or a CIDR range is invalid
+    """
+    try:
+        return ip in get_network_index(setting)
+    except ValueError as e:
+        raise ValueError(f"Invalid IP or CIDR: {e}")
+
 
 def is_onsite(visitor_ip_address: str) -> bool:
     """
@@ -19,7 +122,7 @@ def is_onsite(visitor_ip_address: str) -> bool:
     Returns:
         True if the visitor is on-site, False otherwise
     """
-    return is_ip_in_cidr(visitor_ip_address, settings.ONSITE_IP_ADDRESSES)
+    return is_ip_in_network_index(visitor_ip_address, "ONSITE_IP_ADDRESSES")
 
 
 def is_subscribed() -> bool:
@@ -44,10 +147,30 @@ def is_staff(visitor_ip_address: str) -> bool:
     Returns:
         True if the visitor is staff, False otherwise
     """
-    return is_ip_in_cidr(visitor_ip_address, settings.STAFFIN_IP_ADDRESSES)
+    return is_ip_in_network_index(visitor_ip_address, "STAFFIN_IP_ADDRESSES")
 
 
 def get_reader_type(request: HttpRequest) -> Reader:
+    """
+    Determine the reader type based on request information, once per
+    request.
+
+    Args:
+        request: The HTTP request
+
+    Returns:
+        The determined reader type
+    """
+    # vars() rather than getattr(), mocked requests have every attribute
+    if (reader := vars(request).get(READER_TYPE_ATTRIBUTE)) is not None:
+        return reader
+
+    reader = determine_reader_type(request)
+    setattr(request, READER_TYPE_ATTRIBUTE, reader)
+    return reader
+
+
+def determine_reader_type(request: HttpRequest) -> Reader:
     """
     Determine the reader type based on request information.
 
@@ -175,15 +298,11 @@ def is_ip_in_cidr(ip: str, cidr: List[str]) -> bool:
         ValueError: If the IP address or CIDR range is invalid
     """
     try:
-        # Parse the IP address
-        ip_obj = ip_address(ip)
-
-        # Parse each CIDR range
-        for cidr_range in cidr:
-            network = ip_network(cidr_range.strip(), strict=False)
-            if ip_obj in network:
-                return True
-        # If no match is found
-        return False
+        return ip in _get_cidr_index(tuple(cidr))
     except ValueError as e:
         raise ValueError(f"Invalid IP or CIDR: {e}")
+
+
+@functools.lru_cache(maxsize=32)
+def _get_cidr_index(cidrs: Tuple[str, ...]) -> IPNetworkIndex:
+    return IPNetworkIndex(cidrs)
@@ -2,9 +2,16 @@ import logging
 
 import sentry_sdk
 from app.lib.api import ResourceNotFound
+from app.lib.circuit_breaker import CircuitOpen
+from app.lib.deadline import TimeBudgetExceeded
 from django.conf import settings
 
-from .views import page_not_found_error_view, server_error_view
+from .views import (
+    gateway_timeout_error_view,
+    page_not_found_error_view,
+    server_error_view,
+    service_unavailable_error_view,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +37,19 @@ class CustomExceptionMiddleware:
         if isinstance(exception, ResourceNotFound):
             return page_not_found_error_view(request=request)
 
+        if isinstance(exception, TimeBudgetExceeded):
+            # upstream APIs too slow to answer within the request time budget
+            logger.error(
+                f"Request time budget of {settings.REQUEST_TIME_BUDGET}s exhausted: {request.path}"
+            )
+            sentry_sdk.capture_exception(exception)
+            return gateway_timeout_error_view(request=request)
+
+        if isinstance(exception, CircuitOpen):
+            # upstream API known to be down, already logged by its breaker
+            logger.warning(f"{exception}: {request.path}")
+            return service_unavailable_error_view(request=request)
+
         # Exception() raised or Unhandled exceptions
 
         logger.exception(exception)
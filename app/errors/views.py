@@ -32,3 +32,27 @@ def server_error_view(request, exception=None):
         )
     response.status_code = HTTPStatus.INTERNAL_SERVER_ERROR
     return response
+
+
+def gateway_timeout_error_view(request, exception=None):
+    try:
+        response = render(request, SERVER_ERROR_TEMPLATE)
+    except TemplateDoesNotExist as e:
+        logger.error(f"Template missing: {e}")
+        return HttpResponseServerError(
+            "Internal Server Error: Template not found."
+        )
+    response.status_code = HTTPStatus.GATEWAY_TIMEOUT
+    return response
+
+
+def service_unavailable_error_view(request, exception=None):
+    try:
+        response = render(request, SERVER_ERROR_TEMPLATE)
+    except TemplateDoesNotExist as e:
+        logger.error(f"Template missing: {e}")
+        return HttpResponseServerError(
+            "Internal Server Error: Template not found."
+        )
+    response.status_code = HTTPStatus.SERVICE_UNAVAILABLE
+    return response
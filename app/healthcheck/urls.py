@@ -1,4 +1,7 @@
-from django.http import HttpResponse
+from app.deliveryoptions.reader_type import get_client_ip, is_staff
+from app.lib.metrics import get_metrics
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
 from django.urls import path
 
 
@@ -6,6 +9,16 @@ def healthcheck(request):
     return HttpResponse("ok")
 
 
+def metrics(request):
+    """Returns the cache and upstream counters, to staff IP ranges only
+    unless in DEBUG."""
+    if not settings.DEBUG:
+        ip = get_client_ip(request)
+        if not ip or not is_staff(ip):
+            return HttpResponseForbidden()
+    return JsonResponse(get_metrics())
+
+
 app_name = "healthcheck"
 urlpatterns = [
     path(
@@ -16,4 +29,8 @@ urlpatterns = [
         "live/",
         healthcheck,
     ),
+    path(
+        "metrics/",
+        metrics,
+    ),
 ]
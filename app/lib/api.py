@@ -1,21 +1,82 @@
 import logging
+import threading
+import time
 from http import HTTPStatus
+from http.cookiejar import DefaultCookiePolicy
 
+from app.lib.cache import normalise_params
+from app.lib.circuit_breaker import get_circuit_breaker
+from app.lib.deadline import TimeBudgetExceeded, remaining_time
+from app.lib.exceptions import (
+    ResourceNotFound,
+    UpstreamClientError,
+    UpstreamUnavailable,
+)
+from app.lib.json_decoding import get_json_decoder
+from app.lib.metrics import incr
+from app.lib.retry import backoff_delay, get_retry_budget
+from app.lib.singleflight import SingleFlight
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from requests import (
     ConnectionError,
-    JSONDecodeError,
+    Response,
+    Session,
     Timeout,
     TooManyRedirects,
     codes,
-    get,
 )
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# Process-wide pool of sessions, one per upstream base URL, so that
+# connections to Rosetta, DORIS and Wagtail are kept alive between requests
+_sessions: dict[str, Session] = {}
+_sessions_lock = threading.Lock()
+
+# Identical Rosetta calls in flight at the same time share a single request
+rosetta_single_flight = SingleFlight("rosetta_single_flight")
+
+
+# Responses worth retrying, the upstream or a proxy in front of it is
+# briefly unavailable
+RETRY_STATUSES = {
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+def get_session(api_url: str) -> Session:
+    """
+    Returns the shared session for the upstream at `api_url`, creating it
+    on first use. Each session has its own connection pool, sized by the
+    JSON_API_POOL_CONNECTIONS and JSON_API_POOL_MAXSIZE settings.
+    """
+    if session := _sessions.get(api_url):
+        return session
+    with _sessions_lock:
+        if api_url not in _sessions:
+            session = Session()
+            # upstreams are shared by every user, never carry cookies over
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(
+                pool_connections=settings.JSON_API_POOL_CONNECTIONS,
+                pool_maxsize=settings.JSON_API_POOL_MAXSIZE,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[api_url] = session
+        return _sessions[api_url]
+
 
-class ResourceNotFound(Exception):
-    pass
+def close_sessions():
+    """Closes and discards all pooled sessions."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
 
 
 class JSONAPIClient:
@@ -28,10 +89,20 @@ class JSONAPIClient:
 
     api_url = ""
     params = {}
+    timeout = None
+    retries = 0
 
-    def __init__(self, api_url, params={}):
+    def __init__(self, api_url, params={}, timeout=None, retries=0):
+        """
+        timeout: (connect, read) timeouts in seconds, None waits indefinitely
+        unless a request time budget is set (see app.lib.deadline)
+        retries: max number of retries after a connection error, a timeout
+        or a 502, 503 or 504 response (see app.lib.retry)
+        """
         self.api_url = api_url
         self.params = params
+        self.timeout = timeout
+        self.retries = retries
 
     def add_parameter(self, key, value):
         self.params[key] = value
@@ -39,26 +110,58 @@ class JSONAPIClient:
     def add_parameters(self, params):
         self.params = self.params | params
 
-    def get(self, path="/") -> dict:
-        """Makes a request to the config API. Returns decoded json,
-        otherwise raises error"""
-        url = f"{self.api_url}/{path.lstrip('/')}"
-        headers = {
-            "Cache-Control": "no-cache",
-            # "Accept": "application/json",  # TODO: This breaks the API
-        }
+    def get_timeout(self, url) -> tuple[float, float] | None:
+        """Returns the (connect, read) timeouts for the next call, shortened
+        to what is left of the request time budget."""
+        remaining = remaining_time()
+        if remaining is None:
+            return self.timeout
+        if remaining <= 0:
+            logger.error(f"Request time budget exhausted before calling {url}")
+            raise TimeBudgetExceeded("Request time budget exhausted")
+        if self.timeout is None:
+            return (remaining, remaining)
+        connect_timeout, read_timeout = self.timeout
+        return (min(connect_timeout, remaining), min(read_timeout, remaining))
+
+    def can_retry(self, attempt, url, reason) -> bool:
+        """Waits before retry number `attempt` and returns True, unless the
+        retries, the retry budget or the request time budget are used up."""
+        if attempt > self.retries:
+            return False
+        if not get_retry_budget(self.api_url).withdraw():
+            logger.warning(f"Retry budget exhausted, not retrying {url}")
+            incr("json_api.retry_budget_exhausted")
+            return False
+        delay = backoff_delay(attempt)
+        if (remaining := remaining_time()) is not None and delay >= remaining:
+            return False
+        logger.warning(f"Retrying {url} after {reason} (retry {attempt})")
+        incr("json_api.retries")
+        time.sleep(delay)
+        return True
+
+    def send_request(self, url, headers, circuit_breaker) -> Response:
+        """Makes a single request and records its outcome with the circuit
+        breaker. Connection errors and timeouts are raised as they are, for
+        the caller to retry, other errors raise an Exception."""
+        timeout = self.get_timeout(url)
+        circuit_breaker.before_call()
         try:
-            response = get(
+            response = get_session(self.api_url).get(
                 url,
                 params=self.params,
                 headers=headers,
+                timeout=timeout,
             )
-        except ConnectionError:
-            logger.error("JSON API connection error")
-            raise Exception("A connection error occured")
-        except Timeout:
-            logger.error("JSON API timeout")
-            raise Exception("The request timed out")
+        except (Timeout, ConnectionError):
+            # running out of the request's own time budget is not a failure
+            # of the upstream
+            if (remaining := remaining_time()) is not None and remaining <= 0:
+                logger.error(f"Request time budget exhausted calling {url}")
+                raise TimeBudgetExceeded("Request time budget exhausted")
+            circuit_breaker.record_failure()
+            raise
         except TooManyRedirects:
             logger.error("JSON API had too many redirects")
             raise Exception("Too many redirects")
@@ -66,31 +169,99 @@ class JSONAPIClient:
             logger.error(f"Unknown JSON API exception: {e}")
             raise Exception(str(e))
         logger.debug(response.url)
+        if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
+        return response
+
+    def parse_response(self, response: Response) -> dict:
+        """Returns the decoded json of a 200 response, otherwise raises the
+        error matching its status code."""
         if response.status_code == codes.ok:
             try:
-                return response.json()
-            except JSONDecodeError:
+                return get_json_decoder()(response.content)
+            except ValueError:
                 logger.error("JSON API provided non-JSON response")
                 raise Exception("Non-JSON response provided")
         if response.status_code == HTTPStatus.BAD_REQUEST:
             logger.error(f"Bad request: {response.url}")
-            raise Exception("Bad request")
+            raise UpstreamClientError("Bad request")
         if response.status_code == HTTPStatus.FORBIDDEN:
             logger.warning("Forbidden")
-            raise Exception("Forbidden")
+            raise UpstreamClientError("Forbidden")
         if response.status_code == HTTPStatus.NOT_FOUND:
             logger.warning("Resource not found")
             raise ResourceNotFound("Resource not found")
         logger.error(f"JSON API responded with {response.status_code}")
+        if (
+            response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+            or response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        ):
+            raise UpstreamUnavailable("Request failed")
+        if response.status_code >= HTTPStatus.BAD_REQUEST:
+            raise UpstreamClientError("Request failed")
         raise Exception("Request failed")
 
+    def get(self, path="/") -> dict:
+        """Makes a request to the config API. Returns decoded json,
+        otherwise raises error"""
+        url = f"{self.api_url}/{path.lstrip('/')}"
+        headers = {
+            "Cache-Control": "no-cache",
+            # "Accept": "application/json",  # TODO: This breaks the API
+        }
+        circuit_breaker = get_circuit_breaker(self.api_url)
+        get_retry_budget(self.api_url).record_call()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.send_request(url, headers, circuit_breaker)
+            # ConnectTimeout is both a Timeout and a ConnectionError
+            except Timeout:
+                logger.error("JSON API timeout")
+                if self.can_retry(attempt, url, "timeout"):
+                    continue
+                raise UpstreamUnavailable("The request timed out")
+            except ConnectionError:
+                logger.error("JSON API connection error")
+                if self.can_retry(attempt, url, "connection error"):
+                    continue
+                raise UpstreamUnavailable("A connection error occured")
+            if response.status_code in RETRY_STATUSES and self.can_retry(
+                attempt, url, f"{response.status_code} response"
+            ):
+                continue
+            return self.parse_response(response)
+
+
+class AsyncJSONAPIClient(JSONAPIClient):
+    """
+    The async counterpart of JSONAPIClient, with the same error semantics.
+    Requests are made with the same pooled sessions from a worker thread, so
+    that the event loop can serve other requests while the upstream answers.
+    """
+
+    async def get(self, path="/") -> dict:
+        return await sync_to_async(super().get, thread_sensitive=False)(path)
+
 
 def rosetta_request_handler(uri, params={}) -> dict:
-    """Prepares and initiates the api url requested and returns response data"""
+    """Prepares and initiates the api url requested and returns response data.
+    Concurrent calls with the same uri and params share one upstream request."""
     api_url = settings.ROSETTA_API_URL
     if not api_url:
         raise Exception("ROSETTA_API_URL not set")
-    client = JSONAPIClient(api_url)
+    client = JSONAPIClient(
+        api_url,
+        timeout=(
+            settings.ROSETTA_API_CONNECT_TIMEOUT,
+            settings.ROSETTA_API_READ_TIMEOUT,
+        ),
+        retries=settings.ROSETTA_API_RETRIES,
+    )
     client.add_parameters(params)
-    data = client.get(uri)
-    return data
+    return rosetta_single_flight.do(
+        f"{uri}?{normalise_params(params)}", lambda: client.get(uri)
+    )
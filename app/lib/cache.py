@@ -0,0 +1,413 @@
+"""
+Caching of decoded upstream API responses and of expensive, deterministic
+transformations of their content.
+"""
+
+import hashlib
+import logging
+import pickle
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlencode
+
+from app.lib.circuit_breaker import CircuitOpen
+from app.lib.deadline import TimeBudgetExceeded
+from app.lib.exceptions import (
+    ResourceNotFound,
+    UpstreamClientError,
+    UpstreamUnavailable,
+)
+from app.lib.metrics import incr
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest
+from requests import ConnectionError, Timeout
+
+logger = logging.getLogger(__name__)
+
+# Upstream errors the last good value is served for, the upstream is
+# expected to recover
+TRANSIENT_ERRORS = (
+    CircuitOpen,
+    ConnectionError,
+    TimeBudgetExceeded,
+    Timeout,
+    UpstreamUnavailable,
+)
+
+# Upstream errors the last good value is dropped for, the upstream no
+# longer has the data or refuses the request
+GONE_ERRORS = (ResourceNotFound, UpstreamClientError)
+
+# Bounded pool of threads refreshing stale cache entries in the background
+_refresh_executor: ThreadPoolExecutor | None = None
+_refresh_executor_lock = threading.Lock()
+
+
+def get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=settings.CACHE_REFRESH_WORKERS,
+                thread_name_prefix="cache-refresh",
+            )
+        return _refresh_executor
+
+
+def use_cache(request: HttpRequest) -> bool:
+    """Returns False when the request asks to skip cached upstream
+    responses with the API_CACHE_BYPASS_HEADER header, for debugging. The
+    header is only honoured in DEBUG or when it holds API_CACHE_BYPASS_TOKEN,
+    so that clients cannot send every request to the upstream."""
+    if not (value := request.headers.get(settings.API_CACHE_BYPASS_HEADER)):
+        return True
+    if settings.DEBUG:
+        return False
+    if token := settings.API_CACHE_BYPASS_TOKEN:
+        return not secrets.compare_digest(value.encode(), token.encode())
+    return True
+
+
+def normalise_params(params: dict[str, Any]) -> str:
+    """Returns `params` as a query string with the keys in a stable order,
+    so that the same request always maps to the same cache entry."""
+    return urlencode(sorted(params.items()), doseq=True)
+
+
+class LRUCache:
+    """
+    A bounded, in-process cache with a time to live. Once it holds the max
+    number of entries, the least recently used entry is evicted.
+
+    Values are stored as they are, callers must not modify them.
+
+    name: used for the hit/miss counters
+    timeout_setting: the setting holding the TTL in seconds, 0 disables
+    max_entries_setting: the setting holding the max number of entries
+    """
+
+    def __init__(
+        self, name: str, timeout_setting: str, max_entries_setting: str
+    ):
+        self.name = name
+        self.timeout_setting = timeout_setting
+        self.max_entries_setting = max_entries_setting
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> int:
+        return getattr(settings, self.timeout_setting)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.timeout)
+
+    def get(self, key: Any) -> Any | None:
+        """Returns the cached value, None when missing, expired or disabled."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                expires, value = self._entries[key]
+            except KeyError:
+                value = None
+            else:
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                else:
+                    del self._entries[key]
+                    value = None
+        incr(f"{self.name}.{'misses' if value is None else 'hits'}")
+        return value
+
+    def set(self, key: Any, value: Any):
+        if not self.enabled:
+            return
+        max_entries = getattr(settings, self.max_entries_setting)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Any):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ContentCache:
+    """
+    Memoises the result of a deterministic computation, keyed by a hash of
+    its inputs and the build version. Results are kept in a bounded
+    in-process LRU cache and, optionally, in one of Django's caches so that
+    they can be shared between workers.
+
+    name: used for the cache key prefix and the hit/miss counters
+    timeout_setting: the setting holding the TTL in seconds, 0 disables
+    max_entries_setting: the setting holding the max number of entries
+    shared_cache_setting: the setting holding the alias of the shared
+        cache, an empty str keeps results in process only
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout_setting: str,
+        max_entries_setting: str,
+        shared_cache_setting: str,
+    ):
+        self.name = name
+        self.shared_cache_setting = shared_cache_setting
+        self.local = LRUCache(name, timeout_setting, max_entries_setting)
+
+    @property
+    def shared_cache(self):
+        if alias := getattr(settings, self.shared_cache_setting):
+            return caches[alias]
+        return None
+
+    def key(self, *parts: str) -> str:
+        digest = hashlib.sha256(
+            "\0".join((settings.BUILD_VERSION, *parts)).encode()
+        ).hexdigest()
+        return f"{self.name}:{digest}"
+
+    def get_or_set(self, parts: tuple[str, ...], compute: Callable[[], Any]):
+        """Returns the cached result for `parts`, otherwise calls `compute`
+        and caches its result."""
+        if not self.local.enabled:
+            return compute()
+        key = self.key(*parts)
+        if (value := self.local.get(key)) is not None:
+            return value
+        shared_cache = self.shared_cache
+        if shared_cache is not None:
+            if (value := shared_cache.get(key)) is not None:
+                incr(f"{self.name}.shared_hits")
+                self.local.set(key, value)
+                return value
+        value = compute()
+        self.local.set(key, value)
+        if shared_cache is not None:
+            shared_cache.set(key, value, self.local.timeout)
+        return value
+
+    def clear(self):
+        """Clears the in-process entries."""
+        self.local.clear()
+
+
+class StaleWhileRevalidateCache:
+    """
+    Caches upstream data in one of Django's caches with separate fresh and
+    stale windows. Fresh values are returned as they are. Stale values are
+    returned straight away while a background thread fetches a new value,
+    only one refresh per key runs at a time. Past the stale window, a new
+    value is fetched and, if the upstream is unavailable, the last good value
+    is returned for up to the stale-if-error window. The entry is deleted
+    when the upstream no longer has the data.
+
+    Django's caches store values pickled, so every hit returns a fresh copy
+    that the caller is free to modify.
+
+    name: used for the cache key prefix and the hit/miss counters
+    fresh_timeout_setting: the setting holding the fresh window in seconds,
+        0 disables the cache
+    stale_timeout_setting: the setting holding how long, in seconds, a value
+        is served while it is refreshed once the fresh window has passed
+    stale_if_error_timeout_setting: the setting holding how long, in
+        seconds, the last good value is served when the upstream fails once
+        the fresh window has passed, None never serves it
+    max_entry_size_setting: the setting holding the largest entry, in bytes,
+        None does not limit it
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fresh_timeout_setting: str,
+        stale_timeout_setting: str,
+        stale_if_error_timeout_setting: str | None = None,
+        max_entry_size_setting: str | None = None,
+        cache_alias: str = "api",
+    ):
+        self.name = name
+        self.fresh_timeout_setting = fresh_timeout_setting
+        self.stale_timeout_setting = stale_timeout_setting
+        self.stale_if_error_timeout_setting = stale_if_error_timeout_setting
+        self.max_entry_size_setting = max_entry_size_setting
+        self.cache_alias = cache_alias
+
+    @property
+    def fresh_timeout(self) -> int:
+        return getattr(settings, self.fresh_timeout_setting)
+
+    @property
+    def stale_timeout(self) -> int:
+        return getattr(settings, self.stale_timeout_setting)
+
+    @property
+    def stale_if_error_timeout(self) -> int:
+        if self.stale_if_error_timeout_setting is None:
+            return 0
+        return getattr(settings, self.stale_if_error_timeout_setting)
+
+    @property
+    def timeout(self) -> int:
+        """How long entries are kept in the cache, in seconds."""
+        return self.fresh_timeout + max(
+            self.stale_timeout, self.stale_if_error_timeout
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.fresh_timeout)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def cache_key(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return f"{self.name}:{digest}"
+
+    def make_entry(self, data: Any) -> dict[str, Any] | None:
+        """Returns the cache entry for `data`, None when it is too large."""
+        if self.max_entry_size_setting is not None:
+            size = len(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+            if size > getattr(settings, self.max_entry_size_setting):
+                logger.info(f"{self.name}: not caching entry of {size} bytes")
+                incr(f"{self.name}.oversized")
+                return None
+        now = time.time()
+        return {
+            "data": data,
+            "fresh_until": now + self.fresh_timeout,
+            "stale_until": now + self.fresh_timeout + self.stale_timeout,
+        }
+
+    def store(self, cache_key: str, data: Any):
+        if (entry := self.make_entry(data)) is not None:
+            self.cache.set(cache_key, entry, self.timeout)
+
+    async def astore(self, cache_key: str, data: Any):
+        if (entry := self.make_entry(data)) is not None:
+            await self.cache.aset(cache_key, entry, self.timeout)
+
+    def refresh(self, cache_key: str, fetch: Callable[[], Any]):
+        """Fetches and stores a new value, the stale value is kept if the
+        fetch fails, unless the upstream no longer has the data."""
+        try:
+            self.store(cache_key, fetch())
+            incr(f"{self.name}.refreshes")
+        except GONE_ERRORS as e:
+            logger.info(f"{self.name}: dropping {cache_key}: {e}")
+            self.cache.delete(cache_key)
+            incr(f"{self.name}.evictions")
+        except Exception as e:
+            logger.error(
+                f"{self.name}: background refresh of {cache_key} failed: {e}"
+            )
+            incr(f"{self.name}.refresh_errors")
+        finally:
+            self.cache.delete(f"{cache_key}:refreshing")
+
+    def check_entry(self, entry: dict[str, Any] | None) -> str:
+        """Returns "fresh", "stale" or "expired" and counts it."""
+        if entry is None:
+            incr(f"{self.name}.misses")
+            return "expired"
+        now = time.time()
+        if entry["fresh_until"] > now:
+            incr(f"{self.name}.hits")
+            return "fresh"
+        if entry["stale_until"] > now:
+            incr(f"{self.name}.stale_hits")
+            return "stale"
+        incr(f"{self.name}.misses")
+        return "expired"
+
+    def serve_stale_on_error(
+        self, key: str, entry: dict[str, Any] | None, error: Exception
+    ) -> Any:
+        """Returns the last good value after a transient `error`, re-raises
+        `error` when there is none or the error is not transient."""
+        if entry is None or not isinstance(error, TRANSIENT_ERRORS):
+            raise error
+        logger.warning(
+            f"{self.name}: serving stale {key} after upstream error: {error}"
+        )
+        incr(f"{self.name}.stale_on_error")
+        return entry["data"]
+
+    def get(self, key: str, fetch: Callable[[], Any], use_cache=True) -> Any:
+        """Returns the cached value for `key`, otherwise calls `fetch` and
+        caches its result. Errors raised by `fetch` are not cached, the
+        entry is deleted on ResourceNotFound and 4xx errors.
+        use_cache: False skips reading a cached value, a fresh value is still
+        cached"""
+        if not self.enabled:
+            return fetch()
+        cache_key = self.cache_key(key)
+        entry = self.cache.get(cache_key) if use_cache else None
+        state = self.check_entry(entry)
+        if state == "fresh":
+            return entry["data"]
+        if state == "stale":
+            if self.cache.add(
+                f"{cache_key}:refreshing", True, self.fresh_timeout
+            ):
+                get_refresh_executor().submit(self.refresh, cache_key, fetch)
+            return entry["data"]
+        try:
+            data = fetch()
+        except GONE_ERRORS:
+            self.cache.delete(cache_key)
+            raise
+        except Exception as e:
+            return self.serve_stale_on_error(key, entry, e)
+        self.store(cache_key, data)
+        return data
+
+    async def aget(
+        self, key: str, fetch: Callable[[], Awaitable[Any]], use_cache=True
+    ) -> Any:
+        """Async version of get, `fetch` is awaited."""
+        if not self.enabled:
+            return await fetch()
+        cache_key = self.cache_key(key)
+        entry = await self.cache.aget(cache_key) if use_cache else None
+        state = self.check_entry(entry)
+        if state == "fresh":
+            return entry["data"]
+        if state == "stale":
+            if await self.cache.aadd(
+                f"{cache_key}:refreshing", True, self.fresh_timeout
+            ):
+                get_refresh_executor().submit(
+                    self.refresh, cache_key, async_to_sync(fetch)
+                )
+            return entry["data"]
+        try:
+            data = await fetch()
+        except GONE_ERRORS:
+            await self.cache.adelete(cache_key)
+            raise
+        except Exception as e:
+            return self.serve_stale_on_error(key, entry, e)
+        await self.astore(cache_key, data)
+        return data
@@ -0,0 +1,104 @@
+"""
+Circuit breakers for upstream APIs.
+
+After CIRCUIT_BREAKER_FAILURE_THRESHOLD consecutive failures (0 disables
+the breakers), calls to an upstream fail straight away for
+CIRCUIT_BREAKER_RESET_TIMEOUT seconds, instead of each request waiting on a
+connection that is bound to fail.
+Then a single call is let through to probe the upstream: the breaker
+closes if it succeeds, and opens again if it fails.
+"""
+
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+from app.lib.metrics import incr
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Process-wide breakers, one per upstream base URL
+_breakers: dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Tracks the consecutive failures of one upstream, in this process.
+
+    name: used in logs and for the state change counters
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        log = logger.info if state == CLOSED else logger.warning
+        log(f"Circuit breaker for {self.name} {self.state} -> {state}")
+        incr(f"circuit_breaker.{self.name}.{state}")
+        self.state = state
+
+    def before_call(self):
+        """Raises CircuitOpen when the upstream must not be called."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if (
+                time.monotonic() - self.opened_at
+                >= settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+            ):
+                # let this call probe the upstream, or another call if the
+                # last probe never completed
+                self.opened_at = time.monotonic()
+                self._set_state(HALF_OPEN)
+                return
+        incr(f"circuit_breaker.{self.name}.rejected")
+        raise CircuitOpen(f"{self.name} is unavailable")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        threshold = settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        if not threshold:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+
+def get_circuit_breaker(api_url: str) -> CircuitBreaker:
+    """Returns the breaker for the upstream at `api_url`, creating it on
+    first use."""
+    if breaker := _breakers.get(api_url):
+        return breaker
+    with _breakers_lock:
+        if api_url not in _breakers:
+            _breakers[api_url] = CircuitBreaker(urlparse(api_url).netloc)
+        return _breakers[api_url]
+
+
+def reset_circuit_breakers():
+    """Discards all breakers, closing every circuit."""
+    with _breakers_lock:
+        _breakers.clear()
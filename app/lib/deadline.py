@@ -0,0 +1,71 @@
+"""
+Per-request time budget.
+
+A view sets a total time budget with the `time_budget` decorator and every
+upstream call made while handling that request reads what is left of it
+with `remaining_time`, so that slow upstreams fail fast instead of tying up
+the worker.
+"""
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+_deadline: ContextVar[float | None] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class TimeBudgetExceeded(Exception):
+    pass
+
+
+def remaining_time() -> float | None:
+    """Returns the seconds left in the current budget, None if no budget is set."""
+    if (deadline := _deadline.get()) is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def request_deadline(seconds: float):
+    """Sets a budget of `seconds` for the enclosed block. A nested budget
+    can only shorten the deadline that is already in place."""
+    deadline = time.monotonic() + seconds
+    if (current := _deadline.get()) is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_budget(seconds: float | None = None):
+    """
+    View decorator that limits the total time spent on upstream calls while
+    handling a request. Defaults to the REQUEST_TIME_BUDGET setting.
+    """
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+
+            @functools.wraps(view_func)
+            async def _wrapped_view(*args, **kwargs):
+                with request_deadline(seconds or settings.REQUEST_TIME_BUDGET):
+                    return await view_func(*args, **kwargs)
+
+        else:
+
+            @functools.wraps(view_func)
+            def _wrapped_view(*args, **kwargs):
+                with request_deadline(seconds or settings.REQUEST_TIME_BUDGET):
+                    return view_func(*args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
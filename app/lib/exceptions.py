@@ -0,0 +1,21 @@
+"""
+Errors raised for failed upstream API calls.
+
+They are kept apart from the API client so that the caches can tell an
+upstream that is briefly unavailable, whose last good response is still
+worth serving, from one that no longer has the data.
+"""
+
+
+class ResourceNotFound(Exception):
+    pass
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream could not be reached, timed out or answered with a
+    5xx or 429 response."""
+
+
+class UpstreamClientError(Exception):
+    """The upstream rejected the request with a 4xx response other than
+    404 and 429."""
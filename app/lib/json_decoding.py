@@ -0,0 +1,67 @@
+"""
+Decoding of upstream JSON responses.
+
+orjson or msgspec are used when installed, they decode large Rosetta
+payloads several times faster than the standard library. The JSON_DECODER
+setting picks one of DECODERS, "auto" uses the fastest one installed.
+"""
+
+import functools
+import json
+import logging
+from typing import Any, Callable
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def decode_json(content: bytes) -> Any:
+    return json.loads(content)
+
+
+def decode_orjson(content: bytes) -> Any:
+    # orjson.JSONDecodeError is a subclass of ValueError
+    return orjson.loads(content)
+
+
+def decode_msgspec(content: bytes) -> Any:
+    try:
+        return msgspec.json.decode(content)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
+
+
+# In order of preference
+DECODERS: dict[str, Callable[[bytes], Any]] = {}
+if orjson is not None:
+    DECODERS["orjson"] = decode_orjson
+if msgspec is not None:
+    DECODERS["msgspec"] = decode_msgspec
+DECODERS["json"] = decode_json
+
+
+def get_json_decoder() -> Callable[[bytes], Any]:
+    """Returns the decoder picked by the JSON_DECODER setting, all decoders
+    raise ValueError on invalid JSON."""
+    return _get_json_decoder(settings.JSON_DECODER)
+
+
+@functools.cache
+def _get_json_decoder(name: str) -> Callable[[bytes], Any]:
+    if name == "auto":
+        return next(iter(DECODERS.values()))
+    if name not in DECODERS:
+        logger.warning(f"JSON decoder {name} is not installed, using json")
+        return decode_json
+    return DECODERS[name]
@@ -0,0 +1,27 @@
+"""
+Process-local counters for the app's caches and upstream clients, exposed
+by the healthcheck app at /healthcheck/metrics/.
+"""
+
+import threading
+from collections import Counter
+
+_counters: Counter = Counter()
+_lock = threading.Lock()
+
+
+def incr(name: str, value: int | float = 1):
+    """Adds `value` to the counter `name`."""
+    with _lock:
+        _counters[name] += value
+
+
+def get_metrics() -> dict[str, int | float]:
+    """Returns a snapshot of all counters."""
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def reset_metrics():
+    with _lock:
+        _counters.clear()
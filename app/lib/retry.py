@@ -0,0 +1,73 @@
+"""
+Retries of idempotent upstream calls.
+
+Failed calls are retried after a jittered exponential backoff. Retries are
+drawn from a budget per upstream that only grows with the calls made to it,
+so that retries stay a fraction of the traffic and cannot amplify an outage.
+"""
+
+import random
+import threading
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+# Process-wide budgets, one per upstream base URL
+_budgets: dict[str, "RetryBudget"] = {}
+_budgets_lock = threading.Lock()
+
+
+def backoff_delay(attempt: int) -> float:
+    """Returns the seconds to wait before retry number `attempt` (from 1),
+    picked at random up to an exponentially growing cap ("full jitter")."""
+    cap = min(
+        settings.JSON_API_RETRY_BACKOFF_MAX,
+        settings.JSON_API_RETRY_BACKOFF * 2 ** (attempt - 1),
+    )
+    return random.uniform(0, cap)
+
+
+class RetryBudget:
+    """
+    Every call deposits JSON_API_RETRY_BUDGET_RATIO of a token and every
+    retry withdraws a whole token, up to JSON_API_RETRY_BUDGET_MAX tokens.
+
+    name: the upstream the budget is for
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.tokens = float(settings.JSON_API_RETRY_BUDGET_MAX)
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self.tokens = min(
+                self.tokens + settings.JSON_API_RETRY_BUDGET_RATIO,
+                settings.JSON_API_RETRY_BUDGET_MAX,
+            )
+
+    def withdraw(self) -> bool:
+        """Returns True when a retry can be made."""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+def get_retry_budget(api_url: str) -> RetryBudget:
+    """Returns the retry budget for the upstream at `api_url`, creating it
+    on first use."""
+    if budget := _budgets.get(api_url):
+        return budget
+    with _budgets_lock:
+        if api_url not in _budgets:
+            _budgets[api_url] = RetryBudget(urlparse(api_url).netloc)
+        return _budgets[api_url]
+
+
+def reset_retry_budgets():
+    """Discards all budgets, refilling them."""
+    with _budgets_lock:
+        _budgets.clear()
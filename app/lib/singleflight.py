@@ -0,0 +1,144 @@
+"""
+Coalescing of identical in-flight upstream calls.
+
+When many requests ask for the same upstream resource at the same moment,
+e.g. right after a cache entry expires, only the first one calls the
+upstream and the others wait for, and share, its result.
+"""
+
+import hashlib
+import logging
+import pickle
+import threading
+import time
+from typing import Any, Callable
+
+from app.lib.deadline import TimeBudgetExceeded, remaining_time
+from app.lib.metrics import incr
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        self.payload: bytes | None = None
+        self.error: BaseException | None = None
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """Returns an exception of the same type and message as `error`."""
+    try:
+        return type(error)(*error.args)
+    except Exception:
+        return Exception(str(error))
+
+
+class SingleFlight:
+    """
+    Runs a single call per key at a time. Threads of the same process asking
+    for a key that is already being fetched wait for the running call and get
+    a copy of its result, or have its error raised.
+
+    When SINGLE_FLIGHT_CACHE names a cache in CACHES, calls are also
+    coalesced between processes: the process holding the lock in that cache
+    makes the call and shares the result for a few seconds, the others poll
+    for it for up to SINGLE_FLIGHT_LOCK_TIMEOUT seconds, then make the call
+    themselves.
+
+    name: used for the cache key prefix and the counters
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared_cache(self):
+        if alias := settings.SINGLE_FLIGHT_CACHE:
+            return caches[alias]
+        return None
+
+    def cache_key(self, key: str) -> str:
+        return f"{self.name}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Returns the result of `fn`, sharing it with concurrent callers
+        of the same `key`."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+        if not leader:
+            incr(f"{self.name}.coalesced")
+            call.done.wait(remaining_time())
+            if not call.done.is_set():
+                # the running call outlived this request's time budget
+                return fn()
+            if call.error is not None:
+                if isinstance(call.error, TimeBudgetExceeded) and (
+                    (remaining := remaining_time()) is None or remaining > 0
+                ):
+                    # the leader ran out of its own time budget, not this one
+                    return fn()
+                # a new exception, threads must not share one traceback
+                raise _copy_error(call.error) from call.error
+            return pickle.loads(call.payload)
+        try:
+            result = self._do_shared(key, fn)
+            if self._release(key, call):
+                # a snapshot, the caller is free to modify its result
+                call.payload = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+            return result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._release(key, call)
+            call.done.set()
+
+    def _release(self, key: str, call: _Call) -> int:
+        """Stops `call` taking on followers, returns how many it has."""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            return call.followers
+
+    def _do_shared(self, key: str, fn: Callable[[], Any]) -> Any:
+        if (cache := self.shared_cache) is None:
+            return fn()
+        cache_key = self.cache_key(key)
+        lock_key = f"{cache_key}:lock"
+        lock_timeout = settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+        if not cache.add(lock_key, True, lock_timeout):
+            wait = lock_timeout
+            if (remaining := remaining_time()) is not None:
+                wait = min(wait, remaining)
+            give_up_at = time.monotonic() + wait
+            while time.monotonic() < give_up_at:
+                if (payload := cache.get(cache_key)) is not None:
+                    incr(f"{self.name}.shared_coalesced")
+                    return pickle.loads(payload)
+                if cache.get(lock_key) is None:
+                    break
+                time.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+            else:
+                logger.warning(f"{self.name}: gave up waiting for {key}")
+            return fn()
+        try:
+            result = fn()
+            cache.set(
+                cache_key,
+                pickle.dumps(result, pickle.HIGHEST_PROTOCOL),
+                settings.SINGLE_FLIGHT_RESULT_TIMEOUT,
+            )
+            return result
+        finally:
+            cache.delete(lock_key)
@@ -0,0 +1,54 @@
+"""
+Compact models with lazily computed fields.
+
+Fields marked with `cached_slot` behave like Django's `cached_property`,
+computed on first access and kept, but they are kept in a slot of the same
+name instead of the instance `__dict__`. Once set, reading a field is a
+plain slot read.
+"""
+
+from typing import Any, Callable
+
+
+class cached_slot:
+    """Marks a method of a SlottedModel as a field computed on first access."""
+
+    def __init__(self, func: Callable[[Any], Any]):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+
+class SlottedModelMeta(type):
+    """Turns the `cached_slot` methods of a class into slots, the methods
+    are kept in `_cached_slots` to compute the fields."""
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        getters = {
+            attr: value.func
+            for attr, value in namespace.items()
+            if isinstance(value, cached_slot)
+        }
+        for attr in getters:
+            del namespace[attr]
+        namespace["__slots__"] = (*namespace.get("__slots__", ()), *getters)
+        inherited = {}
+        for base in reversed(bases):
+            inherited |= getattr(base, "_cached_slots", {})
+        namespace["_cached_slots"] = inherited | getters
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class SlottedModel(metaclass=SlottedModelMeta):
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for slots that are not set yet
+        try:
+            getter = type(self)._cached_slots[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+        value = getter(self)
+        object.__setattr__(self, name, value)
+        return value
@@ -1,7 +1,14 @@
+import hashlib
 import logging
+import threading
+import time
 
+from app.lib.metrics import incr
 from lxml import etree, html
 
+XSLT_DIR = "app/resources/xslt"
+GENERIC_XSLT = "Generic.xsl"
+
 SCHEMAS = {
     "Airwomen": "Airwomen.xsl",
     "AliensRegCards": "AliensRegCards.xsl",
@@ -53,6 +60,68 @@ SERIES_TRANSFORMATIONS = {
 
 logger = logging.getLogger(__name__)
 
+# Process-level registry of compiled stylesheets and a hash of their
+# content, by file name
+_compiled_xslt: dict[str, etree.XSLT] = {}
+_xslt_versions: dict[str, str] = {}
+_compiled_xslt_lock = threading.Lock()
+
+
+def compile_xslt(schema_file: str) -> tuple[etree.XSLT, str]:
+    """Parses and compiles the stylesheet `schema_file`, recording the
+    number of compiles and the time taken in the app metrics.
+    Returns the compiled stylesheet and a hash of its content."""
+    start = time.perf_counter()
+    path = f"{XSLT_DIR}/{schema_file}"
+    with open(path, "rb") as file:
+        content = file.read()
+    transform = etree.XSLT(etree.fromstring(content, base_url=path))
+    incr("xslt.compiles")
+    incr("xslt.compile_time_ms", (time.perf_counter() - start) * 1000)
+    return transform, hashlib.sha256(content).hexdigest()[:12]
+
+
+def _load_xslt(schema_file: str):
+    with _compiled_xslt_lock:
+        if schema_file not in _compiled_xslt:
+            transform, version = compile_xslt(schema_file)
+            _xslt_versions[schema_file] = version
+            _compiled_xslt[schema_file] = transform
+
+
+def get_xslt(schema_file: str) -> etree.XSLT:
+    """Returns the compiled stylesheet for `schema_file`, compiling it on
+    first use."""
+    if schema_file not in _compiled_xslt:
+        _load_xslt(schema_file)
+    return _compiled_xslt[schema_file]
+
+
+def get_xslt_version(schema_file: str) -> str:
+    """Returns a hash of the content of `schema_file`, empty str if the
+    stylesheet cannot be loaded."""
+    try:
+        get_xslt(schema_file)
+    except Exception:
+        return ""
+    return _xslt_versions[schema_file]
+
+
+def warm_up_xslt():
+    """Compiles every known stylesheet, so that no request pays for it."""
+    schema_files = {
+        *SCHEMAS.values(),
+        *SERIES_TRANSFORMATIONS.values(),
+        GENERIC_XSLT,
+    }
+    for schema_file in sorted(schema_files):
+        try:
+            get_xslt(schema_file)
+        except Exception as e:
+            logger.warning(
+                f"Unexpected error while loading XSLT file '{schema_file}': {e}"
+            )
+
 
 def xsl_transformation(source: str, schema_file: str) -> str:
     if not source:
@@ -60,27 +129,34 @@ def xsl_transformation(source: str, schema_file: str) -> str:
         return ""
     dom = html.fromstring(source)
     try:
-        xslt = etree.parse(f"app/resources/xslt/{schema_file}")
+        transform = get_xslt(schema_file)
     except Exception as e:
         logger.error(
             f"Unexpected error while loading XSLT file '{schema_file}': {e}"
         )
         return source
-    transform = etree.XSLT(xslt)
     result = transform(dom)
+    incr("xslt.transforms")
     return str(result).strip()
 
 
+def get_schema_xsl(schema: str) -> str:
+    return SCHEMAS.get(schema, GENERIC_XSLT)
+
+
+def get_series_xsl(division: str) -> str | None:
+    return SERIES_TRANSFORMATIONS.get(division)
+
+
 def apply_schema_xsl(source: str, schema: str) -> str:
-    schema_xslt = SCHEMAS.get(schema, "Generic.xsl")
-    return xsl_transformation(source, schema_xslt)
+    return xsl_transformation(source, get_schema_xsl(schema))
 
 
 def apply_series_xsl(source: str, division: str) -> str:
-    if schema := SERIES_TRANSFORMATIONS.get(division):
+    if schema := get_series_xsl(division):
         return xsl_transformation(source, schema)
     return source
 
 
 def apply_generic_xsl(source: str) -> str:
-    return xsl_transformation(source, "Generic.xsl")
+    return xsl_transformation(source, GENERIC_XSLT)
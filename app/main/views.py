@@ -1,12 +1,23 @@
+import asyncio
 import logging
+from functools import partial
 
-from app.lib.api import JSONAPIClient
+from app.lib.api import AsyncJSONAPIClient
+from app.lib.cache import StaleWhileRevalidateCache
+from app.lib.deadline import time_budget
 from django.conf import settings
 from django.http import HttpResponse
 from django.template import loader
 
 logger = logging.getLogger(__name__)
 
+# Wagtail page listings change a few times a day at most
+catalogue_pages_cache = StaleWhileRevalidateCache(
+    "catalogue_pages_cache",
+    "WAGTAIL_PAGES_CACHE_TIMEOUT",
+    "WAGTAIL_PAGES_CACHE_STALE_TIMEOUT",
+)
+
 
 def index(request):
     template = loader.get_template("main/index.html")
@@ -14,39 +25,50 @@ def index(request):
     return HttpResponse(template.render(context, request))
 
 
-def catalogue(request):
-    template = loader.get_template("main/catalogue.html")
-    context = {}
-
-    pages_client = JSONAPIClient(settings.WAGTAIL_API_URL)
+async def get_wagtail_child_pages(parent_page_id: int) -> list[dict]:
+    """Returns the three most recently published child pages of a Wagtail page."""
+    pages_client = AsyncJSONAPIClient(
+        settings.WAGTAIL_API_URL,
+        timeout=(
+            settings.WAGTAIL_API_CONNECT_TIMEOUT,
+            settings.WAGTAIL_API_READ_TIMEOUT,
+        ),
+        retries=settings.WAGTAIL_API_RETRIES,
+    )
     pages_client.add_parameters(
         {
-            "child_of": settings.WAGTAIL_EXPLORE_THE_COLLECTION_PAGE_ID,
+            "child_of": parent_page_id,
             "limit": 3,
             "order": "-first_published_at",
         }
     )
+    response_data = await pages_client.get("/pages/")
+    return response_data.get("items", [])
+
+
+async def get_catalogue_pages(parent_page_id: int) -> list[dict]:
+    """Returns the cached child pages of a Wagtail page, an empty list when
+    they cannot be fetched. Each listing is cached on its own, so that one
+    failing listing does not empty or get cached with the other."""
     try:
-        response_data = pages_client.get("/pages/")
-        context["pages"] = response_data.get("items", [])
+        return await catalogue_pages_cache.aget(
+            f"child_pages:{parent_page_id}",
+            partial(get_wagtail_child_pages, parent_page_id),
+        )
     except Exception as e:
         logger.error(e)
-        context["pages"] = []
+        return []
 
-    top_pages_client = JSONAPIClient(settings.WAGTAIL_API_URL)
-    top_pages_client.add_parameters(
-        {
-            "child_of": settings.WAGTAIL_HOME_PAGE_ID,
-            "limit": 3,
-            "order": "-first_published_at",
-        }
+
+@time_budget()
+async def catalogue(request):
+    template = loader.get_template("main/catalogue.html")
+    # the listings are fetched concurrently
+    pages, top_pages = await asyncio.gather(
+        get_catalogue_pages(settings.WAGTAIL_EXPLORE_THE_COLLECTION_PAGE_ID),
+        get_catalogue_pages(settings.WAGTAIL_HOME_PAGE_ID),
     )
-    try:
-        response_data = top_pages_client.get("/pages/")
-        context["top_pages"] = response_data.get("items", [])
-    except Exception as e:
-        logger.error(e)
-        context["top_pages"] = []
+    context = {"pages": pages, "top_pages": top_pages}
 
     return HttpResponse(template.render(context, request))
 
@@ -1,22 +1,50 @@
 from app.lib.api import ResourceNotFound, rosetta_request_handler
+from app.lib.cache import StaleWhileRevalidateCache, normalise_params
 from app.records.models import APIResponse, Record
+from asgiref.sync import sync_to_async
 
+# Raw "@template.details" payloads, shared by the details, related and
+# help views of a record
+record_cache = StaleWhileRevalidateCache(
+    "record_cache",
+    "RECORD_CACHE_TIMEOUT",
+    "RECORD_CACHE_STALE_TIMEOUT",
+    "RECORD_CACHE_STALE_IF_ERROR_TIMEOUT",
+)
 
-def record_details_by_id(id, params={}) -> Record:
+
+def record_details_by_id(id, params=None, use_cache=True) -> Record:
     """Fetches a record by its ID from the Rosetta API.
+    use_cache: False skips reading a cached record, a fresh record is still cached
     The errors are handled by a custom middleware in the app."""
     uri = "get"
-    params.update({"id": id})
-    results = rosetta_request_handler(uri, params)
-    if "data" not in results:
-        raise Exception(f"No data returned for id {id}")
-    if len(results["data"]) > 1:
-        raise Exception(f"Multiple records returned for id {id}")
-    if len(results["data"]) == 1:
-        record_data = results["data"][0]
-        response = APIResponse(record_data)
-        return response.record
-    raise ResourceNotFound(f"id {id} does not exist")
+    # a local copy, `fetch` may run later on a background refresh thread
+    params = {**(params or {}), "id": id}
+
+    def fetch():
+        results = rosetta_request_handler(uri, params)
+        if "data" not in results:
+            raise Exception(f"No data returned for id {id}")
+        if len(results["data"]) > 1:
+            raise Exception(f"Multiple records returned for id {id}")
+        if len(results["data"]) == 1:
+            record_data = results["data"][0]
+            response = APIResponse(record_data)
+            return response.record._raw
+        raise ResourceNotFound(f"id {id} does not exist")
+
+    details = record_cache.get(
+        normalise_params(params), fetch, use_cache=use_cache
+    )
+    return Record(details, eager=True)
+
+
+async def arecord_details_by_id(id, params=None, use_cache=True) -> Record:
+    """Async version of record_details_by_id, the record is fetched from a
+    worker thread."""
+    return await sync_to_async(record_details_by_id, thread_sensitive=False)(
+        id, params, use_cache
+    )
 
 
 def record_details_by_ref(reference, params={}):
@@ -0,0 +1,15 @@
+from app.deliveryoptions.delivery_options import load_delivery_options
+from app.lib.xslt_transformations import warm_up_xslt
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class RecordsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "app.records"
+    verbose_name = "Records"
+
+    def ready(self):
+        if settings.XSLT_WARM_UP:
+            warm_up_xslt()
+        load_delivery_options()
@@ -4,15 +4,26 @@ import logging
 import re
 from typing import Any
 
-from app.lib.xslt_transformations import apply_schema_xsl, apply_series_xsl
+from app.lib.cache import ContentCache
+from app.lib.slots import SlottedModel, cached_slot
+from app.lib.xslt_transformations import (
+    apply_schema_xsl,
+    apply_series_xsl,
+    get_schema_xsl,
+    get_series_xsl,
+    get_xslt_version,
+)
 from app.records.constants import NON_TNA_LEVELS, SUBJECTS_LIMIT, TNA_LEVELS
 from app.records.utils import (
+    RewrittenHTML,
     change_discovery_record_details_links,
     extract,
     format_extref_links,
     format_link,
+    record_url,
+    rewrite_record_links,
 )
-from django.urls import NoReverseMatch, reverse
+from django.urls import NoReverseMatch
 from django.utils.functional import cached_property
 from lxml import etree
 
@@ -20,8 +31,18 @@ from .converters import IDConverter
 
 logger = logging.getLogger(__name__)
 
+# Finished description HTML, keyed by the source and stylesheet it came from
+description_cache = ContentCache(
+    "description_cache",
+    "DESCRIPTION_CACHE_TIMEOUT",
+    "DESCRIPTION_CACHE_MAX_ENTRIES",
+    "DESCRIPTION_CACHE_SHARED_CACHE",
+)
+
 
 class APIModel:
+    __slots__ = ("_raw",)
+
     def __init__(self, raw_data: dict[str, Any]):
         self._raw = raw_data
 
@@ -51,46 +72,86 @@ class APIResponse(APIModel):
         raise Exception("Record template not found in response")
 
 
-class Record(APIModel):
-    def __init__(self, raw_data: dict[str, Any]):
+class Record(APIModel, SlottedModel):
+    """
+    A catalogue record. Fields are computed on first access and kept in
+    slots, see app.lib.slots.
+
+    page_record_is_tna: is_tna of the record whose page shows this record,
+    carried over to its hierarchy, next, previous and parent records
+    eager: fills the fields read as they are from the data in one pass, for
+    records whose fields are mostly all read, e.g. on record details pages
+    """
+
+    __slots__ = ("_page_record_is_tna",)
+
+    # Fields returned as they are from the api value of the attr when found,
+    # by api key
+    EAGER_FIELDS = {
+        "source": "source",
+        "title": "title",
+        "dateCovering": "date_covering",
+        "creator": "creator",
+        "dimensions": "dimensions",
+        "formerDepartmentReference": "former_department_reference",
+        "formerProReference": "former_pro_reference",
+        "language": "language",
+        "legalStatus": "legal_status",
+        "mapDesignation": "map_designation",
+        "mapScale": "map_scale",
+        "note": "note",
+        "physicalCondition": "physical_condition",
+        "physicalDescription": "physical_description",
+        "heldBy": "held_by",
+        "heldById": "held_by_id",
+        "accessCondition": "access_condition",
+        "closureStatus": "closure_status",
+        "recordOpening": "record_opening",
+        "accruals": "accruals",
+        "accumulationDates": "accumulation_dates",
+        "appraisalInformation": "appraisal_information",
+        "copiesInformation": "copies_information",
+        "custodialHistory": "custodial_history",
+        "immediateSourceOfAcquisition": "immediate_source_of_acquisition",
+        "locationOfOriginals": "location_of_originals",
+        "restrictionsOnUse": "restrictions_on_use",
+        "administrativeBackground": "administrative_background",
+        "arrangement": "arrangement",
+        "publicationNote": "publication_note",
+        "unpublishedFindingAids": "unpublished_finding_aids",
+        "digitised": "is_digitised",
+    }
+
+    def __init__(
+        self,
+        raw_data: dict[str, Any],
+        page_record_is_tna: bool = False,
+        eager: bool = False,
+    ):
         self._raw = raw_data
+        self._page_record_is_tna = page_record_is_tna
+        if eager:
+            for key, value in raw_data.items():
+                if field := self.EAGER_FIELDS.get(key):
+                    object.__setattr__(self, field, value)
 
     def __str__(self):
         return f"{self.summary_title} ({self.iaid})"
 
-    @cached_property
+    @cached_slot
     def iaid(self) -> str:
         """
         Return the "iaid" value for this record. If the data is unavailable,
         or is not a valid iaid, a blank string is returned.
         """
-        try:
-            candidate = self._raw["iaid"]
-        except KeyError:
-            # value from other places
-            candidate = self.get("@admin.id", default="")
-
-        if not candidate:
-            # value from other places
-            identifiers = self.get("identifier", ())
-            for item in identifiers:
-                try:
-                    candidate = item["iaid"]
-                except KeyError:
-                    candidate = ""
-
-        if candidate and re.match(IDConverter.regex, candidate):
-            # value is not guaranteed to be a valid 'iaid', so we must
-            # check it before returning it as one
-            return candidate
-        return ""
+        return get_iaid(self)
 
-    @cached_property
+    @cached_slot
     def source(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("source", "")
 
-    @cached_property
+    @cached_slot
     def custom_record_type(self) -> str:
         """
         Returns a custom record type.
@@ -98,125 +159,109 @@ class Record(APIModel):
         """
         return self.source
 
-    @cached_property
+    @cached_slot
     def reference_number(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
-        if candidate := self.get("referenceNumber", ""):
-            return candidate
+        return get_reference_number(self)
 
-        # value from other places
-        identifiers = self.get("identifier", [])
-        for item in identifiers:
-            try:
-                return item["reference_number"]
-            except KeyError:
-                pass
-
-        return ""
-
-    @cached_property
+    @cached_slot
     def title(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("title", "")
 
-    @cached_property
+    @cached_slot
     def summary_title(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
-        if details_summary_title := self.get("summaryTitle", ""):
-            return details_summary_title
-        return self.get("summary.title", "")
+        return get_summary_title(self)
 
-    @cached_property
+    @cached_slot
     def date_covering(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("dateCovering", "")
 
-    @cached_property
+    @cached_slot
     def creator(self) -> list[str]:
         """Returns the api value of the attr if found, empty list otherwise."""
         return self.get("creator", [])
 
-    @cached_property
+    @cached_slot
     def dimensions(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("dimensions", "")
 
-    @cached_property
+    @cached_slot
     def former_department_reference(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("formerDepartmentReference", "")
 
-    @cached_property
+    @cached_slot
     def former_pro_reference(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("formerProReference", "")
 
-    @cached_property
+    @cached_slot
     def language(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("language", "")
 
-    @cached_property
+    @cached_slot
     def legal_status(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("legalStatus", "")
 
-    @cached_property
+    @cached_slot
     def level(self) -> str:
         """Returns level name for tna, non tna level codes"""
         if self.is_tna:
             return TNA_LEVELS.get(str(self.level_code), "")
         return NON_TNA_LEVELS.get(str(self.level_code), "")
 
-    @cached_property
+    @cached_slot
     def level_code(self) -> int | None:
         """Returns the api value of the attr if found, None otherwise."""
         return self.get("level.code", None)
 
-    @cached_property
+    @cached_slot
     def map_designation(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("mapDesignation", "")
 
-    @cached_property
+    @cached_slot
     def map_scale(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("mapScale", "")
 
-    @cached_property
+    @cached_slot
     def note(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("note", "")
 
-    @cached_property
+    @cached_slot
     def physical_condition(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("physicalCondition", "")
 
-    @cached_property
+    @cached_slot
     def physical_description(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("physicalDescription", "")
 
-    @cached_property
+    @cached_slot
     def held_by(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("heldBy", "")
 
-    @cached_property
+    @cached_slot
     def held_by_id(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("heldById", "")
 
-    @cached_property
+    @cached_slot
     def held_by_url(self) -> str:
         """Returns url path if the id is found, empty str otherwise."""
         if self.held_by_id:
             try:
-                return reverse(
-                    "records:details",
-                    kwargs={"id": self.held_by_id},
-                )
+                return record_url(self.held_by_id)
             except NoReverseMatch:
                 # warning for partially valid record
                 logger.warning(
@@ -224,77 +269,77 @@ class Record(APIModel):
                 )
         return ""
 
-    @cached_property
+    @cached_slot
     def access_condition(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("accessCondition", "")
 
-    @cached_property
+    @cached_slot
     def closure_status(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("closureStatus", "")
 
-    @cached_property
+    @cached_slot
     def record_opening(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("recordOpening", "")
 
-    @cached_property
+    @cached_slot
     def accruals(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("accruals", "")
 
-    @cached_property
+    @cached_slot
     def accumulation_dates(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("accumulationDates", "")
 
-    @cached_property
+    @cached_slot
     def appraisal_information(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("appraisalInformation", "")
 
-    @cached_property
+    @cached_slot
     def copies_information(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("copiesInformation", "")
 
-    @cached_property
+    @cached_slot
     def custodial_history(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("custodialHistory", "")
 
-    @cached_property
+    @cached_slot
     def immediate_source_of_acquisition(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("immediateSourceOfAcquisition", "")
 
-    @cached_property
+    @cached_slot
     def location_of_originals(self) -> list[str]:
         """Returns the api value of the attr if found, empty list otherwise."""
         return self.get("locationOfOriginals", [])
 
-    @cached_property
+    @cached_slot
     def restrictions_on_use(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("restrictionsOnUse", "")
 
-    @cached_property
+    @cached_slot
     def administrative_background(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("administrativeBackground", "")
 
-    @cached_property
+    @cached_slot
     def arrangement(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("arrangement", "")
 
-    @cached_property
+    @cached_slot
     def publication_note(self) -> list[str]:
         """Returns the api value of the attr if found, empty list otherwise."""
         return self.get("publicationNote", [])
 
-    @cached_property
+    @cached_slot
     def related_materials(self) -> tuple[dict[str, Any], ...]:
         """Returns transformed data which is a tuple of dict if found, empty tuple otherwise."""
         inc_msg = f"related_materials:Record({self.iaid}):"
@@ -308,35 +353,32 @@ class Record(APIModel):
             for item in self.get("relatedMaterials", ())
         )
 
-    @cached_property
+    @cached_slot
     def description(self) -> str:
-        """Returns the api value of the attr if found, empty str otherwise."""
-        if description := self.raw_description:
-            description = format_extref_links(description)
-            description = apply_schema_xsl(description, self.description_schema)
-            description = change_discovery_record_details_links(description)
-            return description
-        description = self.get("description.value", "")
+        """Returns the api value of the attr if found, empty str otherwise.
+        The transformed value is cached by a hash of its source, the
+        stylesheet applied and the stylesheet version."""
+        if raw_description := self.raw_description:
+            return transform_description(
+                raw_description, self.description_schema, "", None
+            )
+        series_reference_number = None
         if series := self.hierarchy_series:
-            description = apply_series_xsl(description, series.reference_number)
-        description = format_extref_links(description)
-        description = change_discovery_record_details_links(description)
-        return description
+            series_reference_number = series.reference_number
+        return transform_description(
+            "", "", self.get("description.value", ""), series_reference_number
+        )
 
-    @cached_property
+    @cached_slot
     def raw_description(self) -> str:
         """Returns the api value of the attr if found, empty str otherwise."""
         return self.get("description.raw", "")
 
-    @cached_property
+    @cached_slot
     def description_schema(self) -> str:
-        if schema := self.get("description.schema", ""):
-            colltype = etree.fromstring(schema)
-            if colltype_id := colltype.get("id", ""):
-                return colltype_id
-        return ""
+        return get_description_schema(self)
 
-    @cached_property
+    @cached_slot
     def separated_materials(self) -> tuple[dict[str, Any], ...]:
         """Returns transformed data which is a tuple of dict if found, empty tuple otherwise."""
         inc_msg = f"separated_materials:Record({self.iaid}):"
@@ -350,12 +392,12 @@ class Record(APIModel):
             for item in self.get("separatedMaterials", ())
         )
 
-    @cached_property
+    @cached_slot
     def unpublished_finding_aids(self) -> list[str]:
         """Returns the api value of the attr if found, empty list otherwise."""
         return self.get("unpublishedFindingAids", [])
 
-    @cached_property
+    @cached_slot
     def hierarchy(self) -> tuple[Record, ...]:
         """Returns tuple of records transformed from the values of the attr if found, empty tuple otherwise."""
         hierarchy_records = ()
@@ -363,7 +405,7 @@ class Record(APIModel):
             if hierarchy_item.get("identifier"):
                 # page_record_is_tna: carry status to hierarchy record
                 hierarchy_record = Record(
-                    hierarchy_item | {"page_record_is_tna": self.is_tna}
+                    hierarchy_item, page_record_is_tna=self.is_tna
                 )
                 # skips current record from showing in hierarchy bar
                 if self.iaid == hierarchy_record.iaid:
@@ -372,59 +414,59 @@ class Record(APIModel):
 
         return hierarchy_records
 
-    @cached_property
+    @cached_slot
     def next(self) -> Record | None:
         """Returns a record transformed from the values of the attr if found, None otherwise."""
         if next := self.get("@next", None):
             # page_record_is_tna: carry status to next record
-            return Record(next | {"page_record_is_tna": self.is_tna})
+            return Record(next, page_record_is_tna=self.is_tna)
         return None
 
-    @cached_property
+    @cached_slot
     def previous(self) -> Record | None:
         """Returns a record transformed from the values of the attr if found, None otherwise."""
         if previous := self.get("@previous", None):
             # page_record_is_tna: carry status to previous record
-            return Record(previous | {"page_record_is_tna": self.is_tna})
+            return Record(previous, page_record_is_tna=self.is_tna)
         return None
 
-    @cached_property
+    @cached_slot
     def parent(self) -> Record | None:
         """Returns a record transformed from the values of the attr if found, None otherwise."""
         if parent := self.get("parent", None):
             # page_record_is_tna: carry status to parent record
-            return Record(parent | {"page_record_is_tna": self.is_tna})
+            return Record(parent, page_record_is_tna=self.is_tna)
         return None
 
-    @cached_property
+    @cached_slot
     def is_tna(self) -> bool:
         """Returns True if record belongs to TNA, False otherwise."""
         # checks if page attribute if present, so that same is_tna
         # is used for the created record
-        if is_tna := self.get("page_record_is_tna", ""):
-            return is_tna
+        if self._page_record_is_tna:
+            return True
 
         for item in self.get("groupArray", []):
             if item.get("value", "") == "tna":
                 return True
         return False
 
-    @cached_property
+    @cached_slot
     def is_digitised(self) -> bool:
         """Returns True if digitised, False otherwise."""
         return self.get("digitised", False)
 
-    @cached_property
+    @cached_slot
     def url(self) -> str:
         """Returns record detail url for iaid, empty str otherwise."""
         if self.iaid:
             try:
-                return reverse("records:details", kwargs={"id": self.iaid})
+                return record_url(self.iaid)
             except NoReverseMatch:
                 pass
         return ""
 
-    @cached_property
+    @cached_slot
     def breadcrumb_items(self) -> list:
         """Returns breadcrumb items depending on position in hierarchy
         Update tna_breadcrumb_levels or oa_breadcrumb_levels to change the levels displayed
@@ -448,7 +490,7 @@ class Record(APIModel):
 
         return items
 
-    @cached_property
+    @cached_slot
     def hierarchy_series(self) -> Record | None:
         """Returns series record from hierarchy if found, None otherwise"""
         for item in self.hierarchy:
@@ -456,7 +498,114 @@ class Record(APIModel):
                 return item
         return None
 
-    @cached_property
+    @cached_slot
     def subjects(self) -> list[str]:
         """Returns up to SUBJECTS_LIMIT items from the api value of the attr if found, empty list otherwise."""
         return self.get("subjects", [])[:SUBJECTS_LIMIT]
+
+
+def get_iaid(model: APIModel) -> str:
+    """Returns the valid "iaid" of a record's data, empty str otherwise."""
+    try:
+        candidate = model._raw["iaid"]
+    except KeyError:
+        # value from other places
+        candidate = model.get("@admin.id", default="")
+
+    if not candidate:
+        # value from other places
+        identifiers = model.get("identifier", ())
+        for item in identifiers:
+            try:
+                candidate = item["iaid"]
+            except KeyError:
+                candidate = ""
+
+    if candidate and re.match(IDConverter.regex, candidate):
+        # value is not guaranteed to be a valid 'iaid', so we must
+        # check it before returning it as one
+        return candidate
+    return ""
+
+
+def get_reference_number(model: APIModel) -> str:
+    """Returns the reference number of a record's data, empty str otherwise."""
+    if candidate := model.get("referenceNumber", ""):
+        return candidate
+
+    # value from other places
+    identifiers = model.get("identifier", [])
+    for item in identifiers:
+        try:
+            return item["reference_number"]
+        except KeyError:
+            pass
+
+    return ""
+
+
+def get_summary_title(model: APIModel) -> str:
+    """Returns the summary title of a record's data, empty str otherwise."""
+    if details_summary_title := model.get("summaryTitle", ""):
+        return details_summary_title
+    return model.get("summary.title", "")
+
+
+def get_description_schema(model: APIModel) -> str:
+    """Returns the id of a record's description schema, empty str otherwise."""
+    if schema := model.get("description.schema", ""):
+        colltype = etree.fromstring(schema)
+        if colltype_id := colltype.get("id", ""):
+            return colltype_id
+    return ""
+
+
+def transform_description(
+    raw_description: str,
+    schema: str,
+    value_description: str,
+    series_reference_number: str | None,
+) -> str:
+    """
+    Returns the HTML description of a record, from its raw description
+    transformed by the stylesheet of its schema if any, otherwise from its
+    description value transformed by the stylesheet of its series.
+    series_reference_number: None when the record has no series
+    """
+    if raw_description:
+        schema_xsl = get_schema_xsl(schema)
+
+        def transform_raw_description() -> str:
+            description = format_extref_links(raw_description)
+            description = apply_schema_xsl(description, schema)
+            return RewrittenHTML(
+                change_discovery_record_details_links(description)
+            )
+
+        return description_cache.get_or_set(
+            (
+                "raw",
+                raw_description,
+                schema_xsl,
+                get_xslt_version(schema_xsl),
+            ),
+            transform_raw_description,
+        )
+
+    series_xsl = get_series_xsl(series_reference_number or "") or ""
+
+    def transform_value_description() -> str:
+        description = value_description
+        if series_reference_number is not None:
+            description = apply_series_xsl(description, series_reference_number)
+        return rewrite_record_links(description)
+
+    return description_cache.get_or_set(
+        (
+            "value",
+            value_description,
+            series_xsl,
+            get_xslt_version(series_xsl) if series_xsl else "",
+        ),
+        transform_value_description,
+    )
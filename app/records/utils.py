@@ -1,13 +1,51 @@
+import functools
 import logging
 import re
 from typing import Any, Dict
 
 from app.records.converters import IDConverter
-from django.urls import NoReverseMatch, reverse
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import NoReverseMatch, get_script_prefix, reverse
 from pyquery import PyQuery as pq
 
 logger = logging.getLogger(__name__)
 
+# The usual shape of API links, an href without entities and single spaced
+# text without markup, anything else is parsed by PyQuery
+SIMPLE_LINK_RE = re.compile(
+    r'<a href="([^"<>&]*)">([^\s<>&]+(?: [^\s<>&]+)*)</a>'
+)
+
+
+def record_url(iaid: str) -> str:
+    """
+    Returns the path of the details page of record `iaid`, the same as
+    `reverse("records:details", kwargs={"id": iaid})` but reversed once
+    per id. Raises NoReverseMatch when `iaid` is not a valid id.
+    """
+    return _record_url(iaid, get_script_prefix())
+
+
+@functools.lru_cache(maxsize=4096)
+def _record_url(iaid: str, script_prefix: str) -> str:
+    # script_prefix is part of the key as reverse() prepends it
+    return reverse("records:details", kwargs={"id": iaid})
+
+
+@receiver(setting_changed)
+def clear_record_url_cache(*, setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        _record_url.cache_clear()
+
+
+def parse_link(link_html: str) -> tuple[str | None, str]:
+    """Returns the href and text of the link in `link_html`."""
+    if match := SIMPLE_LINK_RE.fullmatch(link_html):
+        return match.group(1), match.group(2)
+    document = pq(link_html)
+    return document.attr("href"), document.text()
+
 
 def format_link(link_html: str, inc_msg: str = "") -> Dict[str, str]:
     """
@@ -17,42 +55,86 @@ def format_link(link_html: str, inc_msg: str = "") -> Dict[str, str]:
     inc_msg includes message with logger if sepcified
     Ex:inc_msg <method_name>:Record(<id):"
     """
-    document = pq(link_html)
-    iaid = document.attr("href")
+    iaid, text = parse_link(link_html)
     try:
-        href = reverse("records:details", kwargs={"id": iaid})
+        href = record_url(iaid)
     except NoReverseMatch:
         href = ""
         # warning for partially valid data
         logger.warning(
             f"{inc_msg}format_link:No reverse match for record_details with iaid={iaid}"
         )
-    return {"id": iaid or "", "href": href, "text": document.text()}
+    return {"id": iaid or "", "href": href, "text": text}
+
+
+class RewrittenHTML(str):
+    """HTML whose record links have already been rewritten by
+    `rewrite_record_links`."""
+
+
+EXTREF_LINK_PATTERN = (
+    f'<a class="extref" href="(?P<extref_id>{IDConverter.regex})"'
+)
+DISCOVERY_LINK_PATTERN = (
+    r'href="https?://discovery.nationalarchives.gov.uk/(details/r/|SearchUI/details\?Uri=)'
+    + f"(?P<discovery_id>{IDConverter.regex})"
+    + r'/?"( title="Opens in a new tab")?( target="_blank")?'
+)
+EXTREF_LINK_RE = re.compile(EXTREF_LINK_PATTERN)
+DISCOVERY_LINK_RE = re.compile(DISCOVERY_LINK_PATTERN, re.IGNORECASE)
+# Both rewrites in one scan, their matches never overlap as the id of an
+# extref link cannot be a URL
+RECORD_LINKS_RE = re.compile(
+    f"{EXTREF_LINK_PATTERN}|(?i:{DISCOVERY_LINK_PATTERN})"
+)
+
+
+def _rewrite_extref_link(match: re.Match) -> str:
+    return f'<a class="extref" href="{record_url(match["extref_id"])}"'
+
+
+def _rewrite_discovery_link(match: re.Match) -> str:
+    return f'href="{record_url(match["discovery_id"])}"'
+
+
+def _rewrite_record_link(match: re.Match) -> str:
+    if match["extref_id"] is not None:
+        return _rewrite_extref_link(match)
+    return _rewrite_discovery_link(match)
 
 
 def format_extref_links(html: str) -> str:
-    regex = re.compile(f'<a class="extref" href="{IDConverter.regex}"')
-    html = re.sub(
-        regex,
-        lambda m: f'<a class="extref" href="{reverse("records:details", kwargs={"id": m.group(1)})}"',
-        html,
-    )
-    return html
+    return EXTREF_LINK_RE.sub(_rewrite_extref_link, html)
 
 
 def change_discovery_record_details_links(html: str) -> str:
-    regex = re.compile(
-        r'href="https?://discovery.nationalarchives.gov.uk/(details/r/|SearchUI/details\?Uri=)'
-        + IDConverter.regex
-        + r'/?"( title="Opens in a new tab")?( target="_blank")?',
-        re.IGNORECASE,
-    )
-    html = re.sub(
-        regex,
-        lambda m: f'href="{reverse("records:details", kwargs={"id": m.group(2)})}"',
-        html,
-    )
-    return html
+    return DISCOVERY_LINK_RE.sub(_rewrite_discovery_link, html)
+
+
+def rewrite_record_links(html: str) -> RewrittenHTML:
+    """
+    Rewrites the links to records in `html` to their details pages on this
+    site, both the `format_extref_links` and the
+    `change_discovery_record_details_links` rewrites in a single scan.
+    """
+    return RewrittenHTML(RECORD_LINKS_RE.sub(_rewrite_record_link, html))
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_path(key: str) -> tuple[tuple[str, int | None], ...]:
+    """
+    Parses a dotted `key` once into the lookups `extract` makes, a tuple of
+    (key, index) pairs where index is the int value of a key that looks like
+    a sequence index, None otherwise.
+    """
+    path = []
+    for bit in key.split("."):
+        try:
+            index = int(bit)
+        except ValueError:
+            index = None
+        path.append((bit, index))
+    return tuple(path)
 
 
 def extract(source: Dict[str, Any], key: str, default: Any = None) -> Any:
@@ -65,10 +147,10 @@ def extract(source: Dict[str, Any], key: str, default: Any = None) -> Any:
     arise during the process.
     """
     current = source
-    lookups = tuple(key.split("."))
+    lookups = compile_path(key)
 
     try:
-        for bit in lookups:
+        for bit, bit_index in lookups:
             # NOTE: we could use a series of nested try/excepts here instead,
             # but using conditionals allows us to raise more relevant exceptions
 
@@ -79,14 +161,9 @@ def extract(source: Dict[str, Any], key: str, default: Any = None) -> Any:
 
             # Only attempt index lookups for sequences, and only
             # when the value looks like an index
-            if hasattr(current, "__getitem__"):
-                try:
-                    bit_index = int(bit)
-                except ValueError:
-                    pass
-                else:
-                    current = current[bit_index]  # do index lookup
-                    continue
+            if bit_index is not None and hasattr(current, "__getitem__"):
+                current = current[bit_index]  # do index lookup
+                continue
 
             # Always fall back to attribute lookup
             current = getattr(current, bit)
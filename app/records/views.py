@@ -1,15 +1,19 @@
+import asyncio
 import logging
-import os
 from http import HTTPStatus
 
-from app.deliveryoptions.api import delivery_options_request_handler
+from app.deliveryoptions.api import adelivery_options_request_handler
 from app.deliveryoptions.delivery_options import (
     AvailabilityCondition,
     construct_delivery_options,
 )
 from app.deliveryoptions.helpers import BASE_TNA_DISCOVERY_URL
-from app.records.api import record_details_by_id
+from app.lib.cache import use_cache
+from app.lib.deadline import time_budget
+from app.records.api import arecord_details_by_id, record_details_by_id
 from app.records.labels import FIELD_LABELS
+from app.records.models import Record
+from django.conf import settings
 from django.template.response import TemplateResponse
 from sentry_sdk import capture_message
 
@@ -52,7 +56,42 @@ from sentry_sdk import capture_message
 logger = logging.getLogger(__name__)
 
 
-def record_detail_view(request, id):
+async def get_delivery_options_context(
+    delivery_options_task: asyncio.Future, record: Record, request
+) -> dict:
+    """Returns the delivery options context of `record`, or that of the
+    OrderException availability condition when DORIS fails."""
+    try:
+        delivery_options = await delivery_options_task
+
+        return construct_delivery_options(delivery_options, record, request)
+
+    except Exception as e:
+        # Built in order exception option
+        error_message = f"DORIS Connection error using url '{settings.DELIVERY_OPTIONS_API_URL}' - returning OrderException from Availability Conditions {str(e)}"
+
+        # Sentry notification
+        logger.error(error_message)
+        capture_message(error_message)
+
+        # The delivery options include a special case called OrderException which has nothing to do with
+        # python exceptions. It is the message to be displayed when the connection is down or there is no
+        # match for the given iaid. So, we don't treat it as a python exception beyond this point.
+        return construct_delivery_options(
+            [
+                {
+                    "options": AvailabilityCondition.OrderException,
+                    "surrogateLinks": [],
+                    "advancedOrderUrlParameters": "",
+                }
+            ],
+            record,
+            request,
+        )
+
+
+@time_budget()
+async def record_detail_view(request, id):
     """
     View for rendering a record's details page.
     """
@@ -61,7 +100,22 @@ def record_detail_view(request, id):
         "field_labels": FIELD_LABELS,
     }
 
-    record = record_details_by_id(id=id)
+    delivery_options_task = None
+    if settings.FEATURE_DELIVERY_OPTIONS:
+        # DORIS only needs the iaid, so the delivery options are fetched
+        # while the record is
+        delivery_options_task = asyncio.ensure_future(
+            adelivery_options_request_handler(iaid=id)
+        )
+
+    try:
+        record = await arecord_details_by_id(
+            id=id, use_cache=use_cache(request)
+        )
+    except BaseException:
+        if delivery_options_task is not None:
+            delivery_options_task.cancel()
+        raise
 
     context.update(
         record=record,
@@ -91,56 +145,28 @@ def record_detail_view(request, id):
         }
         context.update(delivery_options_context)
 
-    # if determine_delivery_options:
-    # TODO: Temporarily commented out delivery options functionality
-    # # Only get the delivery options if we are looking at records
-    # # Get the delivery options for the iaid
-    # delivery_options_context = {}
-
-    # try:
-    #     delivery_options = delivery_options_request_handler(
-    #         iaid=record.iaid
-    #     )
-
-    #     delivery_options_context = construct_delivery_options(
-    #         delivery_options, record, request
-    #     )
-
-    # except Exception as e:
-    #     # Built in order exception option
-    #     error_message = f"DORIS Connection error using url '{os.getenv("DELIVERY_OPTIONS_API_URL", "")}' - returning OrderException from Availability Conditions {str(e)}"
-
-    #     # Sentry notification
-    #     logger.error(error_message)
-    #     capture_message(error_message)
-
-    #     # The delivery options include a special case called OrderException which has nothing to do with
-    #     # python exceptions. It is the message to be displayed when the connection is down or there is no
-    #     # match for the given iaid. So, we don't treat it as a python exception beyond this point.
-    #     delivery_options_context = construct_delivery_options(
-    #         [
-    #             {
-    #                 "options": AvailabilityCondition.OrderException,
-    #                 "surrogateLinks": [],
-    #                 "advancedOrderUrlParameters": "",
-    #             }
-    #         ],
-    #         record,
-    #         request,
-    #     )
-
-    # context.update(delivery_options_context)
+    if delivery_options_task is not None:
+        if determine_delivery_options:
+            # Only get the delivery options if we are looking at records
+            context.update(
+                await get_delivery_options_context(
+                    delivery_options_task, record, request
+                )
+            )
+        else:
+            delivery_options_task.cancel()
 
     return TemplateResponse(
         request=request, template=template_name, context=context
     )
 
 
+@time_budget()
 def related_records_view(request, id):
     template_name = "records/related_records.html"
     context: dict = {}
 
-    record = record_details_by_id(id=id)
+    record = record_details_by_id(id=id, use_cache=use_cache(request))
 
     context.update(
         record=record,
@@ -151,11 +177,12 @@ def related_records_view(request, id):
     )
 
 
+@time_budget()
 def records_help_view(request, id):
     template_name = "records/new_to_archives.html"
     context: dict = {}
 
-    record = record_details_by_id(id=id)
+    record = record_details_by_id(id=id, use_cache=use_cache(request))
 
     context.update(
         record=record,
@@ -1,10 +1,26 @@
 from app.lib.api import ResourceNotFound, rosetta_request_handler
+from app.lib.cache import StaleWhileRevalidateCache, normalise_params
+from asgiref.sync import sync_to_async
 
 from .models import APISearchResponse
 
+search_cache = StaleWhileRevalidateCache(
+    "search_cache",
+    "SEARCH_CACHE_TIMEOUT",
+    "SEARCH_CACHE_STALE_TIMEOUT",
+    "SEARCH_CACHE_STALE_IF_ERROR_TIMEOUT",
+    max_entry_size_setting="SEARCH_CACHE_MAX_ENTRY_SIZE",
+)
+
 
 def search_records(
-    query, results_per_page=12, page=1, sort="", order="asc", params={}
+    query,
+    results_per_page=12,
+    page=1,
+    sort="",
+    order="asc",
+    params=None,
+    use_cache=True,
 ) -> APISearchResponse:
     """
     Prepares the api url for the requested data and calls the handler.
@@ -12,25 +28,54 @@ def search_records(
 
     sort: date:[asc|desc]; title:[asc|desc]
     params: filter, aggregation, etc
+    use_cache: False skips reading a cached response, a fresh response is still cached
     The errors are handled by a custom middleware in the app.
     """
     uri = "search"
-    params.update(
-        {
-            "q": query or "*",
-            "size": results_per_page,
-            "from": (page - 1) * results_per_page,
-            "sort": sort,
-            # "sortOrder": order, # Unused for Rosetta
-        }
-    )
+    params = {
+        **(params or {}),
+        "q": query or "*",
+        "size": results_per_page,
+        "from": (page - 1) * results_per_page,
+        "sort": sort,
+        # "sortOrder": order, # Unused for Rosetta
+    }
     # remove params having no values
     params = {param: value for param, value in params.items() if value}
-    results = rosetta_request_handler(uri, params)
-    if "data" not in results:
-        raise Exception("No data returned")
-    if "buckets" not in results:
-        raise Exception("No 'buckets' returned")
+
+    def fetch():
+        results = rosetta_request_handler(uri, params)
+        if "data" not in results:
+            raise Exception("No data returned")
+        if "buckets" not in results:
+            raise Exception("No 'buckets' returned")
+        return results
+
+    results = search_cache.get(
+        f"{uri}?{normalise_params(params)}", fetch, use_cache=use_cache
+    )
     if not len(results["data"]) and page == 1:
         raise ResourceNotFound("No results found")
     return APISearchResponse(results)
+
+
+async def asearch_records(
+    query,
+    results_per_page=12,
+    page=1,
+    sort="",
+    order="asc",
+    params=None,
+    use_cache=True,
+) -> APISearchResponse:
+    """Async version of search_records, the search is made from a worker
+    thread."""
+    return await sync_to_async(search_records, thread_sensitive=False)(
+        query,
+        results_per_page=results_per_page,
+        page=page,
+        sort=sort,
+        order=order,
+        params=params,
+        use_cache=use_cache,
+    )
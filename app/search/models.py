@@ -2,18 +2,78 @@ from __future__ import annotations
 
 from typing import Any
 
-from app.records.models import APIResponse, Record
+from app.records.models import (
+    APIModel,
+    APIResponse,
+    Record,
+    get_description_schema,
+    get_iaid,
+    get_reference_number,
+    get_summary_title,
+    transform_description,
+)
 from django.utils.functional import cached_property
 
 
+class SearchResult(APIModel):
+    """
+    A row of the search results listing, with only the fields the listing
+    shows, extracted from the record's "@template.details" data. Full
+    Record objects are for the record details pages.
+    """
+
+    __slots__ = (
+        "iaid",
+        "summary_title",
+        "reference_number",
+        "date_covering",
+        "held_by",
+        "_description",
+    )
+
+    def __init__(self, raw_data: dict[str, Any]):
+        self._raw = raw_data
+        self.iaid = get_iaid(self)
+        self.summary_title = get_summary_title(self)
+        self.reference_number = get_reference_number(self)
+        self.date_covering = self.get("dateCovering", "")
+        self.held_by = self.get("heldBy", "")
+        self._description = None
+
+    def __str__(self):
+        return f"{self.summary_title} ({self.iaid})"
+
+    @property
+    def description(self) -> str:
+        """Returns the same HTML description as Record.description."""
+        if self._description is None:
+            if raw_description := self.get("description.raw", ""):
+                self._description = transform_description(
+                    raw_description, get_description_schema(self), "", None
+                )
+            else:
+                series_reference_number = None
+                if "@hierarchy" in self._raw:
+                    # rare in search results, reuse the full record logic
+                    if series := Record(self._raw).hierarchy_series:
+                        series_reference_number = series.reference_number
+                self._description = transform_description(
+                    "",
+                    "",
+                    self.get("description.value", ""),
+                    series_reference_number,
+                )
+        return self._description
+
+
 class APISearchResponse(APIResponse):
 
     @cached_property
-    def records(self) -> list[Record]:
+    def records(self) -> list[SearchResult]:
         records = []
         if "data" in self._raw:
             records = [
-                Record(record["@template"]["details"])
+                SearchResult(record["@template"]["details"])
                 for record in self._raw["data"]
                 if "@template" in record and "details" in record["@template"]
             ]
@@ -5,6 +5,8 @@ from typing import Any
 
 from app.errors import views as errors_view
 from app.lib.api import ResourceNotFound
+from app.lib.cache import use_cache
+from app.lib.deadline import time_budget
 from app.lib.pagination import pagination_object
 from app.records.constants import (
     CLOSURE_STATUSES,
@@ -12,12 +14,13 @@ from app.records.constants import (
     TNA_LEVELS,
     TNA_SUBJECTS,
 )
-from app.search.api import search_records
+from app.search.api import asearch_records
 from config.jinja2 import qs_remove_value, qs_toggle_value
 from django.http import (
     HttpRequest,
     HttpResponse,
 )
+from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
 from .buckets import CATALOGUE_BUCKETS, Bucket, BucketKeys, BucketList
@@ -43,13 +46,14 @@ class APIMixin:
     # fields used to extract aggregation entries from the api result
     dynamic_choice_fields = [FieldsConstant.LEVEL]
 
-    def get_api_result(self, query, results_per_page, page, sort, params):
-        self.api_result = search_records(
+    async def get_api_result(self, query, results_per_page, page, sort, params):
+        self.api_result = await asearch_records(
             query=query,
             results_per_page=results_per_page,
             page=page,
             sort=sort,
             params=params,
+            use_cache=use_cache(self.request),
         )
         return self.api_result
 
@@ -191,7 +195,7 @@ class CatalogueSearchFormMixin(APIMixin, TemplateView):
             FieldsConstant.SORT: self.default_sort,
         }
 
-    def get(self, request, *args, **kwargs) -> HttpResponse:
+    async def get(self, request, *args, **kwargs) -> HttpResponse:
         """
         Overrrides TemplateView.get() to process the form
         For an invalid page renders page not found, otherwise renders the template
@@ -206,7 +210,7 @@ class CatalogueSearchFormMixin(APIMixin, TemplateView):
                 self.current_bucket = self.bucket_list.get_bucket(
                     self.form.fields[FieldsConstant.GROUP].cleaned
                 )
-                return self.form_valid()
+                return await self.form_valid()
             else:
                 return self.form_invalid()
         except PageNotFound:
@@ -226,11 +230,11 @@ class CatalogueSearchFormMixin(APIMixin, TemplateView):
             raise PageNotFound
         return page
 
-    def form_valid(self):
+    async def form_valid(self):
         """Gets the api result and processes it after the form and fields
         are cleaned and validated. Renders with form, context."""
 
-        self.api_result = self.get_api_result(
+        self.api_result = await self.get_api_result(
             query=self.query,
             results_per_page=RESULTS_PER_PAGE,
             page=self.page,
@@ -287,6 +291,7 @@ class CatalogueSearchFormMixin(APIMixin, TemplateView):
         return (results_range, pagination)
 
 
+@method_decorator(time_budget(), name="get")
 class CatalogueSearchView(CatalogueSearchFormMixin):
 
     template_name = "search/catalogue.html"
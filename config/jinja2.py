@@ -4,7 +4,11 @@ import re
 from datetime import datetime
 
 from app.lib.xslt_transformations import apply_generic_xsl
-from app.records.utils import change_discovery_record_details_links
+from app.records.utils import (
+    RewrittenHTML,
+    change_discovery_record_details_links,
+    record_url,
+)
 from django.conf import settings
 from django.http import QueryDict
 from django.templatetags.static import static
@@ -20,10 +24,15 @@ def slugify(s):
     return s
 
 
+PARAGRAPHS_WHITESPACE_RE = re.compile(r"(</p>)\s+(<p[ >])")
+
+
 def sanitise_record_field(s):
+    rewritten = isinstance(s, RewrittenHTML)
     # Remove whitespace between <p> tags
-    s = re.sub(r"(</p>)\s+(<p[ >])", r"\1\2", s).strip()
-    s = change_discovery_record_details_links(s)
+    s = PARAGRAPHS_WHITESPACE_RE.sub(r"\1\2", s).strip()
+    if not rewritten:
+        s = change_discovery_record_details_links(s)
     return s
 
 
@@ -152,6 +161,7 @@ def environment(**options):
             },
             "feature": {"PHASE_BANNER": settings.FEATURE_PHASE_BANNER},
             "url": reverse,
+            "record_url": record_url,
             "now_iso_8601": now_iso_8601,
             "qs_append_value": qs_append_value,
             "qs_is_value_active": qs_is_value_active,
@@ -77,6 +77,35 @@ DATABASES = {
     }
 }
 
+# Caches
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The "api" cache holds upstream API responses and can be pointed at any
+# backend, e.g. django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.redis.RedisCache
+API_CACHE_BACKEND: str = os.getenv(
+    "API_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+# Max number of entries in the "api" cache before a third of them are culled,
+# it holds records, searches, delivery options and their markers. Only the
+# local memory, file and database backends are limited this way
+API_CACHE_MAX_ENTRIES: int = int(os.getenv("API_CACHE_MAX_ENTRIES", "5000"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "api": {
+        "BACKEND": API_CACHE_BACKEND,
+        "LOCATION": os.getenv("API_CACHE_LOCATION", "api"),
+    },
+}
+if API_CACHE_BACKEND in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.filebased.FileBasedCache",
+    "django.core.cache.backends.db.DatabaseCache",
+):
+    CACHES["api"]["OPTIONS"] = {"MAX_ENTRIES": API_CACHE_MAX_ENTRIES}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -142,6 +171,23 @@ except FileNotFoundError:
     pass
 
 WAGTAIL_API_URL: str = os.getenv("WAGTAIL_API_URL", "")
+WAGTAIL_API_CONNECT_TIMEOUT: float = float(
+    os.getenv("WAGTAIL_API_CONNECT_TIMEOUT", "3.05")
+)
+WAGTAIL_API_READ_TIMEOUT: float = float(
+    os.getenv("WAGTAIL_API_READ_TIMEOUT", "5")
+)
+# Retries after a connection error, a timeout or a 502, 503 or 504 response
+WAGTAIL_API_RETRIES: int = int(os.getenv("WAGTAIL_API_RETRIES", "1"))
+# Wagtail page listings cache, fresh for WAGTAIL_PAGES_CACHE_TIMEOUT seconds
+# (0 disables) then served stale for up to WAGTAIL_PAGES_CACHE_STALE_TIMEOUT
+# seconds while being refreshed in the background
+WAGTAIL_PAGES_CACHE_TIMEOUT: int = int(
+    os.getenv("WAGTAIL_PAGES_CACHE_TIMEOUT", "300")
+)
+WAGTAIL_PAGES_CACHE_STALE_TIMEOUT: int = int(
+    os.getenv("WAGTAIL_PAGES_CACHE_STALE_TIMEOUT", "86400")
+)
 WAGTAIL_HOME_PAGE_ID: int = 5
 WAGTAIL_EXPLORE_THE_COLLECTION_PAGE_ID: int = 55
 
@@ -170,9 +216,146 @@ CONTENT_SECURITY_POLICY = {
 GA4_ID = os.environ.get("GA4_ID", "")
 
 ROSETTA_API_URL = os.getenv("ROSETTA_API_URL")
+ROSETTA_API_CONNECT_TIMEOUT: float = float(
+    os.getenv("ROSETTA_API_CONNECT_TIMEOUT", "3.05")
+)
+ROSETTA_API_READ_TIMEOUT: float = float(
+    os.getenv("ROSETTA_API_READ_TIMEOUT", "10")
+)
+# Retries after a connection error, a timeout or a 502, 503 or 504 response
+ROSETTA_API_RETRIES: int = int(os.getenv("ROSETTA_API_RETRIES", "2"))
 
 # DORIS is TNA's Document Ordering System that contains Delivery Options data
 DELIVERY_OPTIONS_API_URL = os.getenv("DELIVERY_OPTIONS_API_URL")
+DELIVERY_OPTIONS_API_CONNECT_TIMEOUT: float = float(
+    os.getenv("DELIVERY_OPTIONS_API_CONNECT_TIMEOUT", "3.05")
+)
+DELIVERY_OPTIONS_API_READ_TIMEOUT: float = float(
+    os.getenv("DELIVERY_OPTIONS_API_READ_TIMEOUT", "5")
+)
+# Retries after a connection error, a timeout or a 502, 503 or 504 response
+DELIVERY_OPTIONS_API_RETRIES: int = int(
+    os.getenv("DELIVERY_OPTIONS_API_RETRIES", "1")
+)
+
+# Decoder for upstream JSON responses: "orjson", "msgspec" or "json", "auto"
+# uses orjson or msgspec when installed
+JSON_DECODER: str = os.getenv("JSON_DECODER", "auto")
+
+# Upstream API retries wait a random time up to JSON_API_RETRY_BACKOFF
+# seconds, doubling with each retry up to JSON_API_RETRY_BACKOFF_MAX seconds
+JSON_API_RETRY_BACKOFF: float = float(
+    os.getenv("JSON_API_RETRY_BACKOFF", "0.1")
+)
+JSON_API_RETRY_BACKOFF_MAX: float = float(
+    os.getenv("JSON_API_RETRY_BACKOFF_MAX", "1")
+)
+# Retries to an upstream API are limited to JSON_API_RETRY_BUDGET_RATIO of
+# the calls made to it, with bursts of up to JSON_API_RETRY_BUDGET_MAX
+JSON_API_RETRY_BUDGET_RATIO: float = float(
+    os.getenv("JSON_API_RETRY_BUDGET_RATIO", "0.1")
+)
+JSON_API_RETRY_BUDGET_MAX: int = int(
+    os.getenv("JSON_API_RETRY_BUDGET_MAX", "10")
+)
+
+# Consecutive failures of an upstream API before calls to it fail straight
+# away (0 disables), and seconds until a call is let through again to probe it
+CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = int(
+    os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")
+)
+CIRCUIT_BREAKER_RESET_TIMEOUT: int = int(
+    os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", "30")
+)
+
+# Upstream response caches. Responses are fresh for *_CACHE_TIMEOUT seconds
+# (0 disables), then served for *_CACHE_STALE_TIMEOUT seconds while they are
+# refreshed in the background. When the upstream is unavailable, the last
+# good response is served for up to *_CACHE_STALE_IF_ERROR_TIMEOUT seconds,
+# it is dropped when the upstream answers with a 404 or another 4xx.
+
+# Rosetta search responses cache
+SEARCH_CACHE_TIMEOUT: int = int(os.getenv("SEARCH_CACHE_TIMEOUT", "300"))
+SEARCH_CACHE_STALE_TIMEOUT: int = int(
+    os.getenv("SEARCH_CACHE_STALE_TIMEOUT", "300")
+)
+SEARCH_CACHE_STALE_IF_ERROR_TIMEOUT: int = int(
+    os.getenv("SEARCH_CACHE_STALE_IF_ERROR_TIMEOUT", "3600")
+)
+# Largest search response to cache, in bytes
+SEARCH_CACHE_MAX_ENTRY_SIZE: int = int(
+    os.getenv("SEARCH_CACHE_MAX_ENTRY_SIZE", "1048576")
+)
+
+# Rosetta records cache, shared by the details, related and help views
+RECORD_CACHE_TIMEOUT: int = int(os.getenv("RECORD_CACHE_TIMEOUT", "300"))
+RECORD_CACHE_STALE_TIMEOUT: int = int(
+    os.getenv("RECORD_CACHE_STALE_TIMEOUT", "3600")
+)
+RECORD_CACHE_STALE_IF_ERROR_TIMEOUT: int = int(
+    os.getenv("RECORD_CACHE_STALE_IF_ERROR_TIMEOUT", "86400")
+)
+
+# DORIS delivery options cache
+DELIVERY_OPTIONS_CACHE_TIMEOUT: int = int(
+    os.getenv("DELIVERY_OPTIONS_CACHE_TIMEOUT", "300")
+)
+DELIVERY_OPTIONS_CACHE_STALE_TIMEOUT: int = int(
+    os.getenv("DELIVERY_OPTIONS_CACHE_STALE_TIMEOUT", "3600")
+)
+DELIVERY_OPTIONS_CACHE_STALE_IF_ERROR_TIMEOUT: int = int(
+    os.getenv("DELIVERY_OPTIONS_CACHE_STALE_IF_ERROR_TIMEOUT", "86400")
+)
+# How long iaids DORIS has no delivery options for are remembered (0 disables)
+DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT: int = int(
+    os.getenv("DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT", "300")
+)
+
+# In-process cache of transformed record descriptions, time to live in seconds (0 disables)
+DESCRIPTION_CACHE_TIMEOUT: int = int(
+    os.getenv("DESCRIPTION_CACHE_TIMEOUT", "3600")
+)
+# Maximum number of descriptions held per process
+DESCRIPTION_CACHE_MAX_ENTRIES: int = int(
+    os.getenv("DESCRIPTION_CACHE_MAX_ENTRIES", "1000")
+)
+# Alias of a cache in CACHES to also share descriptions between workers, e.g. "api"
+DESCRIPTION_CACHE_SHARED_CACHE: str = os.getenv(
+    "DESCRIPTION_CACHE_SHARED_CACHE", ""
+)
+
+# Number of threads refreshing stale cache entries in the background
+CACHE_REFRESH_WORKERS: int = int(os.getenv("CACHE_REFRESH_WORKERS", "4"))
+
+# Alias of a cache in CACHES to also coalesce identical Rosetta calls between
+# workers, e.g. "api", an empty str coalesces them within a process only
+SINGLE_FLIGHT_CACHE: str = os.getenv("SINGLE_FLIGHT_CACHE", "")
+# How long, in seconds, a worker holds the lock for a call in flight
+SINGLE_FLIGHT_LOCK_TIMEOUT: int = int(
+    os.getenv("SINGLE_FLIGHT_LOCK_TIMEOUT", "10")
+)
+# How long, in seconds, a result is kept for the workers waiting on it
+SINGLE_FLIGHT_RESULT_TIMEOUT: int = int(
+    os.getenv("SINGLE_FLIGHT_RESULT_TIMEOUT", "5")
+)
+# Seconds between checks for the result of a call in another worker
+SINGLE_FLIGHT_POLL_INTERVAL: float = float(
+    os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", "0.05")
+)
+
+# Request header to skip reading cached upstream responses, for debugging.
+# It is honoured in DEBUG, otherwise only when its value is
+# API_CACHE_BYPASS_TOKEN, an empty token ignores it
+API_CACHE_BYPASS_HEADER: str = os.getenv(
+    "API_CACHE_BYPASS_HEADER", "X-Bypass-Cache"
+)
+API_CACHE_BYPASS_TOKEN: str = os.getenv("API_CACHE_BYPASS_TOKEN", "")
+
+# Compile all record description stylesheets at startup, otherwise on first use
+XSLT_WARM_UP: bool = strtobool(os.getenv("XSLT_WARM_UP", "True"))
+
+# Total time in seconds a view may spend waiting on upstream APIs
+REQUEST_TIME_BUDGET: float = float(os.getenv("REQUEST_TIME_BUDGET", "20"))
 
 # List of IP address for identifying staff members within the organisation
 STAFFIN_IP_ADDRESSES = list(
@@ -187,6 +370,14 @@ ONSITE_IP_ADDRESSES = list(
 # List of Distressing content prefixes
 DCS_PREFIXES = list(filter(None, os.getenv("DCS_PREFIXES", "").split(",")))
 
+# Connection pooling for the upstream JSON APIs (Rosetta, DORIS, Wagtail)
+# Number of host pools to keep per upstream session
+JSON_API_POOL_CONNECTIONS: int = int(
+    os.getenv("JSON_API_POOL_CONNECTIONS", "10")
+)
+# Maximum number of connections to keep open per host
+JSON_API_POOL_MAXSIZE: int = int(os.getenv("JSON_API_POOL_MAXSIZE", "10"))
+
 # Should always be True in production
 CLIENT_VERIFY_CERTIFICATES = strtobool(
     os.getenv("ROSETTA_CLIENT_VERIFY_CERTIFICATES", "True")
@@ -6,3 +6,6 @@ from config.util import strtobool
 FEATURE_PHASE_BANNER: bool = strtobool(
     os.getenv("FEATURE_PHASE_BANNER", "True")
 )
+FEATURE_DELIVERY_OPTIONS: bool = strtobool(
+    os.getenv("FEATURE_DELIVERY_OPTIONS", "False")
+)
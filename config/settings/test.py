@@ -27,5 +27,18 @@ STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
 
 ROSETTA_API_URL = "https://rosetta.test/data"
 
+# Upstream response caches are enabled by the tests that cover them
+SEARCH_CACHE_TIMEOUT = 0
+RECORD_CACHE_TIMEOUT = 0
+DELIVERY_OPTIONS_CACHE_TIMEOUT = 0
+DESCRIPTION_CACHE_TIMEOUT = 0
+WAGTAIL_PAGES_CACHE_TIMEOUT = 0
+
+# Circuit breakers and retries are enabled by the tests that cover them
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 0
+ROSETTA_API_RETRIES = 0
+DELIVERY_OPTIONS_API_RETRIES = 0
+WAGTAIL_API_RETRIES = 0
+
 ENVIRONMENT_NAME = "test"
 SENTRY_SAMPLE_RATE = 0
@@ -0,0 +1,22 @@
+"""
+Micro-benchmarks of hot paths, run one with e.g.
+
+    python -m test.benchmarks.json_decoding
+
+They are not collected by the test runner.
+"""
+
+import os
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+django.setup()
+
+
+def report(name: str, stmt, number: int = 1000, repeat: int = 5, per: int = 1):
+    """Prints the best time per call of `stmt` out of `repeat` runs, divided
+    by `per` when each call processes `per` items."""
+    best = min(timeit.repeat(stmt, number=number, repeat=repeat)) / number / per
+    print(f"{name:<40} {best * 1_000_000:>10.1f} µs")
@@ -0,0 +1,58 @@
+"""Formatting of related and separated materials links, parsed by PyQuery
+("before") and by the simple link fast path ("after"), and reversing of
+their URLs by Django ("reverse") and memoised ("record_url")."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from app.records.utils import format_link, record_url
+from django.urls import reverse
+from pyquery import PyQuery as pq
+from test.benchmarks import report
+
+FIXTURES = Path(__file__).parent.parent / "records" / "fixtures"
+
+
+def parse_link_pyquery(link_html):
+    """parse_link as it was, always building a PyQuery document."""
+    document = pq(link_html)
+    return document.attr("href"), document.text()
+
+
+def find_links(data, key=None):
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from find_links(value, key)
+    elif isinstance(data, list):
+        for item in data:
+            if key == "links":
+                yield item
+            else:
+                yield from find_links(item)
+
+
+def format_links(links: list[str]):
+    for link_html in links:
+        format_link(link_html)
+
+
+def main():
+    links = [
+        link_html
+        for path in sorted(FIXTURES.glob("*.json"))
+        for link_html in find_links(json.loads(path.read_bytes()))
+    ]
+    print(f"{len(links)} links")
+    with patch("app.records.utils.parse_link", parse_link_pyquery):
+        report("before, per link", lambda: format_links(links), per=len(links))
+    report("after, per link", lambda: format_links(links), per=len(links))
+
+    report(
+        "reverse", lambda: reverse("records:details", kwargs={"id": "C1931"})
+    )
+    report("record_url", lambda: record_url("C1931"))
+
+
+if __name__ == "__main__":
+    main()
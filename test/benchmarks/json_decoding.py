@@ -0,0 +1,39 @@
+"""Decoding of recorded Rosetta responses with every installed decoder."""
+
+import json
+from pathlib import Path
+
+from app.lib.json_decoding import DECODERS
+from test.benchmarks import report
+
+FIXTURES = Path(__file__).parent.parent / "records" / "fixtures"
+
+
+def search_page(fixtures: list[dict], size: int = 20) -> bytes:
+    """A search response with `size` results built from record fixtures."""
+    records = [record for fixture in fixtures for record in fixture["data"]]
+    return json.dumps(
+        {
+            "data": [records[i % len(records)] for i in range(size)],
+            "aggregations": [],
+            "buckets": [],
+            "stats": {"total": size, "results": size},
+        }
+    ).encode()
+
+
+def main():
+    payloads = {
+        path.name: path.read_bytes() for path in sorted(FIXTURES.glob("*.json"))
+    }
+    payloads["search page of 20 results"] = search_page(
+        [json.loads(payload) for payload in payloads.values()]
+    )
+    for payload_name, payload in payloads.items():
+        print(f"{payload_name} ({len(payload)} bytes)")
+        for decoder_name, decoder in DECODERS.items():
+            report(f"  {decoder_name}", lambda: decoder(payload))
+
+
+if __name__ == "__main__":
+    main()
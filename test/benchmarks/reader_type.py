@@ -0,0 +1,44 @@
+"""Reader type lookups against a few thousand CIDR ranges, with every
+range parsed and checked in turn ("before") and with IPNetworkIndex
+("after")."""
+
+import random
+from ipaddress import IPv4Address, IPv6Address, ip_address, ip_network
+
+from app.deliveryoptions.reader_type import IPNetworkIndex
+from test.benchmarks import report
+
+
+def is_ip_in_cidr_linear(ip, cidr):
+    """is_ip_in_cidr as it was, parsing every range on every call."""
+    ip_obj = ip_address(ip)
+    for cidr_range in cidr:
+        network = ip_network(cidr_range.strip(), strict=False)
+        if ip_obj in network:
+            return True
+    return False
+
+
+def main():
+    rng = random.Random(0)
+    cidrs = [
+        f"{IPv4Address(rng.getrandbits(32))}/{rng.randint(16, 32)}"
+        for _ in range(3000)
+    ] + [
+        f"{IPv6Address(rng.getrandbits(128))}/{rng.randint(32, 64)}"
+        for _ in range(500)
+    ]
+    # an address in none of the ranges, the worst case of the linear scan
+    ip = "10.0.0.1"
+    while is_ip_in_cidr_linear(ip, cidrs):
+        ip = str(IPv4Address(rng.getrandbits(32)))
+
+    print(f"{len(cidrs)} CIDR ranges")
+    report("before, per lookup", lambda: is_ip_in_cidr_linear(ip, cidrs), 10)
+    report("build IPNetworkIndex", lambda: IPNetworkIndex(cidrs), 10)
+    index = IPNetworkIndex(cidrs)
+    report("after, per lookup", lambda: ip in index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Extraction of record fields, with dotted keys parsed on every call
+("before") and parsed once by compile_path ("after")."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+from app.records.models import Record
+from app.records.utils import extract
+from test.benchmarks import report
+
+FIXTURES = Path(__file__).parent.parent / "records" / "fixtures"
+
+# Fields that only read the record's data, without HTML or XSLT processing
+FIELDS = [
+    name
+    for name in Record._cached_slots
+    if name
+    not in (
+        "description",
+        "hierarchy",
+        "held_by_url",
+        "next",
+        "previous",
+        "related_materials",
+        "separated_materials",
+        "url",
+    )
+]
+
+
+def extract_uncompiled(source, key, default=None):
+    """extract as it was, splitting `key` on every call."""
+    current = source
+    lookups = tuple(key.split("."))
+
+    try:
+        for bit in lookups:
+            if isinstance(current, dict):
+                current = current[bit]
+                continue
+            if hasattr(current, "__getitem__"):
+                try:
+                    bit_index = int(bit)
+                except ValueError:
+                    pass
+                else:
+                    current = current[bit_index]
+                    continue
+            current = getattr(current, bit)
+    except Exception:
+        return default
+
+    return current
+
+
+def read_fields(records: list[dict]):
+    for details in records:
+        record = Record(details)
+        for name in FIELDS:
+            try:
+                getattr(record, name)
+            except Exception:
+                pass
+
+
+def main():
+    records = [
+        item["@template"]["details"]
+        for path in sorted(FIXTURES.glob("*.json"))
+        for item in json.loads(path.read_bytes())["data"]
+    ]
+    print(f"{len(FIELDS)} fields of {len(records)} records")
+    with patch("app.records.models.extract", extract_uncompiled):
+        report(
+            "before, per record",
+            lambda: read_fields(records),
+            per=len(records),
+        )
+    report("after, per record", lambda: read_fields(records), per=len(records))
+
+    key = "description.value"
+    report(
+        f"before, extract {key!r}", lambda: extract_uncompiled(records[0], key)
+    )
+    report(f"after, extract {key!r}", lambda: extract(records[0], key))
+
+
+if __name__ == "__main__":
+    main()
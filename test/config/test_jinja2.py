@@ -1,3 +1,6 @@
+from unittest.mock import patch
+
+from app.records.utils import RewrittenHTML
 from config.jinja2 import (
     dump_json,
     format_number,
@@ -21,6 +24,23 @@ class Jinja2TestCase(TestCase):
             "<p>Test</p><p>Test</p><p>Test</p>",
         )
 
+    def test_sanitise_record_field_rewrites_discovery_links(self):
+        source = '<p><a href="https://discovery.nationalarchives.gov.uk/details/r/C361/">C361</a></p>'
+        self.assertEqual(
+            sanitise_record_field(source),
+            '<p><a href="/catalogue/id/C361/">C361</a></p>',
+        )
+
+    def test_sanitise_record_field_skips_rewritten_html(self):
+        source = RewrittenHTML("<p>Test</p> <p>Test</p>")
+        with patch(
+            "config.jinja2.change_discovery_record_details_links"
+        ) as mock_rewrite:
+            self.assertEqual(
+                sanitise_record_field(source), "<p>Test</p><p>Test</p>"
+            )
+        mock_rewrite.assert_not_called()
+
     def test_dump_json(self):
         source = {
             "foo1": "bar",
@@ -1,16 +1,28 @@
 import inspect
 import json
 from copy import deepcopy
+from itertools import product
 from unittest.mock import Mock, patch
 
 from app.deliveryoptions.constants import (
     DELIVERY_OPTIONS_CONFIG,
+    AvailabilityCondition,
+    Reader,
     delivery_option_tags,
 )
 from app.deliveryoptions.delivery_options import (
+    CompiledText,
+    PrefixMatcher,
+    construct_delivery_options,
+    get_compiled_reader_option,
+    get_dcs_matcher,
+    has_distressing_content_match,
     html_replacer,
+    read_delivery_options,
+    reload_dcs_matcher,
     surrogate_link_builder,
 )
+from app.deliveryoptions.departments import DEPARTMENT_DETAILS
 from app.deliveryoptions.helpers import (
     BASE_TNA_HOME_URL,
     get_access_condition_text,
@@ -18,10 +30,12 @@ from app.deliveryoptions.helpers import (
     get_advance_order_information,
     get_advanced_orders_email_address,
     get_dept,
+    get_dept_details,
 )
 from app.records.models import APIResponse
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
 
 class TestDeliveryOptionTags(TestCase):
@@ -182,6 +196,36 @@ class TestDeliveryOptionSubstitution(TestCase):
     def test_get_dept_non_existing(self):
         self.assertIsNone(get_dept("XYZ 1234", "deptname"))
 
+    def test_get_dept_first_match(self):
+        def get_dept_linear(reference_number, key_type):
+            for key, value in DEPARTMENT_DETAILS.items():
+                if reference_number.startswith(key):
+                    return value[key_type]
+            return None
+
+        references = ["", "C", "XYZ 1234", "COAL 1", "PROB 11/1022/1"]
+        for key in DEPARTMENT_DETAILS:
+            references += [key, f"{key} 1/2", f"{key}1", key[:-1]]
+        for reference_number in references:
+            for key_type in ("deptname", "depturl"):
+                with self.subTest(reference_number, key_type=key_type):
+                    self.assertEqual(
+                        get_dept(reference_number, key_type),
+                        get_dept_linear(reference_number, key_type),
+                    )
+
+    def test_get_dept_details(self):
+        self.assertIs(get_dept_details("COAL 1/2"), DEPARTMENT_DETAILS["CO"])
+        self.assertIsNone(get_dept_details("XYZ 1234"))
+
+    def test_get_dept_does_not_use_the_cache(self):
+        with patch.object(cache, "get") as mock_get, patch.object(
+            cache, "set"
+        ) as mock_set:
+            get_dept("ADM 1234", "deptname")
+        mock_get.assert_not_called()
+        mock_set.assert_not_called()
+
     def test_get_access_condition_text(self):
         record = Mock()
         record.access_condition = "Open access"
@@ -327,3 +371,160 @@ class TestSurrogateReferences(TestCase):
         ]
         surrogate_list = surrogate_link_builder(reference_list)
         self.assertEqual(surrogate_list, ["https://example.com/1"])
+
+
+class TestCompiledDeliveryOptions(TestCase):
+    def setUp(self):
+        fixture_path = f"{settings.BASE_DIR}/test/deliveryoptions/fixtures/response_C18281.json"
+        with open(fixture_path, "r") as f:
+            fixture_contents = json.loads(f.read())
+
+        self.record = APIResponse(deepcopy(fixture_contents["data"][0])).record
+        self.surrogate_links = [
+            {
+                "xReferenceURL": '<a target="_blank" href="https://www.thegenealogist.co.uk/non-conformist-records">The Genealogist</a>',
+            },
+            {
+                "xReferenceURL": '<a target="_blank" href="https://www.thegenealogist.co.uk/other-records">The Genealogist</a>',
+            },
+        ]
+
+    def test_same_context_as_the_builders(self):
+        for (
+            availability_condition,
+            reader_type,
+            surrogate_links,
+            dcs,
+        ) in product(
+            AvailabilityCondition,
+            Reader,
+            ([], self.surrogate_links),
+            (False, True),
+        ):
+            api_result = [
+                {
+                    "options": availability_condition,
+                    "surrogateLinks": surrogate_links,
+                    "advancedOrderUrlParameters": "",
+                }
+            ]
+            with self.subTest(
+                availability_condition=availability_condition.name,
+                reader_type=reader_type.name,
+                surrogate_links=len(surrogate_links),
+                dcs=dcs,
+            ), patch(
+                "app.deliveryoptions.delivery_options.get_reader_type",
+                return_value=reader_type,
+            ), patch(
+                "app.deliveryoptions.delivery_options.has_distressing_content_match",
+                return_value=dcs,
+            ):
+                result = construct_delivery_options(
+                    api_result, self.record, Mock()
+                )
+                with patch(
+                    "app.deliveryoptions.delivery_options.get_compiled_reader_option",
+                    return_value=None,
+                ):
+                    expected = construct_delivery_options(
+                        api_result, self.record, Mock()
+                    )
+                self.assertEqual(result, expected)
+
+    def test_every_option_is_compiled(self):
+        do_dict = read_delivery_options(DELIVERY_OPTIONS_CONFIG)
+        for delivery_option in do_dict["deliveryOptions"]["option"]:
+            for reader_option in delivery_option["readertype"]:
+                with self.subTest(
+                    delivery_option=delivery_option["deliveryoption"],
+                    reader=reader_option["reader"],
+                ):
+                    self.assertIsNotNone(
+                        get_compiled_reader_option(
+                            delivery_option, reader_option
+                        )
+                    )
+
+    def test_changed_option_is_not_rendered_compiled(self):
+        do_dict = read_delivery_options(DELIVERY_OPTIONS_CONFIG)
+        delivery_option = deepcopy(do_dict["deliveryOptions"]["option"][0])
+        reader_option = delivery_option["readertype"][0]
+        self.assertIsNotNone(
+            get_compiled_reader_option(delivery_option, reader_option)
+        )
+
+        reader_option["heading"] = "Changed heading"
+        self.assertIsNone(
+            get_compiled_reader_option(delivery_option, reader_option)
+        )
+
+    def test_compiled_text_same_as_html_replacer(self):
+        record = Mock()
+        record.held_by = "{AddedToBasketText}"
+        for value in (
+            "Order here: {AddedToBasketText}",
+            "{AddedToBasketText} {AddedToBasketText}",
+            "No placeholder",
+            "",
+            # empty replacement keeps the tag
+            "{FAType}{OpenDateDesc}",
+            # a replacement containing a tag
+            "{ArchiveName} and {AddedToBasketText}",
+            # braces outside tags
+            "{{AddedToBasketText}} {1}",
+        ):
+            with self.subTest(value):
+                self.assertEqual(
+                    CompiledText(value).render(record, []),
+                    html_replacer(value, record, []),
+                )
+
+    def test_compiled_text_unknown_tag(self):
+        with self.assertRaises(KeyError):
+            CompiledText("{UnknownTag}").render(Mock(), [])
+
+
+class TestDistressingContentMatch(TestCase):
+    def test_matching_set_is_unchanged(self):
+        prefixes = ["LEV", "LEV 12", "MEPO 2", "HO 144/22", "J 77", "C"]
+        prefixes += [f"XYZ {i}/" for i in range(2000)]
+        references = [
+            "LEV 12/345",
+            "LEV",
+            "LE",
+            "MEPO 2/1",
+            "MEPO 3/1",
+            "HO 144/22/1",
+            "HO 144/2",
+            "J 77/1",
+            "J 7",
+            "CAB 1",
+            "",
+            "XYZ 1999/1",
+            "XYZ 2000/1",
+        ]
+        with override_settings(DCS_PREFIXES=prefixes):
+            for reference in references:
+                with self.subTest(reference):
+                    self.assertEqual(
+                        has_distressing_content_match(reference),
+                        list(filter(reference.startswith, prefixes)) != [],
+                    )
+
+    def test_matcher_is_reloaded_when_settings_change(self):
+        with override_settings(DCS_PREFIXES=["LEV"]):
+            self.assertTrue(has_distressing_content_match("LEV 12/345"))
+        with override_settings(DCS_PREFIXES=[]):
+            self.assertFalse(has_distressing_content_match("LEV 12/345"))
+
+    def test_matcher_is_compiled_once(self):
+        with override_settings(DCS_PREFIXES=["LEV"]):
+            self.assertIs(get_dcs_matcher(), get_dcs_matcher())
+            matcher = get_dcs_matcher()
+            reload_dcs_matcher()
+            self.assertIsNot(get_dcs_matcher(), matcher)
+
+    def test_empty_prefix_matches_everything(self):
+        self.assertTrue(PrefixMatcher([""]).matches("LEV 12/345"))
+        self.assertFalse(PrefixMatcher([]).matches(""))
@@ -1,8 +1,20 @@
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 
+import responses
+from app.deliveryoptions.api import (
+    NoDeliveryOptions,
+    delivery_options_request_handler,
+)
+from app.deliveryoptions.constants import AvailabilityCondition
+from app.deliveryoptions.delivery_options import construct_delivery_options
 from app.lib.api import JSONAPIClient, ResourceNotFound
+from app.lib.metrics import get_metrics, reset_metrics
+from app.records.models import Record
 from django.conf import settings
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
 
 
 class DeliveryOptionsApiClientTests(unittest.TestCase):
@@ -13,14 +25,16 @@ class DeliveryOptionsApiClientTests(unittest.TestCase):
     def tearDown(self):
         self.api_client.params.clear()
 
-    # Mocking requests.get to test get method
+    # Mocking Session.get to test get method
     @patch(
-        "app.lib.api.get"
-    )  # Patch the correct path where requests.get is used
+        "app.lib.api.Session.get"
+    )  # Patch the correct path where Session.get is used
     def test_get_results_success(self, mock_get):
         # Mock response setup
         mock_response = MagicMock()
-        mock_response.json.return_value = {"delivery_options": ["abc", "def"]}
+        mock_response.content = json.dumps(
+            {"delivery_options": ["abc", "def"]}
+        ).encode()
         mock_response.status_code = 200
         mock_get.return_value = mock_response
 
@@ -35,16 +49,17 @@ class DeliveryOptionsApiClientTests(unittest.TestCase):
             f"{settings.DELIVERY_OPTIONS_API_URL}/",
             params={"iaid": "C12345"},
             headers=self.headers,
+            timeout=None,
         )
 
         # Check the returned data
         self.assertEqual(result, {"delivery_options": ["abc", "def"]})
 
-    @patch("app.lib.api.get")
+    @patch("app.lib.api.Session.get")
     def test_get_results_without_iaid(self, mock_get):
         # Mock API response when no IAID is passed
         mock_response = MagicMock()
-        mock_response.json.return_value = {"error": "Missing IAID"}
+        mock_response.content = json.dumps({"error": "Missing IAID"}).encode()
         mock_response.status_code = 404
         mock_get.return_value = mock_response
 
@@ -61,16 +76,19 @@ class DeliveryOptionsApiClientTests(unittest.TestCase):
             f"{settings.DELIVERY_OPTIONS_API_URL}/",
             params={},
             headers=self.headers,
+            timeout=None,
         )
 
-    @patch("app.lib.api.get")
+    @patch("app.lib.api.Session.get")
     def test_get_results_multiple_parameters(self, mock_get):
         # Mock response for multiple parameters
         mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "status": "success",
-            "filters": ["option1", "option2"],
-        }
+        mock_response.content = json.dumps(
+            {
+                "status": "success",
+                "filters": ["option1", "option2"],
+            }
+        ).encode()
         mock_response.status_code = 200
         mock_get.return_value = mock_response
 
@@ -84,8 +102,105 @@ class DeliveryOptionsApiClientTests(unittest.TestCase):
             f"{settings.DELIVERY_OPTIONS_API_URL}/",
             params={"iaid": "C67890", "category": "books"},
             headers=self.headers,
+            timeout=None,
         )
 
         self.assertEqual(
             result, {"status": "success", "filters": ["option1", "option2"]}
         )
+
+
+@override_settings(
+    DELIVERY_OPTIONS_API_URL="https://doris.test/api",
+    DELIVERY_OPTIONS_CACHE_TIMEOUT=60,
+    DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT=60,
+)
+class DeliveryOptionsCacheTests(SimpleTestCase):
+    url = "https://doris.test/api/?iaid=C123456"
+    delivery_options = [
+        {
+            "options": AvailabilityCondition.InvigilationSafeRoom,
+            "surrogateLinks": [],
+            "advancedOrderUrlParameters": "",
+        }
+    ]
+
+    def setUp(self):
+        caches["api"].clear()
+        reset_metrics()
+        self.record = Record(
+            {"iaid": "C123456", "referenceNumber": "TEST 123/456"}
+        )
+        self.request = RequestFactory().get("/catalogue/id/C123456/")
+
+    def tearDown(self):
+        caches["api"].clear()
+
+    @responses.activate
+    def test_cache_hit_has_the_same_delivery_options(self):
+        responses.add(
+            responses.GET, self.url, json=self.delivery_options, status=200
+        )
+
+        first = delivery_options_request_handler("C123456")
+        second = delivery_options_request_handler("C123456")
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(get_metrics()["delivery_options_cache.hits"], 1)
+        self.assertEqual(
+            construct_delivery_options(second, self.record, self.request),
+            construct_delivery_options(first, self.record, self.request),
+        )
+
+    @responses.activate
+    def test_no_match_is_cached(self):
+        for status, body in ((200, []), (404, None)):
+            with self.subTest(status):
+                caches["api"].clear()
+                responses.reset()
+                responses.add(responses.GET, self.url, json=body, status=status)
+
+                for _ in range(2):
+                    with self.assertLogs(
+                        "app.deliveryoptions.api", level="ERROR"
+                    ), self.assertRaisesMessage(
+                        Exception,
+                        "Delivery Options database is currently unavailable",
+                    ) as context:
+                        delivery_options_request_handler("C123456")
+                    self.assertIsInstance(
+                        context.exception.__cause__, NoDeliveryOptions
+                    )
+
+                self.assertEqual(len(responses.calls), 1)
+
+        self.assertEqual(
+            get_metrics()["delivery_options_cache.not_found_hits"], 2
+        )
+
+    @responses.activate
+    def test_invalid_response_is_not_cached(self):
+        responses.add(
+            responses.GET, self.url, json=[{"invalid_key": "value"}], status=200
+        )
+
+        for _ in range(2):
+            with self.assertLogs(
+                "app.deliveryoptions.api", level="ERROR"
+            ), self.assertRaises(Exception):
+                delivery_options_request_handler("C123456")
+
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    @override_settings(DELIVERY_OPTIONS_CACHE_NOT_FOUND_TIMEOUT=0)
+    def test_negative_caching_disabled(self):
+        responses.add(responses.GET, self.url, json=[], status=200)
+
+        for _ in range(2):
+            with self.assertLogs(
+                "app.deliveryoptions.api", level="ERROR"
+            ), self.assertRaises(Exception):
+                delivery_options_request_handler("C123456")
+
+        self.assertEqual(len(responses.calls), 2)
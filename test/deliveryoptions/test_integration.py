@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import MagicMock, patch
 
@@ -27,7 +28,7 @@ class DeliveryOptionsIntegrationTestCase(unittest.TestCase):
         self.request = MagicMock()
         self.request.META = {"REMOTE_ADDR": "192.168.1.1"}
 
-    @patch("app.lib.api.get")
+    @patch("app.lib.api.Session.get")
     @patch(
         "django.conf.settings.DELIVERY_OPTIONS_API_URL",
         "https://api.test.com/delivery-options",
@@ -37,16 +38,18 @@ class DeliveryOptionsIntegrationTestCase(unittest.TestCase):
         # Create a mock response object
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = [
-            {
-                "options": AvailabilityCondition.DigitizedDiscovery,
-                "surrogateLinks": [
-                    {
-                        "xReferenceURL": '<a href="https://test.nationalarchives.gov.uk/document/TEST123">View document</a>'
-                    }
-                ],
-            }
-        ]
+        mock_response.content = json.dumps(
+            [
+                {
+                    "options": AvailabilityCondition.DigitizedDiscovery,
+                    "surrogateLinks": [
+                        {
+                            "xReferenceURL": '<a href="https://test.nationalarchives.gov.uk/document/TEST123">View document</a>'
+                        }
+                    ],
+                }
+            ]
+        ).encode()
         mock_get.return_value = mock_response
 
         # Call the function under test
@@ -177,7 +180,7 @@ class DeliveryOptionsAdditionalTests(unittest.TestCase):
         self.record = MagicMock(spec=Record)
         self.record.iaid = "C123456"
 
-    @patch("app.lib.api.get")
+    @patch("app.lib.api.Session.get")
     @patch(
         "django.conf.settings.DELIVERY_OPTIONS_API_URL",
         "https://api.test.com/delivery-options",
@@ -187,7 +190,7 @@ class DeliveryOptionsAdditionalTests(unittest.TestCase):
         # Setup mock response with an empty list
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = []
+        mock_response.content = json.dumps([]).encode()
         mock_get.return_value = mock_response
 
         # Instead of expecting ValueError
@@ -199,7 +202,7 @@ class DeliveryOptionsAdditionalTests(unittest.TestCase):
             str(context.exception),
         )
 
-    @patch("app.lib.api.get")
+    @patch("app.lib.api.Session.get")
     @patch(
         "django.conf.settings.DELIVERY_OPTIONS_API_URL",
         "https://api.test.com/delivery-options",
@@ -209,7 +212,7 @@ class DeliveryOptionsAdditionalTests(unittest.TestCase):
         # Setup mock response with malformed data
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = [{"invalid_key": "value"}]
+        mock_response.content = json.dumps([{"invalid_key": "value"}]).encode()
         mock_get.return_value = mock_response
 
         # Instead of expecting ValueError
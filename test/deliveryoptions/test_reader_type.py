@@ -1,15 +1,21 @@
 import logging
+import random
 import unittest
+from ipaddress import IPv4Address, IPv6Address, ip_network
 from unittest.mock import Mock, patch
 
+from app.deliveryoptions.constants import Reader
 from app.deliveryoptions.reader_type import (
+    IPNetworkIndex,
+    _get_cidr_index,
     get_client_ip,
+    get_reader_type,
     is_ip_in_cidr,
     is_onsite,
     is_staff,
 )
 from django.conf import settings
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, TestCase, override_settings
 
 
 @override_settings(
@@ -162,3 +168,115 @@ class TestGetDevReaderType(TestCase):
     def tearDownClass(cls):
         logging.disable(logging.NOTSET)
         super().tearDownClass()
+
+    @override_settings(
+        STAFFIN_IP_ADDRESSES=["10.252.16.0/21"],
+        ONSITE_IP_ADDRESSES=["167.98.93.94/32", "2001:db8::/32"],
+    )
+    def test_get_reader_type(self):
+        for remote_addr, reader_type in (
+            ("10.252.21.17", Reader.STAFFIN),
+            ("167.98.93.94", Reader.ONSITEPUBLIC),
+            ("2001:db8:4::1", Reader.ONSITEPUBLIC),
+            ("8.8.8.8", Reader.OFFSITE),
+        ):
+            with self.subTest(remote_addr):
+                request = RequestFactory().get("/", REMOTE_ADDR=remote_addr)
+                self.assertEqual(get_reader_type(request), reader_type)
+
+    def test_reader_type_is_determined_once_per_request(self):
+        request = RequestFactory().get("/", REMOTE_ADDR="8.8.8.8")
+        with patch(
+            "app.deliveryoptions.reader_type.determine_reader_type",
+            return_value=Reader.OFFSITE,
+        ) as mock_determine:
+            self.assertEqual(get_reader_type(request), Reader.OFFSITE)
+            self.assertEqual(get_reader_type(request), Reader.OFFSITE)
+        mock_determine.assert_called_once_with(request)
+
+    def test_network_index_follows_settings(self):
+        with override_settings(ONSITE_IP_ADDRESSES=["10.0.0.0/8"]):
+            self.assertTrue(is_onsite("10.1.2.3"))
+        with override_settings(ONSITE_IP_ADDRESSES=["192.168.0.0/16"]):
+            self.assertFalse(is_onsite("10.1.2.3"))
+
+
+class TestIPNetworkIndex(TestCase):
+    def test_same_result_as_ip_network(self):
+        rng = random.Random(0)
+        cidrs = [
+            f"{IPv4Address(rng.getrandbits(32))}/{rng.randint(8, 32)}"
+            for _ in range(200)
+        ] + [
+            f"{IPv6Address(rng.getrandbits(128))}/{rng.randint(16, 128)}"
+            for _ in range(50)
+        ]
+        networks = [ip_network(cidr, strict=False) for cidr in cidrs]
+        index = IPNetworkIndex(cidrs)
+
+        addresses = [IPv4Address(rng.getrandbits(32)) for _ in range(500)]
+        addresses += [IPv6Address(rng.getrandbits(128)) for _ in range(100)]
+        for network in networks:
+            # the bounds of the network and the addresses next to them
+            first = int(network.network_address)
+            last = int(network.broadcast_address)
+            address_class = type(network.network_address)
+            addresses += [
+                address_class(value)
+                for value in (first - 1, first, last, last + 1)
+                if 0 <= value < 2**network.max_prefixlen
+            ]
+        for address in addresses:
+            with self.subTest(str(address)):
+                self.assertEqual(
+                    str(address) in index,
+                    any(address in network for network in networks),
+                )
+
+    def test_networks_are_merged(self):
+        index = IPNetworkIndex(
+            ["10.0.0.0/24", "10.0.1.0/24", "10.0.0.128/25", " 10.0.3.1/24 "]
+        )
+        self.assertEqual(len(index), 2)
+        self.assertIn("10.0.1.255", index)
+        self.assertNotIn("10.0.2.0", index)
+        self.assertIn("10.0.3.255", index)
+
+    def test_ipv4_address_not_in_ipv6_network(self):
+        index = IPNetworkIndex(["::/0"])
+        self.assertIn("2001:db8::1", index)
+        self.assertNotIn("10.0.0.1", index)
+
+    def test_invalid_cidr(self):
+        with self.assertRaises(ValueError):
+            IPNetworkIndex(["10.0.0.0/33"])
+
+    def test_invalid_cidr_is_skipped(self):
+        with self.assertLogs(
+            "app.deliveryoptions.reader_type", level="ERROR"
+        ) as lc:
+            index = IPNetworkIndex(
+                ["10.0.0.0/33", "10.0.1.0/24"], skip_invalid=True
+            )
+        self.assertEqual(len(lc.output), 1)
+        self.assertIn("10.0.1.1", index)
+
+    @override_settings(STAFFIN_IP_ADDRESSES=["not-a-cidr", "10.252.16.0/21"])
+    def test_invalid_cidr_in_setting_is_logged_once(self):
+        with self.assertLogs(
+            "app.deliveryoptions.reader_type", level="ERROR"
+        ) as lc:
+            self.assertTrue(is_staff("10.252.21.4"))
+            self.assertFalse(is_staff("10.1.2.3"))
+        self.assertEqual(len(lc.output), 1)
+
+    def test_is_ip_in_cidr_reuses_index(self):
+        cidrs = ["10.252.16.0/21"]
+        _get_cidr_index.cache_clear()
+        with patch(
+            "app.deliveryoptions.reader_type.IPNetworkIndex",
+            wraps=IPNetworkIndex,
+        ) as index_class:
+            for _ in range(3):
+                self.assertTrue(is_ip_in_cidr("10.252.21.4", cidrs))
+        self.assertEqual(index_class.call_count, 1)
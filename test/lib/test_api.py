@@ -1,7 +1,17 @@
+import asyncio
+from unittest.mock import patch
+
 import responses
-from app.lib.api import JSONAPIClient, rosetta_request_handler
+from app.lib.api import (
+    AsyncJSONAPIClient,
+    JSONAPIClient,
+    ResourceNotFound,
+    close_sessions,
+    get_session,
+    rosetta_request_handler,
+)
 from django.conf import settings
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 
 
 class TestJSONAPIClientGetRequest(SimpleTestCase):
@@ -23,3 +33,91 @@ class TestJSONAPIClientGetRequest(SimpleTestCase):
             reponse_dict,
             {"data": [{"@template": {"details": {"iaid": "C123456"}}}]},
         )
+
+
+class TestJSONAPIClientSessions(SimpleTestCase):
+
+    def tearDown(self):
+        close_sessions()
+
+    def test_session_is_reused_per_upstream(self):
+        self.assertIs(
+            get_session(settings.ROSETTA_API_URL),
+            get_session(settings.ROSETTA_API_URL),
+        )
+        self.assertIsNot(
+            get_session(settings.ROSETTA_API_URL),
+            get_session("https://wagtail.test/api/v2"),
+        )
+
+    @override_settings(JSON_API_POOL_CONNECTIONS=3, JSON_API_POOL_MAXSIZE=7)
+    def test_session_pool_size_from_settings(self):
+        adapter = get_session(settings.ROSETTA_API_URL).get_adapter(
+            settings.ROSETTA_API_URL
+        )
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+
+    @responses.activate
+    def test_client_uses_pooled_session(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            status=200,
+            json={"data": []},
+        )
+        session = get_session(settings.ROSETTA_API_URL)
+
+        with patch.object(session, "get", wraps=session.get) as mock_get:
+            JSONAPIClient(settings.ROSETTA_API_URL, {"id": "C123456"}).get(
+                "get"
+            )
+            JSONAPIClient(settings.ROSETTA_API_URL, {"id": "C123456"}).get(
+                "get"
+            )
+
+        self.assertEqual(mock_get.call_count, 2)
+
+
+class TestAsyncJSONAPIClient(SimpleTestCase):
+
+    @responses.activate
+    def test_response_with_ok_200(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            status=200,
+            json={"data": [{"@template": {"details": {"iaid": "C123456"}}}]},
+        )
+        client = AsyncJSONAPIClient(settings.ROSETTA_API_URL, {"id": "C123456"})
+
+        response_dict = asyncio.run(client.get("get"))
+
+        self.assertDictEqual(
+            response_dict,
+            {"data": [{"@template": {"details": {"iaid": "C123456"}}}]},
+        )
+
+    @responses.activate
+    def test_resource_not_found_with_404(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            status=404,
+        )
+        client = AsyncJSONAPIClient(settings.ROSETTA_API_URL, {"id": "C123456"})
+
+        with self.assertRaisesMessage(ResourceNotFound, "Resource not found"):
+            asyncio.run(client.get("get"))
+
+    @responses.activate
+    def test_bad_request_with_400(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            status=400,
+        )
+        client = AsyncJSONAPIClient(settings.ROSETTA_API_URL, {"id": "C123456"})
+
+        with self.assertRaisesMessage(Exception, "Bad request"):
+            asyncio.run(client.get("get"))
@@ -1,10 +1,12 @@
+import time
 import unittest.mock as mock
 
 import responses
 from app.lib.api import JSONAPIClient, ResourceNotFound, rosetta_request_handler
+from app.lib.deadline import TimeBudgetExceeded, request_deadline
 from django.conf import settings
 from django.test import SimpleTestCase, override_settings
-from requests import Timeout, TooManyRedirects
+from requests import ConnectTimeout, Timeout, TooManyRedirects
 
 
 class TestRosettaRequestHandlerException(SimpleTestCase):
@@ -158,3 +160,110 @@ class TestJSONAPIClientExceptionsGetRequest(SimpleTestCase):
             "ERROR:app.lib.api:Unknown JSON API exception: THIS IS AN UNKNOWN API EXCEPTION",
             lc.output,
         )
+
+
+class TestJSONAPIClientTimeBudget(SimpleTestCase):
+
+    @responses.activate
+    def test_timeouts_from_settings(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            json={"data": []},
+        )
+
+        with override_settings(
+            ROSETTA_API_CONNECT_TIMEOUT=1.5, ROSETTA_API_READ_TIMEOUT=4
+        ):
+            _ = rosetta_request_handler(uri="get", params={"id": "C123456"})
+
+        self.assertEqual(
+            responses.calls[0].request.req_kwargs["timeout"], (1.5, 4)
+        )
+
+    @responses.activate
+    def test_timeouts_limited_by_request_budget(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            json={"data": []},
+        )
+
+        with request_deadline(2):
+            _ = rosetta_request_handler(uri="get", params={"id": "C123456"})
+
+        connect_timeout, read_timeout = responses.calls[0].request.req_kwargs[
+            "timeout"
+        ]
+        self.assertLessEqual(connect_timeout, 2)
+        self.assertLessEqual(read_timeout, 2)
+
+    @responses.activate
+    def test_budget_exhausted_before_request(self):
+        with request_deadline(0.001):
+            time.sleep(0.002)
+            with self.assertRaisesMessage(
+                TimeBudgetExceeded, "Request time budget exhausted"
+            ):
+                with self.assertLogs("app.lib.api", level="ERROR") as lc:
+                    _ = rosetta_request_handler(
+                        uri="get", params={"id": "C123456"}
+                    )
+        self.assertIn(
+            "ERROR:app.lib.api:Request time budget exhausted before calling https://rosetta.test/data/get",
+            lc.output,
+        )
+        self.assertEqual(len(responses.calls), 0)
+
+    @responses.activate
+    def test_budget_exhausted_during_request(self):
+        def slow_response(request):
+            time.sleep(0.002)
+            raise Timeout()
+
+        responses.add_callback(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get",
+            callback=slow_response,
+        )
+
+        with request_deadline(0.001):
+            with self.assertRaisesMessage(
+                TimeBudgetExceeded, "Request time budget exhausted"
+            ):
+                with self.assertLogs("app.lib.api", level="ERROR") as lc:
+                    _ = rosetta_request_handler(
+                        uri="get", params={"id": "C123456"}
+                    )
+        self.assertIn(
+            "ERROR:app.lib.api:Request time budget exhausted calling https://rosetta.test/data/get",
+            lc.output,
+        )
+
+    @responses.activate
+    def test_budget_exhausted_while_connecting(self):
+        def slow_connect(request):
+            time.sleep(0.002)
+            raise ConnectTimeout()
+
+        responses.add_callback(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get",
+            callback=slow_connect,
+        )
+
+        with request_deadline(0.001):
+            with self.assertRaisesMessage(
+                TimeBudgetExceeded, "Request time budget exhausted"
+            ):
+                with self.assertLogs("app.lib.api", level="ERROR") as lc:
+                    _ = rosetta_request_handler(
+                        uri="get", params={"id": "C123456"}
+                    )
+        self.assertIn(
+            "ERROR:app.lib.api:Request time budget exhausted calling https://rosetta.test/data/get",
+            lc.output,
+        )
+        self.assertNotIn(
+            "ERROR:app.lib.api:JSON API connection error", lc.output
+        )
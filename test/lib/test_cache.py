@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.lib.cache import LRUCache, StaleWhileRevalidateCache
+from app.lib.circuit_breaker import CircuitOpen
+from app.lib.exceptions import (
+    ResourceNotFound,
+    UpstreamClientError,
+    UpstreamUnavailable,
+)
+from app.lib.metrics import get_metrics, reset_metrics
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+
+@override_settings(TEST_CACHE_TIMEOUT=60, TEST_CACHE_MAX_ENTRIES=2)
+class TestLRUCache(SimpleTestCase):
+    def setUp(self):
+        self.cache = LRUCache(
+            "test_cache", "TEST_CACHE_TIMEOUT", "TEST_CACHE_MAX_ENTRIES"
+        )
+        reset_metrics()
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.set("a", {"iaid": "C123456"})
+        self.assertEqual(self.cache.get("a"), {"iaid": "C123456"})
+        self.assertEqual(
+            get_metrics(), {"test_cache.hits": 1, "test_cache.misses": 1}
+        )
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+
+    def test_expired_entry(self):
+        with patch("app.lib.cache.time.monotonic", return_value=1000):
+            self.cache.set("a", 1)
+        with patch("app.lib.cache.time.monotonic", return_value=1059):
+            self.assertEqual(self.cache.get("a"), 1)
+        with patch("app.lib.cache.time.monotonic", return_value=1060):
+            self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+    @override_settings(TEST_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.cache.set("a", 1)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(len(self.cache), 0)
+
+
+@override_settings(
+    TEST_CACHE_TIMEOUT=60,
+    TEST_CACHE_STALE_TIMEOUT=60,
+    TEST_CACHE_STALE_IF_ERROR_TIMEOUT=600,
+)
+class TestStaleWhileRevalidateCache(SimpleTestCase):
+    def setUp(self):
+        self.cache = StaleWhileRevalidateCache(
+            "test_cache",
+            "TEST_CACHE_TIMEOUT",
+            "TEST_CACHE_STALE_TIMEOUT",
+            "TEST_CACHE_STALE_IF_ERROR_TIMEOUT",
+        )
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.calls = 0
+        caches["api"].clear()
+        reset_metrics()
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def fetch(self):
+        self.calls += 1
+        return {"calls": self.calls}
+
+    def fail(self):
+        raise UpstreamUnavailable("Request failed")
+
+    def get(self, now, fetch, **kwargs):
+        with patch("app.lib.cache.time.time", return_value=now), patch(
+            "app.lib.cache.get_refresh_executor", return_value=self.executor
+        ):
+            return self.cache.get("a", fetch, **kwargs)
+
+    def cached(self, now):
+        with patch("app.lib.cache.time.time", return_value=now):
+            return caches["api"].get(self.cache.cache_key("a"))
+
+    def test_fresh_value_is_cached(self):
+        self.assertEqual(self.get(1000, self.fetch), {"calls": 1})
+        self.assertEqual(self.get(1059, self.fetch), {"calls": 1})
+        self.assertEqual(
+            get_metrics(), {"test_cache.hits": 1, "test_cache.misses": 1}
+        )
+
+    def test_stale_value_is_served_and_refreshed(self):
+        self.get(1000, self.fetch)
+        with patch("app.lib.cache.time.time", return_value=1061):
+            self.assertEqual(self.get(1061, self.fetch), {"calls": 1})
+            self.executor.shutdown(wait=True)
+            self.assertEqual(self.get(1062, self.fetch), {"calls": 2})
+        self.assertEqual(get_metrics()["test_cache.refreshes"], 1)
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.get(1000, self.fetch)
+        with patch("app.lib.cache.time.time", return_value=1061):
+            self.assertEqual(self.get(1061, self.fail), {"calls": 1})
+            self.executor.shutdown(wait=True)
+        self.assertEqual(get_metrics()["test_cache.refresh_errors"], 1)
+        # the stale value is still there and can be refreshed again
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.assertEqual(self.get(1062, self.fetch), {"calls": 1})
+
+    def test_stale_value_is_served_on_error(self):
+        self.get(1000, self.fetch)
+        self.assertEqual(self.get(1121, self.fail), {"calls": 1})
+        self.assertEqual(get_metrics()["test_cache.stale_on_error"], 1)
+        with self.assertRaisesMessage(Exception, "Request failed"):
+            self.get(1661, self.fail)
+
+    def test_stale_value_is_served_on_circuit_open(self):
+        def circuit_open():
+            raise CircuitOpen("Circuit open")
+
+        self.get(1000, self.fetch)
+        self.assertEqual(self.get(1121, circuit_open), {"calls": 1})
+
+    def test_stale_value_is_not_served_on_other_errors(self):
+        def invalid():
+            raise Exception("No data returned")
+
+        self.get(1000, self.fetch)
+        with self.assertRaisesMessage(Exception, "No data returned"):
+            self.get(1121, invalid)
+        self.assertNotIn("test_cache.stale_on_error", get_metrics())
+        # the entry is kept, the upstream may still have the data
+        self.assertIsNotNone(self.cached(1122))
+
+    def test_entry_is_deleted_when_upstream_no_longer_has_it(self):
+        for error in (
+            ResourceNotFound("Resource not found"),
+            UpstreamClientError("Forbidden"),
+        ):
+            with self.subTest(error):
+                caches["api"].clear()
+
+                def gone():
+                    raise error
+
+                self.get(1000, self.fetch)
+                with self.assertRaisesMessage(type(error), str(error)):
+                    self.get(1121, gone)
+                self.assertIsNone(self.cached(1122))
+
+    def test_failed_refresh_drops_entry_upstream_no_longer_has(self):
+        def gone():
+            raise ResourceNotFound("Resource not found")
+
+        self.get(1000, self.fetch)
+        with patch("app.lib.cache.time.time", return_value=1061):
+            self.assertEqual(self.get(1061, gone), {"calls": 1})
+            self.executor.shutdown(wait=True)
+        self.assertEqual(get_metrics()["test_cache.evictions"], 1)
+        self.assertIsNone(self.cached(1062))
+
+    def test_use_cache_false_fetches_and_raises(self):
+        self.get(1000, self.fetch)
+        self.assertEqual(
+            self.get(1001, self.fetch, use_cache=False), {"calls": 2}
+        )
+        with self.assertRaisesMessage(Exception, "Request failed"):
+            self.get(1002, self.fail, use_cache=False)
+        self.assertEqual(self.get(1003, self.fetch), {"calls": 2})
+
+    @override_settings(TEST_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        self.get(1000, self.fetch)
+        self.assertEqual(self.get(1001, self.fetch), {"calls": 2})
+
+
+class TestAPICache(SimpleTestCase):
+    def test_max_entries(self):
+        self.assertEqual(
+            caches["api"]._max_entries, settings.API_CACHE_MAX_ENTRIES
+        )
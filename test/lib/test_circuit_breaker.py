@@ -0,0 +1,207 @@
+import time
+from http import HTTPStatus
+from unittest.mock import patch
+
+import responses
+from app.deliveryoptions.api import delivery_options_request_handler
+from app.lib.api import JSONAPIClient
+from app.lib.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpen,
+    get_circuit_breaker,
+    reset_circuit_breakers,
+)
+from app.lib.deadline import TimeBudgetExceeded, request_deadline
+from app.lib.metrics import get_metrics, reset_metrics
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from requests import ConnectionError, ConnectTimeout
+
+
+@override_settings(
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD=2, CIRCUIT_BREAKER_RESET_TIMEOUT=30
+)
+class TestCircuitBreaker(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("upstream.test")
+        reset_metrics()
+
+    def open_breaker(self, now=1000):
+        with patch("app.lib.circuit_breaker.time.monotonic", return_value=now):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_open_breaker_fails_fast(self):
+        self.open_breaker()
+        with patch("app.lib.circuit_breaker.time.monotonic", return_value=1029):
+            with self.assertRaisesMessage(
+                CircuitOpen, "upstream.test is unavailable"
+            ):
+                self.breaker.before_call()
+        self.assertEqual(
+            get_metrics(),
+            {
+                "circuit_breaker.upstream.test.open": 1,
+                "circuit_breaker.upstream.test.rejected": 1,
+            },
+        )
+
+    def test_half_open_breaker_lets_one_probe_through(self):
+        self.open_breaker()
+        with patch("app.lib.circuit_breaker.time.monotonic", return_value=1030):
+            self.breaker.before_call()
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+            with self.assertRaises(CircuitOpen):
+                self.breaker.before_call()
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_failed_probe_opens_breaker_again(self):
+        self.open_breaker()
+        with patch("app.lib.circuit_breaker.time.monotonic", return_value=1030):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+            self.assertEqual(self.breaker.state, OPEN)
+            with self.assertRaises(CircuitOpen):
+                self.breaker.before_call()
+
+    def test_state_changes_are_logged(self):
+        with self.assertLogs("app.lib.circuit_breaker", level="INFO") as lc:
+            self.open_breaker()
+            with patch(
+                "app.lib.circuit_breaker.time.monotonic", return_value=1030
+            ):
+                self.breaker.before_call()
+            self.breaker.record_success()
+        self.assertEqual(
+            lc.output,
+            [
+                "WARNING:app.lib.circuit_breaker:Circuit breaker for upstream.test closed -> open",
+                "WARNING:app.lib.circuit_breaker:Circuit breaker for upstream.test open -> half_open",
+                "INFO:app.lib.circuit_breaker:Circuit breaker for upstream.test half_open -> closed",
+            ],
+        )
+
+    @override_settings(CIRCUIT_BREAKER_FAILURE_THRESHOLD=0)
+    def test_disabled(self):
+        self.open_breaker()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+@override_settings(
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD=2, CIRCUIT_BREAKER_RESET_TIMEOUT=30
+)
+class TestJSONAPIClientCircuitBreaker(TestCase):
+    def setUp(self):
+        reset_circuit_breakers()
+
+    def tearDown(self):
+        reset_circuit_breakers()
+
+    @responses.activate
+    def test_server_errors_open_breaker_per_upstream(self):
+        responses.add(
+            responses.GET, f"{settings.ROSETTA_API_URL}/search", status=502
+        )
+        client = JSONAPIClient(settings.ROSETTA_API_URL)
+
+        for _ in range(2):
+            with self.assertRaisesMessage(Exception, "Request failed"):
+                client.get("search")
+        with self.assertRaises(CircuitOpen):
+            client.get("search")
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(
+            get_circuit_breaker(settings.ROSETTA_API_URL).state, OPEN
+        )
+        self.assertEqual(
+            get_circuit_breaker(settings.DELIVERY_OPTIONS_API_URL).state,
+            CLOSED,
+        )
+
+    @responses.activate
+    def test_exhausted_time_budget_does_not_count_as_failure(self):
+        for error in (ConnectTimeout, ConnectionError):
+            with self.subTest(error.__name__):
+
+                def slow_connect(request):
+                    time.sleep(0.002)
+                    raise error()
+
+                responses.reset()
+                responses.add_callback(
+                    responses.GET,
+                    f"{settings.ROSETTA_API_URL}/get",
+                    callback=slow_connect,
+                )
+                client = JSONAPIClient(settings.ROSETTA_API_URL)
+
+                with request_deadline(0.001), self.assertLogs(
+                    "app.lib.api", level="ERROR"
+                ), self.assertRaises(TimeBudgetExceeded):
+                    client.get("get")
+                self.assertEqual(
+                    get_circuit_breaker(settings.ROSETTA_API_URL).failures, 0
+                )
+
+    @responses.activate
+    def test_not_found_does_not_count_as_failure(self):
+        responses.add(
+            responses.GET, f"{settings.ROSETTA_API_URL}/get", status=404
+        )
+        client = JSONAPIClient(settings.ROSETTA_API_URL)
+
+        for _ in range(3):
+            with self.assertRaisesMessage(Exception, "Resource not found"):
+                client.get("get")
+
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_open_breaker_responds_with_service_unavailable_503(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get",
+            body=ConnectionError(),
+        )
+
+        for _ in range(2):
+            with self.assertLogs("app.errors.middleware", level="ERROR"):
+                self.client.get("/catalogue/id/C123456/")
+        with self.assertLogs("app.errors.middleware", level="WARNING") as lc:
+            response = self.client.get("/catalogue/id/C123456/")
+
+        self.assertIn(
+            "rosetta.test is unavailable: /catalogue/id/C123456/",
+            "".join(lc.output),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.SERVICE_UNAVAILABLE)
+        self.assertEqual(len(responses.calls), 2)
+
+    @override_settings(DELIVERY_OPTIONS_API_URL="https://doris.test/api")
+    @responses.activate
+    def test_open_delivery_options_breaker_fails_fast(self):
+        get_circuit_breaker("https://doris.test/api").record_failure()
+        get_circuit_breaker("https://doris.test/api").record_failure()
+
+        # the caller falls back to the OrderException delivery option
+        with self.assertRaisesMessage(
+            Exception, "Delivery Options database is currently unavailable"
+        ):
+            delivery_options_request_handler("C123456")
+
+        self.assertEqual(len(responses.calls), 0)
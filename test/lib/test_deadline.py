@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from app.lib.deadline import remaining_time, request_deadline, time_budget
+from django.test import SimpleTestCase, override_settings
+
+
+class TestRequestDeadline(SimpleTestCase):
+
+    def test_no_budget_set(self):
+        self.assertIsNone(remaining_time())
+
+    def test_request_deadline(self):
+        with request_deadline(10):
+            self.assertGreater(remaining_time(), 9)
+            self.assertLessEqual(remaining_time(), 10)
+        self.assertIsNone(remaining_time())
+
+    def test_nested_request_deadline_only_shortens(self):
+        with request_deadline(5):
+            with request_deadline(60):
+                self.assertLessEqual(remaining_time(), 5)
+            with request_deadline(1):
+                self.assertLessEqual(remaining_time(), 1)
+
+    def test_request_deadline_exhausted(self):
+        with request_deadline(0.001):
+            time.sleep(0.002)
+            self.assertLessEqual(remaining_time(), 0)
+
+
+class TestTimeBudgetDecorator(SimpleTestCase):
+
+    @override_settings(REQUEST_TIME_BUDGET=7)
+    def test_default_budget_from_settings(self):
+        @time_budget()
+        def view(request):
+            return remaining_time()
+
+        self.assertGreater(view(None), 6)
+        self.assertLessEqual(view(None), 7)
+        self.assertIsNone(remaining_time())
+
+    def test_explicit_budget(self):
+        @time_budget(2)
+        def view(request):
+            return remaining_time()
+
+        self.assertLessEqual(view(None), 2)
+
+    def test_async_view(self):
+        @time_budget(3)
+        async def view(request):
+            await asyncio.sleep(0)
+            return remaining_time()
+
+        result = asyncio.run(view(None))
+        self.assertGreater(result, 2)
+        self.assertLessEqual(result, 3)
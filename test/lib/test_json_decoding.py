@@ -0,0 +1,63 @@
+from unittest.mock import patch
+
+import responses
+from app.lib.api import JSONAPIClient
+from app.lib.json_decoding import (
+    DECODERS,
+    _get_json_decoder,
+    decode_json,
+    get_json_decoder,
+)
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+
+class TestJSONDecoders(SimpleTestCase):
+    def setUp(self):
+        _get_json_decoder.cache_clear()
+
+    def tearDown(self):
+        _get_json_decoder.cache_clear()
+
+    def test_decoders_agree(self):
+        content = '{"data": [{"title": "Caf\\u00e9 \\u2013 1914", "n": 1.5}]}'
+        for name, decoder in DECODERS.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    decoder(content.encode()),
+                    {"data": [{"title": "Café – 1914", "n": 1.5}]},
+                )
+
+    def test_decoders_raise_value_error(self):
+        for name, decoder in DECODERS.items():
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    decoder(b"<html></html>")
+
+    def test_auto_uses_preferred_decoder(self):
+        self.assertEqual(get_json_decoder(), next(iter(DECODERS.values())))
+
+    @override_settings(JSON_DECODER="json")
+    def test_stdlib_decoder(self):
+        self.assertEqual(get_json_decoder(), decode_json)
+
+    @override_settings(JSON_DECODER="simdjson")
+    def test_missing_decoder_falls_back_to_stdlib(self):
+        with self.assertLogs("app.lib.json_decoding", level="WARNING"):
+            self.assertEqual(get_json_decoder(), decode_json)
+
+    @responses.activate
+    def test_client_uses_configured_decoder(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json={"data": []},
+        )
+
+        with patch(
+            "app.lib.json_decoding.DECODERS",
+            {"fake": lambda content: {"decoded": content}},
+        ):
+            result = JSONAPIClient(settings.ROSETTA_API_URL).get("search")
+
+        self.assertEqual(result, {"decoded": b'{"data": []}'})
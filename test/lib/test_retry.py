@@ -0,0 +1,114 @@
+from unittest.mock import patch
+
+import responses
+from app.lib.api import JSONAPIClient
+from app.lib.deadline import request_deadline
+from app.lib.metrics import get_metrics, reset_metrics
+from app.lib.retry import RetryBudget, backoff_delay, reset_retry_budgets
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+from requests import ConnectionError
+
+
+@override_settings(JSON_API_RETRY_BACKOFF=0.1, JSON_API_RETRY_BACKOFF_MAX=0.3)
+class TestBackoffDelay(SimpleTestCase):
+    def test_delay_is_jittered_up_to_an_exponential_cap(self):
+        with patch("app.lib.retry.random.uniform", side_effect=max):
+            self.assertEqual(backoff_delay(1), 0.1)
+            self.assertEqual(backoff_delay(2), 0.2)
+            self.assertEqual(backoff_delay(3), 0.3)
+        with patch("app.lib.retry.random.uniform", side_effect=min):
+            self.assertEqual(backoff_delay(3), 0)
+
+
+@override_settings(JSON_API_RETRY_BUDGET_RATIO=0.5, JSON_API_RETRY_BUDGET_MAX=2)
+class TestRetryBudget(SimpleTestCase):
+    def test_retries_are_limited_to_a_ratio_of_calls(self):
+        budget = RetryBudget("upstream.test")
+        self.assertTrue(budget.withdraw())
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+        budget.record_call()
+        self.assertFalse(budget.withdraw())
+        budget.record_call()
+        self.assertTrue(budget.withdraw())
+
+    def test_tokens_are_capped(self):
+        budget = RetryBudget("upstream.test")
+        for _ in range(10):
+            budget.record_call()
+        self.assertEqual(budget.tokens, 2)
+
+
+@override_settings(
+    JSON_API_RETRY_BUDGET_RATIO=0.1, JSON_API_RETRY_BUDGET_MAX=10
+)
+@patch("app.lib.api.time.sleep")
+class TestJSONAPIClientRetries(SimpleTestCase):
+    def setUp(self):
+        reset_retry_budgets()
+        reset_metrics()
+        self.client = JSONAPIClient(settings.ROSETTA_API_URL, retries=2)
+        self.url = f"{settings.ROSETTA_API_URL}/get"
+
+    def tearDown(self):
+        reset_retry_budgets()
+
+    @responses.activate
+    def test_connection_error_is_retried(self, mock_sleep):
+        responses.add(responses.GET, self.url, body=ConnectionError())
+        responses.add(responses.GET, self.url, json={"data": []})
+
+        self.assertEqual(self.client.get("get"), {"data": []})
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertEqual(get_metrics()["json_api.retries"], 1)
+
+    @responses.activate
+    def test_unavailable_response_is_retried_up_to_max(self, mock_sleep):
+        responses.add(responses.GET, self.url, status=503)
+
+        with self.assertRaisesMessage(Exception, "Request failed"):
+            self.client.get("get")
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_client_errors_are_not_retried(self, mock_sleep):
+        for status in (400, 403, 404):
+            responses.add(responses.GET, self.url, status=status)
+            with self.assertRaises(Exception):
+                self.client.get("get")
+            responses.reset()
+        self.assertEqual(mock_sleep.call_count, 0)
+
+    @responses.activate
+    def test_no_retries_by_default(self, mock_sleep):
+        responses.add(responses.GET, self.url, body=ConnectionError())
+
+        with self.assertRaisesMessage(Exception, "A connection error occured"):
+            JSONAPIClient(settings.ROSETTA_API_URL).get("get")
+        self.assertEqual(len(responses.calls), 1)
+
+    @override_settings(JSON_API_RETRY_BUDGET_MAX=1)
+    @responses.activate
+    def test_retry_budget_exhausted(self, mock_sleep):
+        reset_retry_budgets()
+        responses.add(responses.GET, self.url, status=502)
+
+        with self.assertRaisesMessage(Exception, "Request failed"):
+            self.client.get("get")
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(get_metrics()["json_api.retry_budget_exhausted"], 1)
+
+    @override_settings(JSON_API_RETRY_BACKOFF=1, JSON_API_RETRY_BACKOFF_MAX=1)
+    @responses.activate
+    def test_retry_does_not_outlast_time_budget(self, mock_sleep):
+        responses.add(responses.GET, self.url, status=504)
+
+        with patch("app.lib.retry.random.uniform", side_effect=max):
+            with request_deadline(0.5):
+                with self.assertRaisesMessage(Exception, "Request failed"):
+                    self.client.get("get")
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(mock_sleep.call_count, 0)
@@ -0,0 +1,163 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import responses
+from app.lib.api import rosetta_request_handler
+from app.lib.deadline import TimeBudgetExceeded
+from app.lib.metrics import get_metrics, reset_metrics
+from app.lib.singleflight import SingleFlight
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+
+def wait_for_coalesced(test, metric, count, timeout=5):
+    """Waits for `count` calls to join the call in flight, fails the test
+    after `timeout` seconds."""
+    give_up_at = time.monotonic() + timeout
+    while get_metrics().get(metric, 0) < count:
+        if time.monotonic() > give_up_at:
+            test.fail(f"{count} calls did not join the call in flight")
+        time.sleep(0.001)
+
+
+class TestSingleFlight(SimpleTestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight("test_single_flight")
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+        reset_metrics()
+
+    def slow_call(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {"data": [1]}
+
+    def failing_call(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        raise Exception("Request failed")
+
+    def run_concurrently(self, fn, keys):
+        """Calls `fn` for each key once the first call is in flight."""
+        with ThreadPoolExecutor(max_workers=len(keys)) as executor:
+            first = executor.submit(self.single_flight.do, keys[0], fn)
+            self.started.wait(5)
+            others = [
+                executor.submit(self.single_flight.do, key, fn)
+                for key in keys[1:]
+            ]
+            try:
+                wait_for_coalesced(
+                    self, "test_single_flight.coalesced", len(others)
+                )
+            finally:
+                self.release.set()
+            return [first, *others]
+
+    def test_identical_calls_are_coalesced(self):
+        futures = self.run_concurrently(self.slow_call, ["a"] * 3)
+        results = [future.result() for future in futures]
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"data": [1]}] * 3)
+        # every caller gets its own copy
+        self.assertIsNot(results[0], results[1])
+        self.assertIsNot(results[1], results[2])
+
+    def test_errors_are_shared(self):
+        futures = self.run_concurrently(self.failing_call, ["a"] * 3)
+
+        errors = []
+        for future in futures:
+            with self.assertRaisesMessage(Exception, "Request failed"):
+                future.result()
+            errors.append(future.exception())
+        self.assertEqual(self.calls, 1)
+        # each follower raises its own error, chained from the leader's
+        self.assertIsNot(errors[1], errors[0])
+        self.assertIsNot(errors[2], errors[1])
+        self.assertIs(errors[1].__cause__, errors[0])
+
+    def test_follower_with_time_left_calls_after_leader_timed_out(self):
+        def call():
+            self.calls += 1
+            if self.calls == 1:
+                self.started.set()
+                self.release.wait(5)
+                raise TimeBudgetExceeded("Request time budget exhausted")
+            return {"data": [1]}
+
+        first, follower = self.run_concurrently(call, ["a"] * 2)
+
+        with self.assertRaises(TimeBudgetExceeded):
+            first.result()
+        self.assertEqual(follower.result(), {"data": [1]})
+        self.assertEqual(self.calls, 2)
+
+    def test_result_is_only_copied_for_followers(self):
+        self.release.set()
+        with patch("app.lib.singleflight.pickle.dumps") as dumps:
+            result = self.single_flight.do("a", self.slow_call)
+
+        self.assertEqual(result, {"data": [1]})
+        dumps.assert_not_called()
+
+    def test_sequential_calls_are_not_coalesced(self):
+        self.release.set()
+        self.single_flight.do("a", self.slow_call)
+        self.single_flight.do("a", self.slow_call)
+
+        self.assertEqual(self.calls, 2)
+
+    @override_settings(SINGLE_FLIGHT_CACHE="api")
+    def test_result_is_shared_between_processes(self):
+        caches["api"].clear()
+        other_process = SingleFlight("test_single_flight")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(self.single_flight.do, "a", self.slow_call)
+            self.started.wait(5)
+            second = executor.submit(other_process.do, "a", self.slow_call)
+            self.release.set()
+
+        self.assertEqual(first.result(), {"data": [1]})
+        self.assertEqual(second.result(), {"data": [1]})
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(
+            get_metrics()["test_single_flight.shared_coalesced"], 1
+        )
+
+
+class TestRosettaRequestHandlerSingleFlight(SimpleTestCase):
+    @responses.activate
+    def test_concurrent_identical_requests_are_coalesced(self):
+        release = threading.Event()
+
+        def callback(request):
+            release.wait(5)
+            return (200, {}, '{"data": []}')
+
+        responses.add_callback(
+            responses.GET, f"{settings.ROSETTA_API_URL}/get", callback=callback
+        )
+        reset_metrics()
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(rosetta_request_handler, "get", {"id": "C1"})
+                for _ in range(3)
+            ]
+            try:
+                wait_for_coalesced(self, "rosetta_single_flight.coalesced", 2)
+            finally:
+                release.set()
+
+        self.assertEqual(
+            [future.result() for future in futures], [{"data": []}] * 3
+        )
+        self.assertEqual(len(responses.calls), 1)
@@ -0,0 +1,47 @@
+from app.lib.slots import SlottedModel, cached_slot
+from django.test import SimpleTestCase
+
+
+class Model(SlottedModel):
+    __slots__ = ("calls",)
+
+    def __init__(self):
+        self.calls = 0
+
+    @cached_slot
+    def value(self):
+        self.calls += 1
+        return "value"
+
+
+class SubModel(Model):
+    @cached_slot
+    def other(self):
+        return self.value.upper()
+
+
+class TestSlottedModel(SimpleTestCase):
+    def test_field_is_computed_once(self):
+        model = Model()
+        self.assertEqual(model.calls, 0)
+        self.assertEqual(model.value, "value")
+        self.assertEqual(model.value, "value")
+        self.assertEqual(model.calls, 1)
+
+    def test_fields_are_slots(self):
+        model = Model()
+        self.assertFalse(hasattr(model, "__dict__"))
+        self.assertEqual(Model.__slots__, ("calls", "value"))
+        self.assertEqual(list(Model._cached_slots), ["value"])
+
+    def test_fields_are_inherited(self):
+        model = SubModel()
+        self.assertEqual(model.other, "VALUE")
+        self.assertEqual(model.calls, 1)
+        self.assertEqual(list(SubModel._cached_slots), ["value", "other"])
+
+    def test_unknown_attribute(self):
+        with self.assertRaisesMessage(
+            AttributeError, "'Model' object has no attribute 'unknown'"
+        ):
+            Model().unknown
@@ -1,6 +1,41 @@
 import unittest
 
-from app.lib.xslt_transformations import apply_schema_xsl, apply_series_xsl
+from app.lib.metrics import get_metrics, reset_metrics
+from app.lib.xslt_transformations import (
+    SCHEMAS,
+    SERIES_TRANSFORMATIONS,
+    _compiled_xslt,
+    apply_generic_xsl,
+    apply_schema_xsl,
+    apply_series_xsl,
+    get_xslt,
+    warm_up_xslt,
+)
+
+
+class XsltRegistryTestCase(unittest.TestCase):
+    def test_compiled_once(self):
+        self.assertIs(get_xslt("Generic.xsl"), get_xslt("Generic.xsl"))
+
+    def test_warm_up(self):
+        _compiled_xslt.clear()
+        reset_metrics()
+        with self.assertLogs("app.lib.xslt_transformations", "WARNING") as lc:
+            warm_up_xslt()
+
+        # Miscellaneous.xsl is listed in SCHEMAS but does not exist
+        self.assertEqual(len(lc.output), 1)
+        self.assertIn("Miscellaneous.xsl", lc.output[0])
+        expected = (
+            set(SCHEMAS.values()) | set(SERIES_TRANSFORMATIONS.values())
+        ) - {"Miscellaneous.xsl"} | {"Generic.xsl"}
+        self.assertEqual(set(_compiled_xslt), expected)
+        self.assertEqual(get_metrics()["xslt.compiles"], len(expected))
+        self.assertGreater(get_metrics()["xslt.compile_time_ms"], 0)
+
+        apply_generic_xsl("<p>Test</p>")
+        self.assertEqual(get_metrics()["xslt.compiles"], len(expected))
+        self.assertEqual(get_metrics()["xslt.transforms"], 1)
 
 
 class XsltTransformationsTestCase(unittest.TestCase):
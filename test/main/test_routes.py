@@ -1,4 +1,7 @@
-from django.test import TestCase
+import responses
+from app.lib.metrics import incr, reset_metrics
+from django.test import TestCase, override_settings
+from responses import matchers
 
 
 class MainTestCase(TestCase):
@@ -6,6 +9,19 @@ class MainTestCase(TestCase):
         rv = self.client.get("/healthcheck/live/")
         self.assertContains(rv, "ok", status_code=200)
 
+    @override_settings(STAFFIN_IP_ADDRESSES=["127.0.0.0/8"])
+    def test_healthcheck_metrics(self):
+        reset_metrics()
+        incr("search_cache.hits")
+        rv = self.client.get("/healthcheck/metrics/")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.json(), {"search_cache.hits": 1})
+
+    @override_settings(STAFFIN_IP_ADDRESSES=["10.0.0.0/8"])
+    def test_healthcheck_metrics_outside_staff_ip_ranges(self):
+        rv = self.client.get("/healthcheck/metrics/")
+        self.assertEqual(rv.status_code, 403)
+
     def test_trailing_slash_redirects(self):
         rv = self.client.get("/healthcheck/live")
         self.assertEqual(rv.status_code, 301)
@@ -24,3 +40,49 @@ class MainTestCase(TestCase):
         self.assertContains(
             rv, '<h1 class="tna-heading-xl">Cookies</h1>', status_code=200
         )
+
+    @override_settings(WAGTAIL_API_URL="https://wagtail.test/api/v2")
+    @responses.activate
+    def test_catalogue(self):
+        for page_id, title in (
+            (55, "Explore the collection page"),
+            (5, "Home page"),
+        ):
+            responses.add(
+                responses.GET,
+                "https://wagtail.test/api/v2/pages/",
+                match=[
+                    matchers.query_param_matcher(
+                        {"child_of": page_id}, strict_match=False
+                    )
+                ],
+                json={
+                    "items": [
+                        {
+                            "title": title,
+                            "full_url": "https://www.nationalarchives.gov.uk/",
+                            "teaser_text": "",
+                        }
+                    ]
+                },
+            )
+
+        rv = self.client.get("/catalogue/")
+
+        self.assertEqual(rv.status_code, 200)
+        self.assertContains(rv, "Explore the collection page")
+        self.assertContains(rv, "Home page")
+
+    @override_settings(WAGTAIL_API_URL="https://wagtail.test/api/v2")
+    @responses.activate
+    def test_catalogue_without_wagtail(self):
+        responses.add(
+            responses.GET,
+            "https://wagtail.test/api/v2/pages/",
+            status=500,
+        )
+
+        with self.assertLogs("app.main.views", level="ERROR"):
+            rv = self.client.get("/catalogue/")
+
+        self.assertEqual(rv.status_code, 200)
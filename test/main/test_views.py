@@ -0,0 +1,121 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import responses
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from responses import matchers
+
+
+@override_settings(
+    WAGTAIL_API_URL="https://wagtail.test/api/v2",
+    WAGTAIL_PAGES_CACHE_TIMEOUT=60,
+)
+class CatalogueViewTests(TestCase):
+    def setUp(self):
+        caches["api"].clear()
+
+    def add_pages_responses(self, callback=None, failing_page_id=None):
+        for page_id, title in (
+            (55, "Explore the collection page"),
+            (5, "Home page"),
+        ):
+            if page_id == failing_page_id:
+                responses.add(
+                    responses.GET,
+                    "https://wagtail.test/api/v2/pages/",
+                    match=[
+                        matchers.query_param_matcher(
+                            {"child_of": page_id}, strict_match=False
+                        )
+                    ],
+                    status=500,
+                )
+                continue
+            responses.add(
+                responses.GET,
+                "https://wagtail.test/api/v2/pages/",
+                match=[
+                    matchers.query_param_matcher(
+                        {"child_of": page_id}, strict_match=False
+                    )
+                ],
+                json={
+                    "items": [
+                        {
+                            "title": title,
+                            "full_url": "https://www.nationalarchives.gov.uk/",
+                            "teaser_text": "",
+                        }
+                    ]
+                },
+            )
+
+    @responses.activate
+    def test_wagtail_pages_are_fetched_concurrently(self):
+        self.add_pages_responses()
+        # both requests have to be in flight at the same time to pass
+        barrier = threading.Barrier(2, timeout=5)
+        original_send = responses.mock._on_request
+
+        def wait_for_both(adapter, request, **kwargs):
+            barrier.wait()
+            return original_send(adapter, request, **kwargs)
+
+        with patch.object(responses.mock, "_on_request", wait_for_both):
+            rv = self.client.get("/catalogue/")
+
+        self.assertEqual(rv.status_code, 200)
+        self.assertContains(rv, "Explore the collection page")
+        self.assertContains(rv, "Home page")
+
+    @responses.activate
+    def test_wagtail_pages_are_cached(self):
+        self.add_pages_responses()
+
+        for _ in range(3):
+            rv = self.client.get("/catalogue/")
+            self.assertContains(rv, "Home page")
+
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_stale_wagtail_pages_are_refreshed_in_background(self):
+        self.add_pages_responses()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        with patch("app.lib.cache.time.time", return_value=1000):
+            rv = self.client.get("/catalogue/")
+        self.assertEqual(len(responses.calls), 2)
+
+        with patch("app.lib.cache.time.time", return_value=1061), patch(
+            "app.lib.cache.get_refresh_executor", return_value=executor
+        ):
+            rv = self.client.get("/catalogue/")
+            # stale pages are served straight away
+            self.assertContains(rv, "Home page")
+            executor.shutdown(wait=True)
+
+        self.assertEqual(len(responses.calls), 4)
+        with patch("app.lib.cache.time.time", return_value=1062):
+            rv = self.client.get("/catalogue/")
+        self.assertEqual(len(responses.calls), 4)
+
+    @responses.activate
+    @override_settings(WAGTAIL_API_RETRIES=0)
+    def test_failed_listing_does_not_empty_the_other(self):
+        self.add_pages_responses(failing_page_id=5)
+
+        for _ in range(2):
+            with self.assertLogs("app.main.views", level="ERROR"):
+                rv = self.client.get("/catalogue/")
+            self.assertEqual(rv.status_code, 200)
+            self.assertContains(rv, "Explore the collection page")
+            self.assertNotContains(rv, "Home page")
+
+        # only the listing that was fetched is cached
+        self.assertEqual(
+            sorted(call.request.params["child_of"] for call in responses.calls),
+            ["5", "5", "55"],
+        )
@@ -1,9 +1,13 @@
+import asyncio
+from unittest.mock import patch
+
 import responses
 from app.lib.api import JSONAPIClient, ResourceNotFound
-from app.records.api import record_details_by_id
+from app.records.api import arecord_details_by_id, record_details_by_id
 from app.records.models import Record
 from django.conf import settings
-from django.test import SimpleTestCase
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
 
 
 class TestRecordDetailsById(SimpleTestCase):
@@ -49,3 +53,180 @@ class TestRecordDetailsById(SimpleTestCase):
             ResourceNotFound, "id C198022 does not exist"
         ):
             _ = record_details_by_id(id="C198022")
+
+
+class TestAsyncRecordDetailsById(SimpleTestCase):
+
+    @responses.activate
+    def test_record_details_by_id_returns_record(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json={"data": [{"@template": {"details": {"iaid": "C198022"}}}]},
+            status=200,
+        )
+        result = asyncio.run(arecord_details_by_id(id="C198022"))
+
+        self.assertIsInstance(result, Record)
+        self.assertEqual(result.iaid, "C198022")
+
+    @responses.activate
+    def test_no_matches_for_id(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json={"data": []},
+            status=200,
+        )
+
+        with self.assertRaisesMessage(
+            ResourceNotFound, "id C198022 does not exist"
+        ):
+            _ = asyncio.run(arecord_details_by_id(id="C198022"))
+
+
+@override_settings(RECORD_CACHE_TIMEOUT=60)
+class TestRecordDetailsCache(TestCase):
+    def setUp(self):
+        caches["api"].clear()
+        self.record_json = {
+            "data": [
+                {
+                    "@template": {
+                        "details": {
+                            "iaid": "C198022",
+                            "title": "Test Title",
+                            "source": "CAT",
+                        }
+                    }
+                }
+            ]
+        }
+
+    def tearDown(self):
+        caches["api"].clear()
+
+    @responses.activate
+    def test_record_is_rebuilt_from_cache(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json=self.record_json,
+            status=200,
+        )
+
+        first = record_details_by_id(id="C198022")
+        second = record_details_by_id(id="C198022")
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertIsInstance(second, Record)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.iaid, "C198022")
+        self.assertEqual(second.title, "Test Title")
+
+    @responses.activate
+    def test_use_cache_false_skips_cached_record(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json=self.record_json,
+            status=200,
+        )
+
+        _ = record_details_by_id(id="C198022")
+        _ = record_details_by_id(id="C198022", use_cache=False)
+
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_stale_record_is_served_on_upstream_error(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json=self.record_json,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            status=500,
+        )
+
+        with patch("app.lib.cache.time.time", return_value=1000):
+            _ = record_details_by_id(id="C198022")
+        # past the stale window, within the stale-if-error window
+        with patch("app.lib.cache.time.time", return_value=1000 + 60 + 3601):
+            record = record_details_by_id(id="C198022")
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(record.iaid, "C198022")
+
+    @responses.activate
+    def test_stale_refresh_keeps_its_own_id(self):
+        other_json = {
+            "data": [
+                {
+                    "@template": {
+                        "details": {
+                            "iaid": "C123456",
+                            "title": "Other Title",
+                            "source": "CAT",
+                        }
+                    }
+                }
+            ]
+        }
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json=self.record_json,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            json=other_json,
+            status=200,
+        )
+        refreshes = []
+
+        with patch("app.lib.cache.time.time", return_value=1000):
+            _ = record_details_by_id(id="C198022")
+        # within the stale window, the refresh is held until another id
+        # has been requested
+        with patch("app.lib.cache.time.time", return_value=1000 + 61):
+            with patch("app.lib.cache.get_refresh_executor") as executor:
+                executor.return_value.submit.side_effect = (
+                    lambda fn, *args: refreshes.append((fn, args))
+                )
+                _ = record_details_by_id(id="C198022")
+            _ = record_details_by_id(id="C123456")
+            for fn, args in refreshes:
+                fn(*args)
+            record = record_details_by_id(id="C198022")
+
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(
+            [call.request.params["id"] for call in responses.calls],
+            ["C198022", "C123456", "C198022"],
+        )
+        self.assertEqual(record.iaid, "C198022")
+
+    @responses.activate
+    def test_record_tabs_share_cache(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C198022",
+            json=self.record_json,
+            status=200,
+        )
+
+        for url in (
+            "/catalogue/id/C198022/",
+            "/catalogue/id/C198022/related/",
+            "/catalogue/id/C198022/help/",
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(responses.calls), 1)
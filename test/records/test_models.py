@@ -1,7 +1,14 @@
+import json
+import tracemalloc
+from pathlib import Path
 from unittest.mock import patch
 
-from app.records.models import Record
-from django.test import SimpleTestCase
+from app.lib.metrics import get_metrics, reset_metrics
+from app.lib.xslt_transformations import apply_schema_xsl
+from app.records.models import APIModel, Record, description_cache
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.utils.functional import cached_property
 
 
 class RecordModelTests(SimpleTestCase):
@@ -1050,3 +1057,157 @@ class RecordModelTests(SimpleTestCase):
         self.assertEqual(
             second_result, ["Test subject"]
         )  # Original value, not modified
+
+
+@override_settings(DESCRIPTION_CACHE_TIMEOUT=60)
+class RecordDescriptionCacheTests(SimpleTestCase):
+    def setUp(self):
+        description_cache.clear()
+        caches["api"].clear()
+        reset_metrics()
+        self.raw_description = (
+            '<emph altrender="doctype">AW</emph><persname><emph altrender="surname">Aarons</emph> '
+            '<emph altrender="forenames">Ethel</emph></persname><emph altrender="num">21906</emph>'
+        )
+
+    def tearDown(self):
+        description_cache.clear()
+
+    def get_record(self, schema="Airwomen"):
+        return Record(
+            {
+                "description": {
+                    "raw": self.raw_description,
+                    "schema": f'<colltype id="{schema}"/>',
+                }
+            }
+        )
+
+    def test_description_is_transformed_once(self):
+        with patch(
+            "app.records.models.apply_schema_xsl",
+            wraps=apply_schema_xsl,
+        ) as mock_transform:
+            first = self.get_record().description
+            second = self.get_record().description
+
+        self.assertEqual(first, second)
+        self.assertIn("<dd>Aarons, Ethel</dd>", second)
+        self.assertEqual(mock_transform.call_count, 1)
+        self.assertEqual(
+            get_metrics(),
+            {
+                "description_cache.hits": 1,
+                "description_cache.misses": 1,
+                "xslt.transforms": 1,
+            },
+        )
+
+    def test_description_cache_key_includes_schema(self):
+        _ = self.get_record("Airwomen").description
+        _ = self.get_record("Wrns").description
+        _ = self.get_record("Airwomen").description
+
+        self.assertEqual(get_metrics()["description_cache.misses"], 2)
+        self.assertEqual(get_metrics()["description_cache.hits"], 1)
+
+    @override_settings(DESCRIPTION_CACHE_SHARED_CACHE="api")
+    def test_description_from_shared_cache(self):
+        first = self.get_record().description
+        description_cache.clear()
+
+        with patch("app.records.models.apply_schema_xsl") as mock_transform:
+            second = self.get_record().description
+
+        self.assertEqual(first, second)
+        mock_transform.assert_not_called()
+        self.assertEqual(get_metrics()["description_cache.shared_hits"], 1)
+
+
+class RecordSlotsTests(SimpleTestCase):
+    def setUp(self):
+        fixtures = Path(__file__).parent / "fixtures"
+        self.details = [
+            item["@template"]["details"]
+            for path in sorted(fixtures.glob("*.json"))
+            for item in json.loads(path.read_bytes())["data"]
+        ]
+
+    def test_record_has_no_instance_dict(self):
+        record = Record(self.details[0])
+        record.title
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_eager_record_has_the_same_fields(self):
+        for details in self.details:
+            lazy = Record(details)
+            eager = Record(details, eager=True)
+            for name in Record.EAGER_FIELDS.values():
+                with self.subTest(name=name):
+                    self.assertEqual(getattr(eager, name), getattr(lazy, name))
+
+    def test_hierarchy_shares_the_raw_data(self):
+        details = self.details[0]
+        record = Record(details)
+        for i, item in enumerate(record.hierarchy):
+            self.assertIs(item._raw, details["@hierarchy"][i])
+
+    def test_hierarchy_inherits_is_tna(self):
+        record = Record(self.details[0], page_record_is_tna=True)
+        self.assertTrue(all(item.is_tna for item in record.hierarchy))
+
+    def test_uses_less_memory_than_a_dict_based_record(self):
+        def __init__(self, raw_data, page_record_is_tna=False):
+            self._raw = raw_data
+            self._page_record_is_tna = page_record_is_tna
+
+        # the model as it was before the fields moved to slots
+        DictRecord = type(
+            "DictRecord",
+            (APIModel,),
+            {
+                "__init__": __init__,
+                **{
+                    name: cached_property(getter)
+                    for name, getter in Record._cached_slots.items()
+                },
+            },
+        )
+        fields = [*Record.EAGER_FIELDS.values(), "is_tna", "hierarchy"]
+        # the hierarchies are measured too
+        self.assertTrue(
+            any(Record(details).hierarchy for details in self.details)
+        )
+
+        def measure(cls):
+            """Returns the size and the number of the memory blocks
+            allocated for the records, their fields and hierarchies."""
+            # the getters build the hierarchy with the module's Record
+            with patch("app.records.models.Record", cls):
+                tracemalloc.start()
+                records = []
+                for _ in range(20):
+                    for details in self.details:
+                        record = cls(details)
+                        for name in fields:
+                            getattr(record, name)
+                        records.append(record)
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+            self.assertTrue(
+                all(
+                    type(item) is cls
+                    for record in records
+                    for item in record.hierarchy
+                )
+            )
+            statistics = snapshot.statistics("filename")
+            return (
+                sum(stat.size for stat in statistics),
+                sum(stat.count for stat in statistics),
+            )
+
+        slotted_size, slotted_blocks = measure(Record)
+        dict_size, dict_blocks = measure(DictRecord)
+        self.assertLess(slotted_size, dict_size)
+        self.assertLess(slotted_blocks, dict_blocks)
@@ -1,11 +1,25 @@
 from datetime import date
+from unittest.mock import patch
 
 from app.records.utils import (
+    RewrittenHTML,
     change_discovery_record_details_links,
+    compile_path,
     extract,
+    format_extref_links,
     format_link,
+    parse_link,
+    record_url,
+    rewrite_record_links,
 )
 from django.test import SimpleTestCase
+from django.urls import (
+    NoReverseMatch,
+    clear_script_prefix,
+    reverse,
+    set_script_prefix,
+)
+from pyquery import PyQuery as pq
 
 TODAY = date.today()
 
@@ -73,6 +87,19 @@ class TestExtract(SimpleTestCase):
                     default_value,
                 )
 
+    def test_compile_path(self):
+        self.assertEqual(
+            compile_path("item.children.0.id"),
+            (("item", None), ("children", None), ("0", 0), ("id", None)),
+        )
+        self.assertIs(
+            compile_path("item.children.0.id"),
+            compile_path("item.children.0.id"),
+        )
+
+    def test_index_like_key_of_dict(self):
+        self.assertEqual(extract({"item": {"0": "zero"}}, "item.0"), "zero")
+
 
 class TestFormatLink(SimpleTestCase):
     def test_format_link(self):
@@ -123,6 +150,37 @@ class TestFormatLink(SimpleTestCase):
                 self.assertEqual(result, expected[0])
 
 
+class TestParseLink(SimpleTestCase):
+    def test_simple_link_is_not_parsed_by_pyquery(self):
+        with patch("app.records.utils.pq") as mock_pq:
+            result = parse_link('<a href="C5789">DEFE 31</a>')
+        mock_pq.assert_not_called()
+        self.assertEqual(result, ("C5789", "DEFE 31"))
+
+    def test_same_result_as_pyquery(self):
+        for link_html in (
+            '<a href="C5789">DEFE 31</a>',
+            '<a href="00149557ca64456a8a41e44f14621801">LITV 2/D63/Z</a>',
+            '<a href="">DEFE 31</a>',
+            '<a href="C5789"></a>',
+            '<a href="C5789">  DEFE   31 </a>',
+            '<a href="C5789">DEFE\n31</a>',
+            '<a href="C5789">DEFE &amp; 31</a>',
+            '<a href="C&amp;5789">DEFE 31</a>',
+            '<a href="C5789"><span>DEFE</span> 31</a>',
+            '<a class="link" href="C5789">DEFE 31</a>',
+            "<a href='C5789'>DEFE 31</a>",
+            '<a href="C5789">DEFE 31</a> and more',
+            "some value",
+        ):
+            with self.subTest(link_html):
+                document = pq(link_html)
+                self.assertEqual(
+                    parse_link(link_html),
+                    (document.attr("href"), document.text()),
+                )
+
+
 class TestChangeDiscoveryRecordDetailsLinks(SimpleTestCase):
     def test_change_discovery_record_details_links(self):
         test_data = (
@@ -162,3 +220,65 @@ class TestChangeDiscoveryRecordDetailsLinks(SimpleTestCase):
             with self.subTest(label):
                 result = change_discovery_record_details_links(value)
                 self.assertEqual(result, expected)
+
+
+class TestRewriteRecordLinks(SimpleTestCase):
+    def test_same_result_as_both_rewrites(self):
+        html = (
+            '<p>See <a class="extref" href="C361">C 361</a>, '
+            '<a href="https://discovery.nationalarchives.gov.uk/details/r/C362/" title="Opens in a new tab" target="_blank">C 362</a>, '
+            '<a class="extref" href="INVALID">invalid</a>, '
+            '<a class="extref" href="https://discovery.nationalarchives.gov.uk/details/r/C363">C 363</a> and '
+            '<a href="HTTP://DISCOVERY.NATIONALARCHIVES.GOV.UK/SearchUI/details?Uri=C5224">CO 1035</a>.</p>'
+        )
+        result = rewrite_record_links(html)
+        self.assertEqual(
+            result,
+            change_discovery_record_details_links(format_extref_links(html)),
+        )
+        self.assertEqual(
+            result,
+            '<p>See <a class="extref" href="/catalogue/id/C361/">C 361</a>, '
+            '<a href="/catalogue/id/C362/">C 362</a>, '
+            '<a class="extref" href="INVALID">invalid</a>, '
+            '<a class="extref" href="/catalogue/id/C363/">C 363</a> and '
+            '<a href="/catalogue/id/C5224/">CO 1035</a>.</p>',
+        )
+
+    def test_result_is_marked_as_rewritten(self):
+        self.assertIsInstance(rewrite_record_links("<p></p>"), RewrittenHTML)
+
+
+class TestRecordUrl(SimpleTestCase):
+    def test_same_url_as_reverse(self):
+        for iaid in (
+            "C5789",
+            "00149557ca64456a8a41e44f14621801",
+            "7f4e2a8c-3b1d-4e5f-9a6b-0c1d2e3f4a5b_1",
+        ):
+            with self.subTest(iaid):
+                self.assertEqual(
+                    record_url(iaid),
+                    reverse("records:details", kwargs={"id": iaid}),
+                )
+
+    def test_invalid_id(self):
+        for iaid in ("INVALID", "", None):
+            with self.subTest(iaid):
+                with self.assertRaises(NoReverseMatch):
+                    record_url(iaid)
+
+    def test_reversed_once_per_id(self):
+        record_url("C5790")
+        with patch("app.records.utils.reverse") as mock_reverse:
+            self.assertEqual(record_url("C5790"), "/catalogue/id/C5790/")
+        mock_reverse.assert_not_called()
+
+    def test_script_prefix(self):
+        record_url("C5791")
+        set_script_prefix("/prefix/")
+        try:
+            self.assertEqual(record_url("C5791"), "/prefix/catalogue/id/C5791/")
+        finally:
+            clear_script_prefix()
+        self.assertEqual(record_url("C5791"), "/catalogue/id/C5791/")
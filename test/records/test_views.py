@@ -1,7 +1,12 @@
+import threading
+from unittest.mock import patch
+
 import responses
+from app.deliveryoptions.constants import AvailabilityCondition
+from app.deliveryoptions.delivery_options import construct_delivery_options
 from app.records.models import Record
 from django.conf import settings
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 
 class TestRecordView(TestCase):
@@ -65,3 +70,123 @@ class TestRecordView(TestCase):
         self.assertTemplateUsed("records/archon_detail.html")
 
         self.assertIsInstance(response.context_data.get("record"), Record)
+
+
+@override_settings(
+    FEATURE_DELIVERY_OPTIONS=True,
+    DELIVERY_OPTIONS_API_URL="https://doris.test/api",
+)
+class TestRecordViewDeliveryOptions(TestCase):
+    record_data = {
+        "iaid": "C123456",
+        "title": "Test Title",
+        "source": "CAT",
+        "referenceNumber": "TEST 123/456",
+    }
+
+    def delivery_options(self, availability_condition):
+        return [
+            {
+                "options": availability_condition,
+                "surrogateLinks": [],
+                "advancedOrderUrlParameters": "",
+            }
+        ]
+
+    def add_record_response(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get?id=C123456",
+            json={"data": [{"@template": {"details": self.record_data}}]},
+            status=200,
+        )
+
+    def expected_context(self, response, availability_condition):
+        return construct_delivery_options(
+            self.delivery_options(availability_condition),
+            response.context_data["record"],
+            response.wsgi_request,
+        )
+
+    @responses.activate
+    def test_delivery_options(self):
+        self.add_record_response()
+        responses.add(
+            responses.GET,
+            "https://doris.test/api/?iaid=C123456",
+            json=self.delivery_options(
+                AvailabilityCondition.InvigilationSafeRoom
+            ),
+            status=200,
+        )
+
+        response = self.client.get("/catalogue/id/C123456/")
+
+        self.assertEqual(response.status_code, 200)
+        expected = self.expected_context(
+            response, AvailabilityCondition.InvigilationSafeRoom
+        )
+        self.assertTrue(expected)
+        for key, value in expected.items():
+            self.assertEqual(response.context_data[key], value)
+
+    @responses.activate
+    def test_delivery_options_fall_back_to_order_exception(self):
+        self.add_record_response()
+        responses.add(
+            responses.GET,
+            "https://doris.test/api/?iaid=C123456",
+            status=500,
+        )
+
+        with self.assertLogs("app.records.views", level="ERROR"):
+            response = self.client.get("/catalogue/id/C123456/")
+
+        self.assertEqual(response.status_code, 200)
+        expected = self.expected_context(
+            response, AvailabilityCondition.OrderException
+        )
+        for key, value in expected.items():
+            self.assertEqual(response.context_data[key], value)
+
+    def test_record_and_delivery_options_are_fetched_concurrently(self):
+        # each call waits for the other one to start
+        barrier = threading.Barrier(2, timeout=5)
+
+        def record_details_by_id(id, params, use_cache):
+            barrier.wait()
+            return Record(self.record_data)
+
+        def delivery_options_request_handler(iaid):
+            barrier.wait()
+            return self.delivery_options(
+                AvailabilityCondition.InvigilationSafeRoom
+            )
+
+        with patch(
+            "app.records.api.record_details_by_id", record_details_by_id
+        ), patch(
+            "app.deliveryoptions.api.delivery_options_request_handler",
+            delivery_options_request_handler,
+        ):
+            response = self.client.get("/catalogue/id/C123456/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(barrier.broken)
+        self.assertEqual(
+            response.context_data["do_heading"],
+            self.expected_context(
+                response, AvailabilityCondition.InvigilationSafeRoom
+            )["do_heading"],
+        )
+
+    @responses.activate
+    @override_settings(FEATURE_DELIVERY_OPTIONS=False)
+    def test_delivery_options_feature_disabled(self):
+        self.add_record_response()
+
+        response = self.client.get("/catalogue/id/C123456/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("reader_type", response.context_data)
+        self.assertEqual(len(responses.calls), 1)
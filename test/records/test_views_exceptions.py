@@ -1,7 +1,9 @@
+import time
 from http import HTTPStatus
 from test.utils import prevent_request_warnings
 
 import responses
+from requests import Timeout
 from django.conf import settings
 from django.test import TestCase, override_settings
 
@@ -76,3 +78,30 @@ class TestRecordViewExceptions(TestCase):
             "There is a problem with the service",
             response.content.decode("utf-8"),
         )
+
+    @prevent_request_warnings  # suppress test output: Gateway Timeout: /catalogue/id/C123456/
+    @override_settings(REQUEST_TIME_BUDGET=0.001)
+    @responses.activate
+    def test_time_budget_exhausted_responds_with_gateway_timeout_504(self):
+        def slow_response(request):
+            time.sleep(0.002)
+            raise Timeout()
+
+        responses.add_callback(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/get",
+            callback=slow_response,
+        )
+
+        with self.assertLogs("app.errors.middleware", level="ERROR") as lc:
+            response = self.client.get("/catalogue/id/C123456/")
+
+        self.assertIn(
+            "Request time budget of 0.001s exhausted: /catalogue/id/C123456/",
+            "".join(lc.output),
+        )
+        self.assertEqual(response.status_code, HTTPStatus.GATEWAY_TIMEOUT)
+        self.assertIn(
+            "There is a problem with the service",
+            response.content.decode("utf-8"),
+        )
@@ -1,10 +1,13 @@
+from unittest.mock import patch
+
 import responses
 from app.lib.api import JSONAPIClient, ResourceNotFound
-from app.records.models import Record
+from app.lib.metrics import get_metrics, reset_metrics
 from app.search.api import search_records
-from app.search.models import APISearchResponse
+from app.search.models import APISearchResponse, SearchResult
 from django.conf import settings
-from django.test import SimpleTestCase
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
 
 
 class SearchRecordsTests(SimpleTestCase):
@@ -39,7 +42,7 @@ class SearchRecordsTests(SimpleTestCase):
         self.assertIsInstance(api_results, APISearchResponse)
         self.assertIsInstance(api_results.records, list)
         self.assertEqual(len(api_results.records), 1)
-        self.assertIsInstance(api_results.records[0], Record)
+        self.assertIsInstance(api_results.records[0], SearchResult)
         self.assertEqual(api_results.stats_total, 1)
         self.assertEqual(api_results.stats_results, 1)
         self.assertEqual(api_results.buckets, {"tna": 1})
@@ -73,3 +76,141 @@ class SearchRecordsTests(SimpleTestCase):
 
         with self.assertRaisesMessage(Exception, "No 'buckets' returned"):
             _ = search_records(query="")
+
+
+@override_settings(SEARCH_CACHE_TIMEOUT=60)
+class SearchRecordsCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches["api"].clear()
+        reset_metrics()
+        self.response_json = {
+            "data": [{"@template": {"details": {"iaid": "C198022"}}}],
+            "buckets": [
+                {
+                    "name": "group",
+                    "entries": [
+                        {"value": "tna", "count": 1},
+                    ],
+                }
+            ],
+            "stats": {
+                "total": 1,
+                "results": 1,
+            },
+        }
+
+    @responses.activate
+    def test_identical_search_uses_cache(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json=self.response_json,
+            status=200,
+        )
+
+        first = search_records(query="*", params={"filter": ["group:tna"]})
+        second = search_records(query="*", params={"filter": ["group:tna"]})
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(first._raw, second._raw)
+        self.assertIsNot(first._raw, second._raw)
+        self.assertEqual(
+            get_metrics(), {"search_cache.hits": 1, "search_cache.misses": 1}
+        )
+
+    @responses.activate
+    def test_different_search_is_not_cached(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json=self.response_json,
+            status=200,
+        )
+
+        _ = search_records(query="*", params={"filter": ["group:tna"]})
+        _ = search_records(query="*", params={"filter": ["group:nonTna"]})
+
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    def test_cache_key_is_normalised(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json=self.response_json,
+            status=200,
+        )
+
+        _ = search_records(query="*", params={"level": "Item", "group": "tna"})
+        _ = search_records(query="*", params={"group": "tna", "level": "Item"})
+
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_stale_response_is_served_on_upstream_error(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json=self.response_json,
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            status=500,
+        )
+
+        with patch("app.lib.cache.time.time", return_value=1000):
+            first = search_records(query="*", params={})
+        # past the stale window, within the stale-if-error window
+        with patch("app.lib.cache.time.time", return_value=1000 + 60 + 301):
+            second = search_records(query="*", params={})
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(first._raw, second._raw)
+        self.assertEqual(get_metrics()["search_cache.stale_on_error"], 1)
+
+    @responses.activate
+    def test_use_cache_false_skips_cached_response(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json=self.response_json,
+            status=200,
+        )
+
+        _ = search_records(query="*", params={})
+        _ = search_records(query="*", params={}, use_cache=False)
+
+        self.assertEqual(len(responses.calls), 2)
+
+    @override_settings(SEARCH_CACHE_MAX_ENTRY_SIZE=10)
+    @responses.activate
+    def test_large_response_is_not_cached(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json=self.response_json,
+            status=200,
+        )
+
+        _ = search_records(query="*", params={})
+        _ = search_records(query="*", params={})
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(get_metrics()["search_cache.oversized"], 2)
+
+    @responses.activate
+    def test_invalid_response_is_not_cached(self):
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json={},
+            status=200,
+        )
+
+        for _ in range(2):
+            with self.assertRaisesMessage(Exception, "No data returned"):
+                _ = search_records(query="*", params={})
+
+        self.assertEqual(len(responses.calls), 2)
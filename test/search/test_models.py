@@ -1,5 +1,8 @@
+import json
+
 from app.records.models import Record
-from app.search.models import APISearchResponse
+from app.search.models import APISearchResponse, SearchResult
+from django.conf import settings
 from django.test import SimpleTestCase
 
 
@@ -68,10 +71,63 @@ class APISearchResponseTests(SimpleTestCase):
         self.assertIsInstance(self.api_search_response, APISearchResponse)
 
         self.assertEqual(len(self.api_search_response.records), 1)
-        self.assertIsInstance(self.api_search_response.records[0], Record)
+        self.assertIsInstance(self.api_search_response.records[0], SearchResult)
 
         self.assertEqual(self.api_search_response.stats_total, 26008838)
 
         self.assertEqual(self.api_search_response.stats_results, 20)
 
         self.assertEqual(self.api_search_response.buckets, {"tna": 1})
+
+
+class SearchResultTests(SimpleTestCase):
+    def setUp(self):
+        self.details = []
+        for fixture in (
+            "response_C15836.json",
+            "response_00149557ca64456a8a41e44f14621801_1.json",
+        ):
+            with open(
+                f"{settings.BASE_DIR}/test/records/fixtures/{fixture}"
+            ) as f:
+                self.details += [
+                    item["@template"]["details"]
+                    for item in json.load(f)["data"]
+                ]
+
+    def test_fields_match_record(self):
+        for details in self.details:
+            result = SearchResult(details)
+            record = Record(details)
+            with self.subTest(record.iaid):
+                self.assertEqual(result.iaid, record.iaid)
+                self.assertEqual(result.summary_title, record.summary_title)
+                self.assertEqual(
+                    result.reference_number, record.reference_number
+                )
+                self.assertEqual(result.date_covering, record.date_covering)
+                self.assertEqual(result.held_by, record.held_by)
+                self.assertEqual(result.description, record.description)
+
+    def test_description_from_series_stylesheet_matches_record(self):
+        details = {
+            "iaid": "C123456",
+            "description": {"value": "<p>Airwomen</p>"},
+            "groupArray": [{"value": "tna"}],
+            "@hierarchy": [
+                {
+                    "identifier": [
+                        {"iaid": "C14581", "reference_number": "ADM 240"}
+                    ],
+                    "level": {"code": 3},
+                }
+            ],
+        }
+
+        self.assertEqual(
+            SearchResult(details).description, Record(details).description
+        )
+
+    def test_search_result_is_slotted(self):
+        result = SearchResult(self.details[0])
+        self.assertFalse(hasattr(result, "__dict__"))
@@ -2,11 +2,12 @@ from http import HTTPStatus
 from unittest.mock import patch
 
 import responses
-from app.records.models import Record
 from app.search.buckets import BucketKeys
 from app.search.forms import CatalogueSearchForm
+from app.search.models import SearchResult
 from django.conf import settings
-from django.test import TestCase
+from django.core.cache import caches
+from django.test import TestCase, override_settings
 
 
 class CatalogueSearchViewTests(TestCase):
@@ -60,7 +61,7 @@ class CatalogueSearchViewTests(TestCase):
         self.assertIsInstance(self.response.context_data.get("results"), list)
         self.assertEqual(len(self.response.context_data.get("results")), 1)
         self.assertIsInstance(
-            self.response.context_data.get("results")[0], Record
+            self.response.context_data.get("results")[0], SearchResult
         )
         self.assertEqual(
             self.response.context_data.get("stats"),
@@ -360,6 +361,75 @@ class CatalogueSearchViewTests(TestCase):
         self.assertEqual(self.response.context_data.get("selected_filters"), [])
 
 
+@override_settings(SEARCH_CACHE_TIMEOUT=60)
+class CatalogueSearchViewCacheTests(TestCase):
+    """Tests the search response cache from the catalogue search view."""
+
+    def setUp(self):
+        caches["api"].clear()
+
+    @responses.activate
+    def test_catalogue_search_cache_and_bypass_header(self):
+
+        responses.add(
+            responses.GET,
+            f"{settings.ROSETTA_API_URL}/search",
+            json={
+                "data": [
+                    {
+                        "@template": {
+                            "details": {
+                                "iaid": "C123456",
+                                "source": "CAT",
+                            }
+                        }
+                    }
+                ],
+                "buckets": [
+                    {
+                        "name": "group",
+                        "entries": [
+                            {"value": "tna", "count": 1},
+                        ],
+                    }
+                ],
+                "stats": {
+                    "total": 1,
+                    "results": 1,
+                },
+            },
+            status=HTTPStatus.OK,
+        )
+
+        for _ in range(2):
+            self.response = self.client.get("/catalogue/search/?q=ufo")
+            self.assertEqual(self.response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(responses.calls), 1)
+
+        # the header is ignored without DEBUG or a matching token
+        for token, value, calls in (
+            ("", "1", 1),
+            ("secret", "wrong", 1),
+            ("secret", "secret", 2),
+        ):
+            with self.subTest(token=token, value=value):
+                with override_settings(API_CACHE_BYPASS_TOKEN=token):
+                    self.response = self.client.get(
+                        "/catalogue/search/?q=ufo",
+                        headers={settings.API_CACHE_BYPASS_HEADER: value},
+                    )
+                self.assertEqual(self.response.status_code, HTTPStatus.OK)
+                self.assertEqual(len(responses.calls), calls)
+
+        with override_settings(DEBUG=True):
+            self.response = self.client.get(
+                "/catalogue/search/?q=ufo",
+                headers={settings.API_CACHE_BYPASS_HEADER: "1"},
+            )
+        self.assertEqual(self.response.status_code, HTTPStatus.OK)
+        self.assertEqual(len(responses.calls), 3)
+
+
 class CatalogueSearchViewLoggerDebugAPITests(TestCase):
     """Tests API calls (url) made by the catalogue search view."""
 